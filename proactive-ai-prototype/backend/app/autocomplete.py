@@ -0,0 +1,276 @@
+"""
+Search Autocomplete.
+
+Serves prefix suggestions for the search box from a sorted array of
+lowercased keys, searched with bisect. Suggestions cover candidate titles
+and TF-IDF vocabulary terms, ranked by document frequency and engagement.
+
+Performance notes:
+- A prefix lookup is two binary searches plus a top-k over the matching
+  range. Ranges larger than SCAN_LIMIT (short, popular prefixes) are served
+  from a precomputed top-k list, so lookups stay well under a millisecond
+  even with ~1M keys.
+- Inserts and score updates are incremental; only the precomputed lists
+  for the affected key's prefixes are touched.
+
+Design for refactoring:
+- Can be replaced with a compact trie/FST or a search engine's suggester
+"""
+
+import heapq
+import math
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from .models import Candidate
+from .text_similarity import TextSimilarity
+
+
+# Sorts after every other character, so prefix + _MAX_CHAR bounds a range
+_MAX_CHAR = "\U0010ffff"
+
+
+@dataclass
+class Suggestion:
+    """A single autocomplete entry."""
+    __slots__ = ("text", "kind", "score", "candidate_id")
+
+    text: str
+    kind: str  # "term" or "title"
+    score: float
+    candidate_id: Optional[str]
+
+
+def suggestion_score(document_frequency: int, engagement: float) -> float:
+    """
+    Rank score for a suggestion.
+
+    Log-damped so that neither very common terms nor a single viral
+    candidate dominate every prefix.
+    """
+    return math.log1p(document_frequency) + 0.5 * math.log1p(max(engagement, 0.0))
+
+
+class PrefixSuggester:
+    """
+    Prefix suggestion index over titles and vocabulary terms.
+
+    Usage:
+        suggester = PrefixSuggester(text_similarity)
+        suggester.build(candidates)
+        suggester.suggest("kaf", limit=8)
+    """
+
+    # Prefix ranges larger than this use a precomputed top-k list
+    SCAN_LIMIT = 256
+    # Size of precomputed top-k lists (upper bound on `limit`)
+    MAX_SUGGESTIONS = 20
+
+    def __init__(self, similarity: Optional[TextSimilarity] = None):
+        self.similarity = similarity or TextSimilarity()
+        self._keys: list[str] = []
+        self._entries: list[Suggestion] = []
+        self._top: dict[str, list[Suggestion]] = {}
+        # Per-term [document frequency, summed engagement]
+        self._term_stats: dict[str, list[float]] = {}
+        # Per-candidate (engagement, terms) for incremental updates
+        self._candidates: dict[str, tuple[float, set[str]]] = {}
+        self._titles: dict[str, Suggestion] = {}
+        self._terms: dict[str, Suggestion] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # Building
+
+    def build(self, candidates: list[Candidate]) -> None:
+        """Rebuild the index from the full candidate pool."""
+        self._term_stats = {}
+        self._candidates = {}
+        self._titles = {}
+        self._terms = {}
+
+        entries = []
+        for candidate in candidates:
+            terms = self._candidate_terms(candidate)
+            self._candidates[candidate.id] = (candidate.engagement_score, terms)
+            for term in terms:
+                stats = self._term_stats.setdefault(term, [0, 0.0])
+                stats[0] += 1
+                stats[1] += candidate.engagement_score
+
+            title = Suggestion(
+                text=candidate.title,
+                kind="title",
+                score=suggestion_score(1, candidate.engagement_score),
+                candidate_id=candidate.id
+            )
+            self._titles[candidate.id] = title
+            entries.append(title)
+
+        for term, (df, engagement) in self._term_stats.items():
+            suggestion = Suggestion(
+                text=term, kind="term",
+                score=suggestion_score(df, engagement), candidate_id=None
+            )
+            self._terms[term] = suggestion
+            entries.append(suggestion)
+
+        self.load(entries)
+
+    def load(self, entries: Iterable[Suggestion]) -> None:
+        """Replace all entries and precompute top-k for heavy prefixes."""
+        pairs = sorted(((e.text.lower(), e) for e in entries), key=lambda p: p[0])
+        self._keys = [key for key, _ in pairs]
+        self._entries = [entry for _, entry in pairs]
+        self._top = {}
+        self._precompute("", 0, len(self._keys))
+
+    def _precompute(self, prefix: str, lo: int, hi: int) -> None:
+        """Store top-k for every prefix whose range exceeds SCAN_LIMIT."""
+        if hi - lo <= self.SCAN_LIMIT:
+            return
+        if prefix:
+            self._top[prefix] = self._top_k(lo, hi, self.MAX_SUGGESTIONS)
+
+        depth = len(prefix)
+        i = lo
+        while i < hi:
+            key = self._keys[i]
+            if len(key) <= depth:
+                i += 1
+                continue
+            child = key[:depth + 1]
+            end = bisect_left(self._keys, child + _MAX_CHAR, i, hi)
+            self._precompute(child, i, end)
+            i = end
+
+    # Incremental updates
+
+    def add_candidate(self, candidate: Candidate) -> None:
+        """Index a newly ingested candidate's title and terms."""
+        if candidate.id in self._candidates:
+            return
+
+        terms = self._candidate_terms(candidate)
+        self._candidates[candidate.id] = (candidate.engagement_score, terms)
+
+        title = Suggestion(
+            text=candidate.title,
+            kind="title",
+            score=suggestion_score(1, candidate.engagement_score),
+            candidate_id=candidate.id
+        )
+        self._titles[candidate.id] = title
+        self.insert(title)
+
+        for term in terms:
+            stats = self._term_stats.setdefault(term, [0, 0.0])
+            stats[0] += 1
+            stats[1] += candidate.engagement_score
+            self._refresh_term(term)
+
+    def update_engagement(self, candidate_id: str, engagement: float) -> None:
+        """Re-rank a candidate's title and terms after its engagement changed."""
+        if candidate_id not in self._candidates:
+            return
+
+        old_engagement, terms = self._candidates[candidate_id]
+        self._candidates[candidate_id] = (engagement, terms)
+
+        self.set_score(self._titles[candidate_id], suggestion_score(1, engagement))
+        for term in terms:
+            self._term_stats[term][1] += engagement - old_engagement
+            self._refresh_term(term)
+
+    def _refresh_term(self, term: str) -> None:
+        """Insert a term entry or update its score from current stats."""
+        df, engagement = self._term_stats[term]
+        score = suggestion_score(int(df), engagement)
+        suggestion = self._terms.get(term)
+        if suggestion is None:
+            suggestion = Suggestion(text=term, kind="term", score=score, candidate_id=None)
+            self._terms[term] = suggestion
+            self.insert(suggestion)
+        else:
+            self.set_score(suggestion, score)
+
+    def insert(self, suggestion: Suggestion) -> None:
+        """Insert one entry, keeping precomputed top-k lists current."""
+        key = suggestion.text.lower()
+        index = bisect_left(self._keys, key)
+        self._keys.insert(index, key)
+        self._entries.insert(index, suggestion)
+
+        for prefix in self._cached_prefixes(key):
+            top = self._top[prefix]
+            if len(top) < self.MAX_SUGGESTIONS or suggestion.score > top[-1].score:
+                self._push(top, suggestion)
+
+    def set_score(self, suggestion: Suggestion, score: float) -> None:
+        """Change an entry's score, keeping precomputed top-k lists current."""
+        old_score, suggestion.score = suggestion.score, score
+        key = suggestion.text.lower()
+
+        for prefix in self._cached_prefixes(key):
+            top = self._top[prefix]
+            if any(s is suggestion for s in top):
+                if score < old_score and len(top) == self.MAX_SUGGESTIONS:
+                    # A lower score may let an unlisted entry overtake it
+                    lo, hi = self._range(prefix)
+                    self._top[prefix] = self._top_k(lo, hi, self.MAX_SUGGESTIONS)
+                else:
+                    top.sort(key=lambda s: -s.score)
+            elif len(top) < self.MAX_SUGGESTIONS or score > top[-1].score:
+                self._push(top, suggestion)
+
+    def _push(self, top: list[Suggestion], suggestion: Suggestion) -> None:
+        """Add an entry to a top-k list, keeping it sorted and bounded."""
+        top.append(suggestion)
+        top.sort(key=lambda s: -s.score)
+        del top[self.MAX_SUGGESTIONS:]
+
+    def _cached_prefixes(self, key: str) -> list[str]:
+        """Prefixes of key that have a precomputed top-k list."""
+        return [key[:n] for n in range(1, len(key) + 1) if key[:n] in self._top]
+
+    # Lookup
+
+    def suggest(self, prefix: str, limit: int = 8) -> list[Suggestion]:
+        """
+        Get the highest-ranked entries starting with prefix.
+
+        Matching is case-insensitive. Returns at most `limit` entries
+        (capped at MAX_SUGGESTIONS), best first.
+        """
+        prefix = prefix.lower().lstrip()
+        if not prefix:
+            return []
+        limit = min(limit, self.MAX_SUGGESTIONS)
+
+        lo, hi = self._range(prefix)
+        if hi - lo <= self.SCAN_LIMIT:
+            return self._top_k(lo, hi, limit)
+
+        top = self._top.get(prefix)
+        if top is None:
+            # Range grew past SCAN_LIMIT through inserts; cache it now
+            top = self._top[prefix] = self._top_k(lo, hi, self.MAX_SUGGESTIONS)
+        return top[:limit]
+
+    def _range(self, prefix: str) -> tuple[int, int]:
+        """Index range [lo, hi) of keys starting with prefix."""
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + _MAX_CHAR, lo)
+        return lo, hi
+
+    def _top_k(self, lo: int, hi: int, k: int) -> list[Suggestion]:
+        """Highest-scoring k entries in [lo, hi)."""
+        return heapq.nlargest(k, self._entries[lo:hi], key=lambda s: s.score)
+
+    def _candidate_terms(self, candidate: Candidate) -> set[str]:
+        """Vocabulary terms contributed by a candidate."""
+        return set(self.similarity.tokenize(
+            f"{candidate.title} {candidate.summary} {' '.join(candidate.keywords)}"
+        ))
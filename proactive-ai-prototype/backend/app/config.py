@@ -10,6 +10,60 @@ Environment Variables:
     CLAUDE_MODEL: Claude model ID (default: claude-haiku-3-5-20241022)
     MAX_TOKENS: Maximum tokens in response (default: 1024)
     TEMPERATURE: Sampling temperature 0-1 (default: 0.7)
+    QUERY_EXPANSIONS_FILE: JSON file of search query expansions (optional)
+    EMBEDDING_RETRIEVAL: Blend dense-vector retrieval into recommendations
+        (default: false)
+    EMBEDDING_INDEX_PATH: .npz file to load/save the ANN index (optional)
+    SEARCH_CACHE_SIZE: Max cached search results (default: 1024)
+    SEARCH_CACHE_TTL_SECONDS: Search result cache TTL (default: 300)
+    SEARCH_CACHE_MAX_BYTES: Search result cache memory bound (default: 8 MiB)
+    SEARCH_SHARDS: Worker processes for sharded search; 0 searches
+        in-process (default: 0)
+    VECTORIZED_RANKING: Rank recommendations with the NumPy ranker
+        (default: true)
+    RECOMMENDATION_CACHE_SIZE: Max cached recommendation slates; 0
+        disables the cache (default: 2048)
+    RECOMMENDATION_CACHE_TTL_SECONDS: Recommendation cache TTL
+        (default: 300)
+    CF_CACHE_SIZE: Max users with cached CF scores (default: 4096)
+    CF_CACHE_TTL_SECONDS: CF score cache TTL (default: 600)
+    CF_CACHE_WARM_USERS: Most active users whose CF scores are
+        precomputed in the background at startup (default: 100)
+    ITEM_CF: Score CF from the item-item co-occurrence model
+        (default: true)
+    ITEM_CF_MODEL_PATH: .npz file to load/save the item-item model
+        (optional)
+    ALS_CF: Score CF from implicit ALS factors, ahead of the item-item
+        model (default: false)
+    ALS_FACTORS: Latent dimensions of the ALS model (default: 32)
+    ALS_WORKERS: Processes for ALS training; 0 uses every core
+        (default: 0)
+    ALS_MODEL_PATH: .npz file to load/save the ALS factors (optional)
+    CF_MODEL_REFRESH_SECONDS: Rebuild interval for the item-item and ALS
+        models and the learned ranker; 0 builds them once at startup
+        (default: 3600)
+    PRECOMPUTED_RECOMMENDATIONS_PATH: Table written by
+        `python -m app.precompute` to serve slates from (optional)
+    PRECOMPUTED_MAX_AGE_SECONDS: Stop serving the precomputed table once
+        it is this old; 0 serves it until the data changes (default: 86400)
+    MULTI_SOURCE_RETRIEVAL: Retrieve from keyword, TF-IDF, CF, fresh and
+        popularity sources concurrently (default: false)
+    RETRIEVAL_SOURCE_TIMEOUT_MS: Per-source timeout for multi-source
+        retrieval; unset uses each source's default budget (optional)
+    MMR_DIVERSITY: Rerank the top of each slate with Maximal Marginal
+        Relevance instead of the category penalty (default: false)
+    MMR_LAMBDA: Relevance/diversity trade-off in (0, 1]; 1 is pure
+        relevance (default: 0.7)
+    MMR_TOP_M: Items considered by the MMR reranker (default: 50)
+    MMR_SIMILARITY: "keywords" (Jaccard) or "embedding" (cosine)
+        (default: keywords)
+    LEARNED_RANKING: Score with a logistic-regression ranker trained on
+        feedback, falling back to the heuristic until one is trained
+        (default: false)
+    LEARNED_RANKER_PATH: .npz file to load/save the ranker (optional)
+    PIPELINE_TRACING: Time each recommendation stage into histograms
+        (/api/recommendations/metrics); requests sending X-Debug-Trace: 1
+        get a Server-Timing header (default: false)
 """
 
 import os
@@ -61,6 +115,103 @@ class Config:
         if self.temperature < 0 or self.temperature > 1:
             raise ValueError("TEMPERATURE must be between 0 and 1")
 
+        # Search settings
+        self.query_expansions_file: Optional[str] = os.getenv("QUERY_EXPANSIONS_FILE")
+
+        # Dense retrieval settings
+        self.embedding_retrieval: bool = os.getenv(
+            "EMBEDDING_RETRIEVAL", "false"
+        ).lower() in ("1", "true", "yes")
+        self.embedding_index_path: Optional[str] = os.getenv("EMBEDDING_INDEX_PATH")
+
+        # Search result cache settings
+        self.search_cache_size: int = int(os.getenv("SEARCH_CACHE_SIZE", "1024"))
+        self.search_cache_ttl_seconds: float = float(
+            os.getenv("SEARCH_CACHE_TTL_SECONDS", "300")
+        )
+        self.search_cache_max_bytes: int = int(
+            os.getenv("SEARCH_CACHE_MAX_BYTES", str(8 * 1024 * 1024))
+        )
+
+        # Sharded search settings
+        self.search_shards: int = int(os.getenv("SEARCH_SHARDS", "0"))
+
+        # Ranking settings
+        self.vectorized_ranking: bool = os.getenv(
+            "VECTORIZED_RANKING", "true"
+        ).lower() in ("1", "true", "yes")
+
+        # Recommendation cache settings
+        self.recommendation_cache_size: int = int(
+            os.getenv("RECOMMENDATION_CACHE_SIZE", "2048")
+        )
+        self.recommendation_cache_ttl_seconds: float = float(
+            os.getenv("RECOMMENDATION_CACHE_TTL_SECONDS", "300")
+        )
+
+        # Collaborative filtering cache settings
+        self.cf_cache_size: int = int(os.getenv("CF_CACHE_SIZE", "4096"))
+        self.cf_cache_ttl_seconds: float = float(
+            os.getenv("CF_CACHE_TTL_SECONDS", "600")
+        )
+        self.cf_cache_warm_users: int = int(os.getenv("CF_CACHE_WARM_USERS", "100"))
+
+        # Item-item collaborative filtering settings
+        self.item_cf: bool = os.getenv(
+            "ITEM_CF", "true"
+        ).lower() in ("1", "true", "yes")
+        self.item_cf_model_path: Optional[str] = os.getenv("ITEM_CF_MODEL_PATH")
+
+        # Matrix factorization settings
+        self.als_cf: bool = os.getenv(
+            "ALS_CF", "false"
+        ).lower() in ("1", "true", "yes")
+        self.als_factors: int = int(os.getenv("ALS_FACTORS", "32"))
+        self.als_workers: int = int(os.getenv("ALS_WORKERS", "0"))
+        self.als_model_path: Optional[str] = os.getenv("ALS_MODEL_PATH")
+
+        # CF model refresh settings
+        self.cf_model_refresh_seconds: float = float(os.getenv("CF_MODEL_REFRESH_SECONDS", "3600"))
+
+        # Precomputed recommendation settings
+        self.precomputed_recommendations_path: Optional[str] = os.getenv(
+            "PRECOMPUTED_RECOMMENDATIONS_PATH"
+        )
+        self.precomputed_max_age_seconds: float = float(
+            os.getenv("PRECOMPUTED_MAX_AGE_SECONDS", "86400")
+        )
+
+        # Multi-source retrieval settings
+        self.multi_source_retrieval: bool = os.getenv(
+            "MULTI_SOURCE_RETRIEVAL", "false"
+        ).lower() in ("1", "true", "yes")
+        timeout_ms = os.getenv("RETRIEVAL_SOURCE_TIMEOUT_MS")
+        self.retrieval_source_timeout_ms: Optional[float] = (
+            float(timeout_ms) if timeout_ms else None
+        )
+
+        # Diversity reranking settings
+        self.mmr_diversity: bool = os.getenv(
+            "MMR_DIVERSITY", "false"
+        ).lower() in ("1", "true", "yes")
+        self.mmr_lambda: float = float(os.getenv("MMR_LAMBDA", "0.7"))
+        self.mmr_top_m: int = int(os.getenv("MMR_TOP_M", "50"))
+        self.mmr_similarity: str = os.getenv("MMR_SIMILARITY", "keywords").lower()
+
+        if self.mmr_lambda <= 0 or self.mmr_lambda > 1:
+            raise ValueError("MMR_LAMBDA must be in (0, 1]")
+
+        # Learned ranking settings
+        self.learned_ranking: bool = os.getenv(
+            "LEARNED_RANKING", "false"
+        ).lower() in ("1", "true", "yes")
+        self.learned_ranker_path: Optional[str] = os.getenv("LEARNED_RANKER_PATH")
+
+        # Pipeline tracing settings
+        self.pipeline_tracing: bool = os.getenv(
+            "PIPELINE_TRACING", "false"
+        ).lower() in ("1", "true", "yes")
+
     def _load_env_file(self):
         """Load environment variables from .env file if it exists."""
         try:
@@ -12,13 +12,22 @@ import json
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 import uuid
 
 from .models import (
     Candidate, User, UserActivity, Feedback, Conversation, ChatMessage
 )
 
+# Engagement score change per feedback action
+FEEDBACK_SCORE_DELTAS = {
+    "started": 1.0,
+    "replied": 0.5,
+    "dismissed": -0.3,
+    "ignored": -0.1,
+    "dont_show_like_this": -1.0
+}
+
 
 class DataStore:
     """
@@ -29,9 +38,13 @@ class DataStore:
     2. Replace instantiation in main.py
     """
 
-    def __init__(self, data_file: str = "data/candidates.json"):
+    def __init__(self, data_file: str = "data/candidates.json", data: Optional[dict] = None):
         self.data_file = Path(__file__).parent.parent / data_file
-        self._data = self._load_data()
+        # A snapshot passed in (e.g. to a worker process) skips the file read
+        self._data = data if data is not None else self._load_data()
+        # Bumped whenever the candidate pool changes
+        self.catalog_version = 0
+        self._listeners: list[Callable[[str, Optional[str]], None]] = []
 
     def _load_data(self) -> dict:
         """Load data from JSON file."""
@@ -45,6 +58,27 @@ class DataStore:
         with open(self.data_file, "w") as f:
             json.dump(self._data, f, indent=2, default=str)
 
+    def snapshot(self) -> dict:
+        """The raw store contents, e.g. to hand to worker processes."""
+        return self._data
+
+    # Change notifications
+
+    def subscribe(self, listener: Callable[[str, Optional[str]], None]) -> None:
+        """
+        Register a callback for data changes.
+
+        Called as listener(event, user_id) after the change is saved.
+        Events: "user", "activity" and "feedback" carry the affected
+        user's ID; "catalog" (candidate pool changed) has user_id None.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, user_id: Optional[str] = None) -> None:
+        """Tell subscribers about a change."""
+        for listener in self._listeners:
+            listener(event, user_id)
+
     # Candidate operations
 
     def get_all_candidates(self) -> list[Candidate]:
@@ -68,6 +102,74 @@ class DataStore:
                 return self._dict_to_candidate(c)
         return None
 
+    def get_candidates_by_ids(self, candidate_ids: list[str]) -> list[Candidate]:
+        """Get candidates by ID, in the order given. Unknown IDs are skipped."""
+        wanted = set(candidate_ids)
+        found = {
+            c["id"]: c for c in self._data.get("candidates", [])
+            if c["id"] in wanted
+        }
+        return [
+            self._dict_to_candidate(found[cid])
+            for cid in candidate_ids if cid in found
+        ]
+
+    def add_candidate(
+        self, candidate: Candidate, fingerprint: Optional[str] = None
+    ) -> Candidate:
+        """Add a new candidate to the pool, with its content fingerprint."""
+        candidate_dict = {
+            "id": candidate.id,
+            "title": candidate.title,
+            "summary": candidate.summary,
+            "category": candidate.category,
+            "keywords": candidate.keywords,
+            "source": candidate.source,
+            "engagement_score": candidate.engagement_score,
+            "created_at": candidate.created_at or datetime.now().isoformat(),
+            "content_type": candidate.content_type,
+            "difficulty": candidate.difficulty,
+            "priority": candidate.priority
+        }
+        if fingerprint:
+            candidate_dict["fingerprint"] = fingerprint
+        self._data.setdefault("candidates", []).append(candidate_dict)
+        self._save_data()
+        self.catalog_version += 1
+        self._notify("catalog")
+        return self._dict_to_candidate(candidate_dict)
+
+    def get_candidate_fingerprints(self) -> dict[str, Optional[str]]:
+        """Get persisted content fingerprints (None if missing) by candidate ID."""
+        return {
+            c["id"]: c.get("fingerprint")
+            for c in self._data.get("candidates", [])
+        }
+
+    def set_candidate_fingerprints(self, fingerprints: dict[str, str]) -> None:
+        """Persist content fingerprints for existing candidates."""
+        for c in self._data.get("candidates", []):
+            if c["id"] in fingerprints:
+                c["fingerprint"] = fingerprints[c["id"]]
+        self._save_data()
+
+    def update_candidate_features(self, features: dict[str, dict]) -> int:
+        """
+        Merge computed features into stored candidates and persist once.
+
+        Args:
+            features: Candidate ID -> {feature name: value}
+
+        Returns number of candidates updated.
+        """
+        updated = 0
+        for c in self._data.get("candidates", []):
+            if c["id"] in features:
+                c.update(features[c["id"]])
+                updated += 1
+        self._save_data()
+        return updated
+
     def get_candidates_by_keywords(
         self, keywords: list[str], limit: int = 100
     ) -> list[Candidate]:
@@ -111,6 +213,18 @@ class DataStore:
                 return User(**u)
         return None
 
+    def get_users_by_ids(self, user_ids: list[str]) -> dict[str, User]:
+        """Users by ID in one pass. Unknown IDs are skipped."""
+        wanted = set(user_ids)
+        return {
+            u["id"]: User(**u) for u in self._data.get("users", [])
+            if u["id"] in wanted
+        }
+
+    def get_user_ids(self) -> list[str]:
+        """IDs of all users."""
+        return [u["id"] for u in self._data.get("users", [])]
+
     def create_user(self, user: User) -> User:
         """Create a new user."""
         user_dict = {
@@ -125,6 +239,7 @@ class DataStore:
         }
         self._data.setdefault("users", []).append(user_dict)
         self._save_data()
+        self._notify("user", user.id)
         return user
 
     def update_user_preferences(
@@ -147,6 +262,7 @@ class DataStore:
                 if preferred_hour_end is not None:
                     u["preferred_hour_end"] = preferred_hour_end
                 self._save_data()
+                self._notify("user", user_id)
                 return User(**u)
         return None
 
@@ -165,6 +281,20 @@ class DataStore:
         activities.sort(key=lambda x: x.timestamp, reverse=True)
         return activities[:limit]
 
+    def get_user_activity_batch(
+        self, user_ids: list[str], limit: int = 50
+    ) -> dict[str, list[UserActivity]]:
+        """Recent activity for many users in one pass (as get_user_activity)."""
+        wanted = set(user_ids)
+        grouped: dict[str, list[UserActivity]] = {user_id: [] for user_id in wanted}
+        for a in self._data.get("user_activity", []):
+            if a["user_id"] in wanted:
+                grouped[a["user_id"]].append(UserActivity(**a))
+        for activities in grouped.values():
+            activities.sort(key=lambda x: x.timestamp, reverse=True)
+            del activities[limit:]
+        return grouped
+
     def add_user_activity(self, activity: UserActivity) -> None:
         """Record a new user activity."""
         activity_dict = {
@@ -177,6 +307,24 @@ class DataStore:
         }
         self._data.setdefault("user_activity", []).append(activity_dict)
         self._save_data()
+        self._notify("activity", activity.user_id)
+
+    def get_activity_log(self) -> list[UserActivity]:
+        """All user activity, oldest first."""
+        activities = [UserActivity(**a) for a in self._data.get("user_activity", [])]
+        activities.sort(key=lambda x: x.timestamp)
+        return activities
+
+    def get_active_user_ids(self, limit: int = 100) -> list[str]:
+        """IDs of users with the most recent activity or feedback, newest first."""
+        last_seen: dict[str, str] = {}
+        for a in self._data.get("user_activity", []):
+            if a.get("timestamp", "") > last_seen.get(a["user_id"], ""):
+                last_seen[a["user_id"]] = a.get("timestamp", "")
+        for f in self._data.get("feedback", []):
+            if f.get("created_at", "") > last_seen.get(f["user_id"], ""):
+                last_seen[f["user_id"]] = f.get("created_at", "")
+        return sorted(last_seen, key=last_seen.get, reverse=True)[:limit]
 
     def get_user_keywords(self, user_id: str) -> list[str]:
         """
@@ -184,7 +332,11 @@ class DataStore:
 
         This is used to enrich the retrieval query.
         """
-        activities = self.get_user_activity(user_id, limit=20)
+        return self.keywords_from_activity(self.get_user_activity(user_id, limit=20))
+
+    @staticmethod
+    def keywords_from_activity(activities: list[UserActivity]) -> list[str]:
+        """Distinct keywords and search terms of the given activities."""
         keywords = []
         for activity in activities:
             keywords.extend(activity.keywords)
@@ -209,19 +361,57 @@ class DataStore:
         self._save_data()
 
         # Update candidate score based on feedback
-        score_deltas = {
-            "started": 1.0,
-            "replied": 0.5,
-            "dismissed": -0.3,
-            "ignored": -0.1,
-            "dont_show_like_this": -1.0
-        }
-        delta = score_deltas.get(feedback.action, 0)
+        delta = FEEDBACK_SCORE_DELTAS.get(feedback.action, 0)
         if delta != 0:
             self.update_candidate_score(feedback.candidate_id, delta)
 
+        self._notify("feedback", feedback.user_id)
+
         return Feedback(**feedback_dict)
 
+    def get_positive_feedback(
+        self, user_id: Optional[str] = None, limit: Optional[int] = None
+    ) -> list[tuple[str, str, str]]:
+        """
+        Positive engagements ("started", "replied") in time order.
+
+        Returns (user_id, candidate_id, action) tuples, for one user or
+        all users; with a limit, only the most recent ones.
+        """
+        positive_actions = {"started", "replied"}
+        records = [
+            f for f in self._data.get("feedback", [])
+            if f.get("action") in positive_actions
+            and (user_id is None or f["user_id"] == user_id)
+        ]
+        records.sort(key=lambda f: f.get("created_at", ""))
+        if limit is not None:
+            records = records[-limit:]
+        return [(f["user_id"], f["candidate_id"], f["action"]) for f in records]
+
+    def get_feedback_log(self) -> list[Feedback]:
+        """All feedback records, oldest first."""
+        records = [Feedback(**f) for f in self._data.get("feedback", [])]
+        records.sort(key=lambda f: f.created_at)
+        return records
+
+    def get_feedback_interactions(
+        self, user_id: Optional[str] = None
+    ) -> list[tuple[str, str, float]]:
+        """
+        Net feedback weight per (user, candidate), using FEEDBACK_SCORE_DELTAS.
+
+        Positive weights are engagement, negative ones rejection. Returns
+        (user_id, candidate_id, weight) tuples, for one user or all users.
+        """
+        weights: dict[tuple[str, str], float] = {}
+        for f in self._data.get("feedback", []):
+            if user_id is not None and f["user_id"] != user_id:
+                continue
+            key = (f["user_id"], f["candidate_id"])
+            weights[key] = weights.get(key, 0.0) + FEEDBACK_SCORE_DELTAS.get(f.get("action"), 0.0)
+        return [(u, c, w) for (u, c), w in weights.items() if w != 0]
+
     def get_shown_candidates(self, user_id: str) -> list[str]:
         """Get IDs of candidates already shown to this user."""
         return [
@@ -230,6 +420,15 @@ class DataStore:
             if f["user_id"] == user_id
         ]
 
+    def get_shown_candidates_batch(self, user_ids: list[str]) -> dict[str, list[str]]:
+        """IDs of candidates already shown, for many users in one pass."""
+        wanted = set(user_ids)
+        shown: dict[str, list[str]] = {user_id: [] for user_id in wanted}
+        for f in self._data.get("feedback", []):
+            if f["user_id"] in wanted:
+                shown[f["user_id"]].append(f["candidate_id"])
+        return shown
+
     def get_feedback_stats(self, user_id: str) -> dict:
         """Get aggregated feedback statistics for a user."""
         feedback_list = [
@@ -251,11 +450,14 @@ class DataStore:
 
     # Collaborative filtering operations
 
-    def find_similar_users(self, user_id: str, limit: int = 10) -> list[tuple[str, float]]:
+    def find_similar_users(
+        self, user_id: str, limit: Optional[int] = 10
+    ) -> list[tuple[str, float]]:
         """
         Find users with similar interests using Jaccard similarity.
 
-        Returns list of (user_id, similarity_score) tuples.
+        Returns list of (user_id, similarity_score) tuples; all users with
+        positive similarity when limit is None.
         """
         target_user = self.get_user(user_id)
         if not target_user:
@@ -0,0 +1,189 @@
+"""
+Diversity Reranking.
+
+Maximal Marginal Relevance (Carbonell & Goldstein): items are picked
+greedily by
+
+    lambda * relevance - (1 - lambda) * max similarity to items picked so far
+
+so a candidate that repeats what is already in the slate (shared
+keywords, or a nearby embedding) loses to a slightly less relevant but
+different one. lambda = 1 is pure relevance.
+
+Performance notes:
+- Only the top-M items by relevance are reranked (argpartition, no full
+  sort), so the cost is independent of the slate size.
+- Each item's max similarity to the picked set is updated incrementally:
+  picking one item costs one similarity row against the M candidates,
+  for O(M * k) similarity evaluations in total instead of O(M * k^2).
+- Reranked scores are the MMR objective rescaled to the relevance scale.
+  They never increase from one pick to the next, so sorting by score
+  keeps the MMR order (pagination and caches sort by score).
+
+Design for refactoring:
+- Similarity can come from any item embedding (e.g. a two-tower model)
+"""
+
+from typing import Callable, Optional
+
+import numpy as np
+
+from .cache import LRUCache
+from .embedding import EmbeddingRetriever, HashingEmbedder
+from .models import Candidate, ScoredCandidate
+
+SIMILARITIES = ("keywords", "embedding")
+
+
+class MMRReranker:
+    """
+    Incremental MMR over the top-M of a scored slate.
+
+    Usage:
+        mmr = MMRReranker(lambda_=0.7, top_m=50)
+        slate = mmr.rerank(scored, limit=10)
+    """
+
+    def __init__(
+        self,
+        lambda_: float = 0.7,
+        top_m: int = 50,
+        similarity: str = "keywords",
+        embedder: Optional[HashingEmbedder] = None,
+        vector_cache_size: int = 10000
+    ):
+        if not 0 < lambda_ <= 1:
+            raise ValueError("lambda_ must be in (0, 1]")
+        if similarity not in SIMILARITIES:
+            raise ValueError(f"Unknown similarity: {similarity}")
+        self.lambda_ = lambda_
+        self.top_m = top_m
+        self.similarity = similarity
+        self.embedder = embedder or (HashingEmbedder() if similarity == "embedding" else None)
+        # Candidate embeddings, computed on first use
+        self._vectors = LRUCache(max_entries=vector_cache_size)
+
+    @property
+    def penalty(self) -> float:
+        """Similarity penalty on the relevance scale: (1 - lambda) / lambda."""
+        return (1 - self.lambda_) / self.lambda_
+
+    def rerank(
+        self, scored: list[ScoredCandidate], limit: Optional[int] = None
+    ) -> list[ScoredCandidate]:
+        """
+        Reorder a scored slate (any order) for diversity.
+
+        Returns the top `limit` (all items if None) with diversity-adjusted
+        scores, best first.
+        """
+        if not scored:
+            return []
+        scores = np.fromiter((item.score for item in scored), dtype=np.float64, count=len(scored))
+        order, adjusted = self.rerank_scores(
+            scores, [item.candidate for item in scored], limit or len(scored)
+        )
+        result = []
+        for i, score in zip(order, adjusted):
+            item = scored[i]
+            item.score = float(score)
+            result.append(item)
+        return result
+
+    def rerank_scores(
+        self, scores: np.ndarray, candidates: list[Candidate], k: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Indices of the k items to show, in order, and their adjusted scores.
+
+        Items past the top-M (only reached when k > M) keep relevance
+        order, with scores capped at the last reranked score.
+        """
+        m = min(self.top_m, len(scores))
+        top = self._top(scores, m)
+        picked, adjusted = self.select(
+            scores[top], min(k, m), self.similarity_to([candidates[i] for i in top])
+        )
+        order = top[picked]
+        if k <= m:
+            return order, adjusted
+
+        rest = np.setdiff1d(np.arange(len(scores)), top, assume_unique=True)
+        rest = rest[np.lexsort((rest, -scores[rest]))][:k - m]
+        floor = adjusted[-1] if len(adjusted) else np.inf
+        return (
+            np.concatenate([order, rest]),
+            np.concatenate([adjusted, np.minimum(scores[rest], floor)])
+        )
+
+    def select(
+        self,
+        relevance: np.ndarray,
+        k: int,
+        similarity_to: Callable[[int], np.ndarray]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Greedy MMR over M items.
+
+        Args:
+            relevance: (M,) relevance scores, best first
+            k: Items to pick (<= M)
+            similarity_to: i -> (M,) similarity of item i to every item
+
+        Returns:
+            (picked positions, adjusted scores), in pick order
+        """
+        m = len(relevance)
+        max_similarity = np.zeros(m)
+        available = np.ones(m, dtype=bool)
+        picked = np.empty(k, dtype=np.int64)
+        adjusted = np.empty(k, dtype=np.float64)
+        for step in range(k):
+            objective = np.where(available, relevance - self.penalty * max_similarity, -np.inf)
+            # argmax takes the first maximum: ties go to the more relevant item
+            best = int(np.argmax(objective))
+            picked[step] = best
+            adjusted[step] = objective[best]
+            available[best] = False
+            if step + 1 < k:
+                np.maximum(max_similarity, similarity_to(best), out=max_similarity)
+        return picked, adjusted
+
+    def similarity_to(self, candidates: list[Candidate]) -> Callable[[int], np.ndarray]:
+        """Similarity row function over the given candidates."""
+        if self.similarity == "embedding":
+            vectors = self._embeddings(candidates)
+            return lambda i: vectors @ vectors[i]
+
+        keyword_sets = [frozenset(c.keywords) for c in candidates]
+
+        def jaccard(i: int) -> np.ndarray:
+            base = keyword_sets[i]
+            return np.fromiter(
+                (
+                    len(base & other) / len(base | other) if base or other else 0.0
+                    for other in keyword_sets
+                ),
+                dtype=np.float64, count=len(keyword_sets)
+            )
+        return jaccard
+
+    def _embeddings(self, candidates: list[Candidate]) -> np.ndarray:
+        """Embeddings (L2-normalized by the embedder), one row per candidate."""
+        missing = [c for c in candidates if self._vectors.get(c.id) is None]
+        if missing:
+            texts = [EmbeddingRetriever.candidate_text(c) for c in missing]
+            for c, vector in zip(missing, self.embedder.embed_batch(texts)):
+                self._vectors.set(c.id, vector)
+        return np.array([self._vectors.get(c.id) for c in candidates], dtype=np.float64)
+
+    @staticmethod
+    def _top(scores: np.ndarray, m: int) -> np.ndarray:
+        """Indices of the m best scores, best first (ties: earlier index)."""
+        if m < len(scores):
+            partition = np.argpartition(-scores, m - 1)[:m]
+            # Widen to every item tied with the m-th so ties break by index
+            top = np.flatnonzero(scores >= scores[partition].min())
+        else:
+            top = np.arange(len(scores))
+        return top[np.lexsort((top, -scores[top]))][:m]
@@ -0,0 +1,453 @@
+"""
+Dense Vector Retrieval.
+
+Implements fully offline embedding search: candidate text is embedded with
+a signed hashing vectorizer into a contiguous float32 matrix, which is
+searched with an IVF (inverted file) approximate nearest-neighbor index
+built with NumPy k-means.
+
+Performance notes:
+- Rows are stored grouped by IVF list, so probing a list is a matrix-vector
+  product over a contiguous slice, with no gather copies.
+- Vectors added after the build go to a preallocated tail buffer that
+  is searched exactly. Once the tail passes a fraction of the index it
+  is folded into the nearest lists, and once the index has doubled
+  since the centroids were trained it is re-clustered.
+
+Design for refactoring:
+- HashingEmbedder can be swapped for sentence-transformers embeddings
+- EmbeddingIndex can be replaced with FAISS, hnswlib or a vector database
+"""
+
+import hashlib
+import math
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from .models import Candidate, User
+from .data_store import DataStore
+from .text_similarity import TextSimilarity
+
+
+class HashingEmbedder:
+    """
+    Signed feature-hashing text embedder.
+
+    Unigrams and adjacent bigrams are hashed into `dim` buckets with a
+    stable hash (not Python's salted hash), so embeddings are identical
+    across processes and can be persisted.
+    """
+
+    def __init__(self, dim: int = 256, similarity: Optional[TextSimilarity] = None):
+        self.dim = dim
+        self.similarity = similarity or TextSimilarity()
+
+    def _features(self, text: str) -> Counter:
+        """Unigram and bigram counts of the tokenized text."""
+        tokens = self.similarity.tokenize(text)
+        features = Counter(tokens)
+        features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+        return features
+
+    def _bucket(self, feature: str) -> tuple[int, float]:
+        """Stable (bucket, sign) for a feature."""
+        digest = int.from_bytes(
+            hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little"
+        )
+        return digest % self.dim, (1.0 if digest >> 63 else -1.0)
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed one text as an L2-normalized float32 vector."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, count in self._features(text).items():
+            bucket, sign = self._bucket(feature)
+            # Sublinear TF keeps repeated words from dominating
+            vector[bucket] += sign * (1.0 + math.log(count))
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
+        """Embed many texts into a contiguous (n, dim) float32 matrix."""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            matrix[i] = self.embed(text)
+        return matrix
+
+
+class EmbeddingIndex:
+    """
+    IVF approximate nearest-neighbor index over normalized vectors.
+
+    Vectors are clustered into `n_lists` cells with k-means; a query scores
+    the centroids, then only the rows of the `nprobe` closest cells.
+    Scores are inner products, i.e. cosine similarity for unit vectors.
+
+    Usage:
+        index = EmbeddingIndex.build(ids, matrix)
+        index.search(query_vector, k=10, nprobe=8)
+    """
+
+    # The tail is folded into the lists once it holds more than this
+    # fraction of the clustered rows (and at least MIN_TAIL vectors)
+    TAIL_FRACTION = 0.1
+    MIN_TAIL = 256
+    # Re-cluster once the index has grown this much since training
+    RECLUSTER_GROWTH = 2.0
+
+    def __init__(
+        self,
+        ids: list[str],
+        vectors: np.ndarray,
+        centroids: np.ndarray,
+        list_offsets: np.ndarray,
+        trained_size: Optional[int] = None
+    ):
+        # Rows of `vectors` are grouped by list: list i owns rows
+        # list_offsets[i]:list_offsets[i + 1]
+        self.ids = ids
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.list_offsets = list_offsets
+        # Number of vectors the centroids were trained on
+        self.trained_size = trained_size if trained_size is not None else len(ids)
+        # Vectors added since the last compaction, searched exactly. Rows
+        # past len(_tail_ids) are unused capacity.
+        self._tail_ids: list[str] = []
+        self._tail_vectors = np.zeros((0, self.vectors.shape[1]), dtype=np.float32)
+        # Guards adds and compaction; searches only take it to snapshot
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids) + len(self._tail_ids)
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    @property
+    def all_ids(self) -> list[str]:
+        """IDs of every indexed vector, including ones added since the build."""
+        return self.ids + self._tail_ids
+
+    @classmethod
+    def build(
+        cls,
+        ids: list[str],
+        vectors: np.ndarray,
+        n_lists: Optional[int] = None,
+        iterations: int = 10,
+        sample_size: int = 50_000,
+        seed: int = 0
+    ) -> "EmbeddingIndex":
+        """
+        Cluster vectors into IVF lists and build the index.
+
+        Args:
+            ids: Identifier for each row of vectors
+            vectors: (n, dim) matrix of L2-normalized vectors
+            n_lists: Number of IVF cells (default: ~sqrt(n))
+            iterations: k-means iterations
+            sample_size: Max rows used to train centroids
+            seed: Random seed for reproducible builds
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        n = len(vectors)
+        if n_lists is None:
+            n_lists = max(1, int(math.sqrt(n)))
+        n_lists = max(1, min(n_lists, n))
+
+        rng = np.random.default_rng(seed)
+        train = vectors
+        if n > sample_size:
+            train = vectors[rng.choice(n, sample_size, replace=False)]
+
+        # Spherical k-means: assign by inner product, renormalize centroids
+        centroids = train[rng.choice(len(train), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(train @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, train)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            filled = norms[:, 0] > 0
+            centroids[filled] = sums[filled] / norms[filled]
+
+        assignment = cls._assign(vectors, centroids)
+        order = np.argsort(assignment, kind="stable")
+        counts = np.bincount(assignment, minlength=n_lists)
+        list_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+        return cls(
+            ids=[ids[i] for i in order],
+            vectors=vectors[order],
+            centroids=centroids,
+            list_offsets=list_offsets,
+            trained_size=n
+        )
+
+    @staticmethod
+    def _assign(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 65536) -> np.ndarray:
+        """Nearest centroid for each vector, in chunks to bound memory."""
+        assignment = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk):
+            block = vectors[start:start + chunk]
+            assignment[start:start + chunk] = np.argmax(block @ centroids.T, axis=1)
+        return assignment
+
+    def add(self, item_id: str, vector: np.ndarray) -> None:
+        """
+        Add a vector without rebuilding; it is searched exactly.
+
+        The tail buffer doubles when full, so adds are amortized O(dim).
+        Compacts the index once the tail passes its threshold.
+        """
+        with self._lock:
+            size = len(self._tail_ids)
+            if size == len(self._tail_vectors):
+                grown = np.empty((max(2 * size, 64), self.dim), dtype=np.float32)
+                grown[:size] = self._tail_vectors[:size]
+                self._tail_vectors = grown
+            # Write the row before publishing its ID to concurrent searches
+            self._tail_vectors[size] = vector
+            self._tail_ids.append(item_id)
+            if self._tail_is_full():
+                self._compact()
+
+    def compact(self) -> bool:
+        """Compact the index if the tail has passed its threshold; returns whether it did."""
+        with self._lock:
+            if not self._tail_is_full():
+                return False
+            self._compact()
+            return True
+
+    def _tail_is_full(self) -> bool:
+        return len(self._tail_ids) > max(self.MIN_TAIL, self.TAIL_FRACTION * len(self.ids))
+
+    def _compact(self) -> None:
+        """
+        Move the tail into the IVF lists; the caller holds the lock.
+
+        Tail vectors join their nearest list, keeping rows grouped by list.
+        If the index has outgrown the data the centroids were trained on,
+        everything is re-clustered instead.
+        """
+        size = len(self._tail_ids)
+        ids = self.ids + self._tail_ids
+        vectors = np.concatenate([self.vectors, self._tail_vectors[:size]])
+
+        if len(ids) >= self.RECLUSTER_GROWTH * self.trained_size:
+            rebuilt = self.build(ids, vectors)
+            ids, vectors = rebuilt.ids, rebuilt.vectors
+            centroids, list_offsets = rebuilt.centroids, rebuilt.list_offsets
+            self.trained_size = rebuilt.trained_size
+        else:
+            centroids = self.centroids
+            lists = np.concatenate((
+                np.repeat(np.arange(len(centroids)), np.diff(self.list_offsets)),
+                self._assign(self._tail_vectors[:size], centroids)
+            ))
+            # Stable, so existing rows keep their order within each list
+            order = np.argsort(lists, kind="stable")
+            ids = [ids[i] for i in order]
+            vectors = vectors[order]
+            counts = np.bincount(lists, minlength=len(centroids))
+            list_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+        self.ids, self.vectors = ids, vectors
+        self.centroids, self.list_offsets = centroids, list_offsets
+        self._tail_ids = []
+        self._tail_vectors = np.zeros((0, self.dim), dtype=np.float32)
+
+    def _snapshot(self) -> tuple:
+        """Consistent view of the index for a search running without the lock."""
+        with self._lock:
+            size = len(self._tail_ids)
+            return (
+                self.ids, self.vectors, self.centroids, self.list_offsets,
+                self._tail_ids[:size], self._tail_vectors[:size]
+            )
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        nprobe: int = 8
+    ) -> list[tuple[str, float]]:
+        """
+        Approximate top-k search.
+
+        Returns list of (id, score) pairs, sorted by score descending.
+        """
+        query = query.astype(np.float32, copy=False)
+        index_ids, vectors, centroids, list_offsets, tail_ids, tail_vectors = self._snapshot()
+        nprobe = min(nprobe, len(centroids))
+        centroid_scores = centroids @ query
+        probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+
+        ids: list[str] = []
+        scores: list[np.ndarray] = []
+        for cell in probe:
+            lo, hi = list_offsets[cell], list_offsets[cell + 1]
+            if hi > lo:
+                scores.append(vectors[lo:hi] @ query)
+                ids.extend(index_ids[lo:hi])
+        if tail_ids:
+            scores.append(tail_vectors @ query)
+            ids.extend(tail_ids)
+
+        if not scores:
+            return []
+        return self._top_k(ids, np.concatenate(scores), k)
+
+    def search_exact(self, query: np.ndarray, k: int = 10) -> list[tuple[str, float]]:
+        """Exact top-k search over every vector (for recall baselines)."""
+        query = query.astype(np.float32, copy=False)
+        ids, vectors, _, _, tail_ids, tail_vectors = self._snapshot()
+        scores = vectors @ query
+        if tail_ids:
+            scores = np.concatenate([scores, tail_vectors @ query])
+            ids = ids + tail_ids
+        return self._top_k(ids, scores, k)
+
+    @staticmethod
+    def _top_k(ids: list[str], scores: np.ndarray, k: int) -> list[tuple[str, float]]:
+        """Select the k best (id, score) pairs with argpartition."""
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[i], float(scores[i])) for i in top]
+
+    def save(self, path: str) -> None:
+        """Persist the index (including added vectors) to a .npz file."""
+        ids, vectors, centroids, list_offsets, tail_ids, tail_vectors = self._snapshot()
+        np.savez(
+            path,
+            ids=np.array(ids + tail_ids, dtype=str),
+            vectors=vectors,
+            tail_vectors=tail_vectors,
+            centroids=centroids,
+            list_offsets=list_offsets,
+            trained_size=np.int64(self.trained_size)
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "EmbeddingIndex":
+        """Load an index saved with save()."""
+        data = np.load(path, allow_pickle=False)
+        all_ids = [str(i) for i in data["ids"]]
+        n_built = len(data["vectors"])
+        index = cls(
+            ids=all_ids[:n_built],
+            vectors=data["vectors"],
+            centroids=data["centroids"],
+            list_offsets=data["list_offsets"],
+            # Files saved before compaction existed lack it
+            trained_size=int(data["trained_size"]) if "trained_size" in data.files else None
+        )
+        index._tail_ids = all_ids[n_built:]
+        index._tail_vectors = data["tail_vectors"]
+        return index
+
+
+class EmbeddingRetriever:
+    """
+    Retrieval source backed by dense candidate embeddings.
+
+    Embeds the user's interests and recent activity into a query vector
+    and returns the nearest candidates from the ANN index.
+    """
+
+    def __init__(
+        self,
+        data_store: DataStore,
+        embedder: Optional[HashingEmbedder] = None,
+        index_path: Optional[str] = None,
+        nprobe: int = 8
+    ):
+        self.data_store = data_store
+        self.embedder = embedder or HashingEmbedder()
+        self.index_path = Path(index_path) if index_path else None
+        self.nprobe = nprobe
+        self.index: Optional[EmbeddingIndex] = None
+
+    @staticmethod
+    def candidate_text(candidate: Candidate) -> str:
+        """Text used to embed a candidate."""
+        return f"{candidate.title} {candidate.summary} {' '.join(candidate.keywords)}"
+
+    def build(self) -> None:
+        """
+        Load the index from index_path if present, else build and save it.
+
+        Candidates missing from a loaded index are added incrementally, a
+        tail past its threshold is compacted, and the index is saved again
+        if either changed it. Files that cannot be loaded (e.g. from a
+        version that pickled the IDs) or that were built for another
+        embedding size are rebuilt.
+        """
+        candidates = self.data_store.get_all_candidates()
+        if not candidates:
+            self.index = None
+            return
+
+        if self.index_path and self.index_path.exists():
+            try:
+                index = EmbeddingIndex.load(str(self.index_path))
+            except (ValueError, KeyError, OSError):
+                index = None
+            if index is not None and index.dim == self.embedder.dim:
+                self.index = index
+                indexed = set(index.all_ids)
+                missing = [c for c in candidates if c.id not in indexed]
+                for candidate in missing:
+                    self.add_candidate(candidate)
+                # Tails saved before compaction existed can be large
+                compacted = self.index.compact()
+                if missing or compacted:
+                    self.index.save(str(self.index_path))
+                return
+
+        matrix = self.embedder.embed_batch([self.candidate_text(c) for c in candidates])
+        self.index = EmbeddingIndex.build([c.id for c in candidates], matrix)
+        if self.index_path:
+            self.index.save(str(self.index_path))
+
+    def add_candidate(self, candidate: Candidate) -> None:
+        """Embed and index a newly ingested candidate."""
+        vector = self.embedder.embed(self.candidate_text(candidate))
+        if self.index is None:
+            self.index = EmbeddingIndex.build([candidate.id], vector[np.newaxis, :])
+        else:
+            self.index.add(candidate.id, vector)
+
+    def user_query_text(self, user: User) -> str:
+        """Text describing what the user is interested in right now."""
+        parts = list(user.topics_of_interest)
+        for activity in self.data_store.get_user_activity(user.id, limit=10):
+            parts.extend(activity.keywords)
+            if activity.query:
+                parts.append(activity.query)
+        return " ".join(parts)
+
+    def retrieve(self, user: User, limit: int = 50) -> list[Candidate]:
+        """Get the candidates nearest to the user's interest embedding."""
+        if self.index is None:
+            return []
+
+        query = self.embedder.embed(self.user_query_text(user))
+        if not query.any():
+            return []
+
+        results = self.index.search(query, k=limit, nprobe=self.nprobe)
+        return self.data_store.get_candidates_by_ids(
+            [item_id for item_id, score in results if score > 0]
+        )
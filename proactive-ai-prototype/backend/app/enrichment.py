@@ -0,0 +1,174 @@
+"""
+Catalog Enrichment.
+
+Batch pipeline that runs ContentAnalyzer over the whole candidate catalog
+(topic extraction with corpus IDF, reading level, SimHash fingerprint) and
+writes the results back to the store as candidate features.
+
+Performance notes:
+- The IDF statistics are computed once in the parent and shipped to each
+  worker a single time through the pool initializer, not per task.
+- Candidates are sent in chunks of plain (id, title, summary, keywords)
+  tuples to keep pickling overhead small relative to the analysis work.
+- Results are written back with a single store save.
+
+Usage:
+    python -m app.enrichment [--workers 4] [--chunk-size 256] [--dry-run]
+
+Design for refactoring:
+- Can be moved to a task queue (Celery, RQ) or a Spark/Ray job
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+from .data_store import DataStore
+from .dedup import format_fingerprint
+from .models import Candidate
+from .text_similarity import ContentAnalyzer, TextSimilarity
+
+
+# (id, title, summary, keywords) - the only candidate fields workers need
+CandidateRow = tuple[str, str, str, list[str]]
+
+# Analyzer owned by each worker process, set by _init_worker
+_worker_analyzer: Optional[ContentAnalyzer] = None
+
+
+def candidate_text(title: str, summary: str, keywords: list[str]) -> str:
+    """Text used for topic extraction and corpus IDF."""
+    return f"{title} {summary} {' '.join(keywords)}"
+
+
+def _init_worker(document_frequencies: dict[str, int], num_documents: int) -> None:
+    """Pool initializer: build this process's analyzer from shared IDF."""
+    global _worker_analyzer
+    similarity = TextSimilarity()
+    similarity.load_index(document_frequencies, num_documents)
+    _worker_analyzer = ContentAnalyzer(similarity)
+
+
+def enrich_row(analyzer: ContentAnalyzer, row: CandidateRow, top_k: int = 5) -> dict:
+    """Compute the enrichment features for one candidate."""
+    _, title, summary, keywords = row
+    return {
+        "topics": analyzer.extract_topics(candidate_text(title, summary, keywords), top_k),
+        "reading_level": analyzer.compute_reading_level(summary),
+        "fingerprint": format_fingerprint(
+            analyzer.compute_simhash(f"{title} {summary}")
+        )
+    }
+
+
+def _enrich_chunk(chunk: list[CandidateRow]) -> list[tuple[str, dict]]:
+    """Worker task: enrich a chunk of candidates."""
+    return [(row[0], enrich_row(_worker_analyzer, row)) for row in chunk]
+
+
+@dataclass
+class EnrichmentReport:
+    """Outcome and throughput of an enrichment run."""
+    documents: int
+    workers: int
+    chunk_size: int
+    seconds: float
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.documents / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "documents": self.documents,
+            "workers": self.workers,
+            "chunk_size": self.chunk_size,
+            "seconds": round(self.seconds, 3),
+            "docs_per_second": round(self.docs_per_second, 1)
+        }
+
+
+class CatalogEnricher:
+    """
+    Parallel ContentAnalyzer pass over a candidate catalog.
+
+    Usage:
+        enricher = CatalogEnricher(workers=4)
+        features, report = enricher.enrich(candidates)
+        data_store.update_candidate_features(features)
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 256):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def enrich(
+        self, candidates: list[Candidate]
+    ) -> tuple[dict[str, dict], EnrichmentReport]:
+        """
+        Enrich candidates, in parallel when workers > 1.
+
+        Returns (candidate ID -> features, report).
+        """
+        start = time.perf_counter()
+        rows = [(c.id, c.title, c.summary, list(c.keywords)) for c in candidates]
+
+        # IDF is corpus-wide, so it is computed once before fanning out
+        similarity = TextSimilarity()
+        similarity.build_index([candidate_text(*row[1:]) for row in rows])
+        document_frequencies, num_documents = similarity.export_index()
+
+        features: dict[str, dict] = {}
+        workers = 1 if self.workers == 1 or len(rows) <= self.chunk_size else self.workers
+        if workers == 1:
+            analyzer = ContentAnalyzer(similarity)
+            for row in rows:
+                features[row[0]] = enrich_row(analyzer, row)
+        else:
+            chunks = [
+                rows[i:i + self.chunk_size]
+                for i in range(0, len(rows), self.chunk_size)
+            ]
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(document_frequencies, num_documents)
+            ) as pool:
+                for results in pool.map(_enrich_chunk, chunks):
+                    features.update(results)
+
+        report = EnrichmentReport(
+            documents=len(rows),
+            workers=workers,
+            chunk_size=self.chunk_size,
+            seconds=time.perf_counter() - start
+        )
+        return features, report
+
+    def run(self, data_store: DataStore, write: bool = True) -> EnrichmentReport:
+        """Enrich the store's whole catalog and write features back."""
+        features, report = self.enrich(data_store.get_all_candidates())
+        if write and features:
+            data_store.update_candidate_features(features)
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enrich the candidate catalog.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Compute features without writing them back")
+    args = parser.parse_args()
+
+    enricher = CatalogEnricher(workers=args.workers, chunk_size=args.chunk_size)
+    report = enricher.run(DataStore(), write=not args.dry_run)
+    print(report.to_dict())
+
+
+if __name__ == "__main__":
+    main()
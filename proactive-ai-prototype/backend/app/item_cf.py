@@ -0,0 +1,270 @@
+"""
+Item-Item Collaborative Filtering.
+
+Offline co-occurrence model: two candidates are neighbors when the same
+users engaged positively with both. Co-engagement counts are normalized
+(cosine or Jaccard) and only the top-K neighbors of each item are kept,
+in a CSR-style sparse layout persisted to a .npz file.
+
+Online scoring is a sparse lookup: the neighbor lists of the user's
+recent positives are summed, weighted by how strong each engagement was.
+
+Performance notes:
+- Building counts item pairs per user, so cost grows with the square of
+  each user's positives; users are capped to their most recent ones.
+- Scoring touches only K neighbors per recent positive, independent of
+  the number of users.
+
+Usage:
+    python -m app.item_cf [--output data/item_cf.npz] [--top-k 50]
+
+Design for refactoring:
+- Can be replaced with scipy.sparse or an ALS/two-tower model
+- The build can move to a scheduled batch job writing the same file
+"""
+
+import argparse
+import heapq
+import math
+import time
+from collections import Counter, defaultdict
+from typing import Iterable, Optional
+
+import numpy as np
+
+from .data_store import DataStore
+
+# Positive engagement strength, as in DataStore.record_feedback's deltas
+ACTION_WEIGHTS = {"started": 1.0, "replied": 0.5}
+
+NORMALIZATIONS = ("cosine", "jaccard")
+
+
+class ItemCooccurrenceModel:
+    """
+    Top-K item neighbors from co-engagement.
+
+    Item i's neighbors are neighbor_ids[indptr[i]:indptr[i + 1]] (indices
+    into item_ids) with similarities in the same slice of weights, sorted
+    by similarity descending.
+
+    Usage:
+        model = ItemCooccurrenceModel.build([(user_id, candidate_id), ...])
+        scores = model.score({"cand-1": 1.0, "cand-7": 0.5}, limit=50)
+    """
+
+    def __init__(
+        self,
+        item_ids: list[str],
+        indptr: np.ndarray,
+        neighbor_ids: np.ndarray,
+        weights: np.ndarray,
+        normalization: str = "cosine",
+        built_at: float = 0.0
+    ):
+        self.item_ids = item_ids
+        self.row_of = {item_id: i for i, item_id in enumerate(item_ids)}
+        self.indptr = indptr
+        self.neighbor_ids = neighbor_ids
+        self.weights = weights
+        self.normalization = normalization
+        self.built_at = built_at
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    @property
+    def num_pairs(self) -> int:
+        """Stored (item, neighbor) pairs."""
+        return len(self.neighbor_ids)
+
+    @classmethod
+    def build(
+        cls,
+        engagements: Iterable[tuple[str, str]],
+        top_k: int = 50,
+        normalization: str = "cosine",
+        max_items_per_user: int = 200
+    ) -> "ItemCooccurrenceModel":
+        """
+        Build the model from (user_id, candidate_id) positive engagements.
+
+        Engagements should be in time order; each user contributes at most
+        their last max_items_per_user distinct items.
+        """
+        if normalization not in NORMALIZATIONS:
+            raise ValueError(f"Unknown normalization: {normalization}")
+
+        # Distinct items per user, most recent last
+        baskets: dict[str, dict[str, None]] = defaultdict(dict)
+        for user_id, candidate_id in engagements:
+            basket = baskets[user_id]
+            basket.pop(candidate_id, None)
+            basket[candidate_id] = None
+
+        code_of: dict[str, int] = {}
+        item_counts: Counter = Counter()
+        pair_counts: Counter = Counter()
+        for basket in baskets.values():
+            codes = sorted(
+                code_of.setdefault(item, len(code_of))
+                for item in list(basket)[-max_items_per_user:]
+            )
+            item_counts.update(codes)
+            for a in range(len(codes)):
+                for b in range(a + 1, len(codes)):
+                    pair_counts[(codes[a], codes[b])] += 1
+        item_ids = sorted(code_of, key=code_of.get)
+
+        # Normalized similarity for both directions of each pair
+        neighbors: list[list[tuple[float, int]]] = [[] for _ in item_ids]
+        for (a, b), together in pair_counts.items():
+            if normalization == "cosine":
+                similarity = together / math.sqrt(item_counts[a] * item_counts[b])
+            else:
+                similarity = together / (item_counts[a] + item_counts[b] - together)
+            neighbors[a].append((similarity, b))
+            neighbors[b].append((similarity, a))
+
+        indptr = [0]
+        neighbor_ids: list[int] = []
+        weights: list[float] = []
+        for i, candidates in enumerate(neighbors):
+            # Ties break by neighbor id so builds are reproducible
+            for similarity, j in heapq.nsmallest(
+                top_k, candidates, key=lambda pair: (-pair[0], item_ids[pair[1]])
+            ):
+                neighbor_ids.append(j)
+                weights.append(similarity)
+            indptr.append(len(neighbor_ids))
+
+        return cls(
+            item_ids=item_ids,
+            indptr=np.array(indptr, dtype=np.int64),
+            neighbor_ids=np.array(neighbor_ids, dtype=np.int32),
+            weights=np.array(weights, dtype=np.float32),
+            normalization=normalization,
+            built_at=time.time()
+        )
+
+    def neighbors(self, item_id: str) -> list[tuple[str, float]]:
+        """Top-K neighbors of an item with their similarities."""
+        row = self.row_of.get(item_id)
+        if row is None:
+            return []
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return [
+            (self.item_ids[j], float(w))
+            for j, w in zip(self.neighbor_ids[start:end], self.weights[start:end])
+        ]
+
+    def score(
+        self,
+        positives: dict[str, float],
+        exclude: Optional[set[str]] = None,
+        limit: int = 50
+    ) -> list[tuple[str, float]]:
+        """
+        Items similar to a user's positives, best first.
+
+        Args:
+            positives: candidate_id -> engagement weight
+            exclude: Candidate IDs to leave out (e.g. already shown)
+            limit: Max results
+
+        Returns:
+            (candidate_id, summed weighted similarity) tuples
+        """
+        rows = [self.row_of[item] for item in positives if item in self.row_of]
+        if not rows:
+            return []
+
+        starts = self.indptr[rows]
+        lengths = self.indptr[np.array(rows) + 1] - starts
+        if not lengths.sum():
+            return []
+        slices = np.concatenate([
+            np.arange(start, start + length) for start, length in zip(starts, lengths)
+        ])
+        row_weights = np.repeat(
+            np.array([positives[self.item_ids[r]] for r in rows], dtype=np.float32), lengths
+        )
+        totals = np.bincount(
+            self.neighbor_ids[slices],
+            weights=self.weights[slices] * row_weights,
+            minlength=len(self.item_ids)
+        )
+
+        exclude = set(positives) | (exclude or set())
+        scored = [
+            (self.item_ids[j], float(totals[j]))
+            for j in np.flatnonzero(totals)
+            if self.item_ids[j] not in exclude
+        ]
+        scored.sort(key=lambda pair: (-pair[1], pair[0]))
+        return scored[:limit]
+
+    def save(self, path: str) -> None:
+        """Persist the model to a .npz file."""
+        np.savez(
+            path,
+            item_ids=np.array(self.item_ids, dtype=str),
+            indptr=self.indptr,
+            neighbor_ids=self.neighbor_ids,
+            weights=self.weights,
+            normalization=np.array(self.normalization),
+            built_at=np.array(self.built_at)
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "ItemCooccurrenceModel":
+        """Load a model saved with save()."""
+        data = np.load(path, allow_pickle=False)
+        return cls(
+            item_ids=[str(i) for i in data["item_ids"]],
+            indptr=data["indptr"],
+            neighbor_ids=data["neighbor_ids"],
+            weights=data["weights"],
+            normalization=str(data["normalization"]),
+            built_at=float(data["built_at"])
+        )
+
+    def stats(self) -> dict:
+        """Model size and age."""
+        return {
+            "items": len(self),
+            "pairs": self.num_pairs,
+            "normalization": self.normalization,
+            "built_at": self.built_at
+        }
+
+
+def build_from_store(
+    data_store: DataStore,
+    top_k: int = 50,
+    normalization: str = "cosine"
+) -> ItemCooccurrenceModel:
+    """Build the model from all positive feedback in the store."""
+    return ItemCooccurrenceModel.build(
+        ((user_id, candidate_id) for user_id, candidate_id, _ in data_store.get_positive_feedback()),
+        top_k=top_k,
+        normalization=normalization
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the item-item CF model")
+    parser.add_argument("--output", default="data/item_cf.npz")
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--normalization", choices=NORMALIZATIONS, default="cosine")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    model = build_from_store(DataStore(), args.top_k, args.normalization)
+    model.save(args.output)
+    print(f"Built item-item model: {len(model):,} items, {model.num_pairs:,} pairs "
+          f"in {time.perf_counter() - start:.2f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
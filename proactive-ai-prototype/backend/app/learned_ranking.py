@@ -0,0 +1,527 @@
+"""
+Learned Ranking.
+
+Logistic regression trained on the feedback log to replace the
+hand-set weights of RankingService's heuristic. Each feedback record
+is one example: the candidate shown, the user's state at that moment,
+and whether they engaged ("started" / "replied").
+
+Features (unweighted versions of the heuristic's components, so the
+same arrays feed both rankers):
+- interest: keyword overlap with the user's interests (capped at 3)
+- activity: keyword overlap with recent activity (capped at 5)
+- cf: collaborative filtering score
+- engagement: candidate engagement score (capped at 5)
+- recency: 1 - age in days / 30
+- hour_sin, hour_cos, preferred_hour: time of day and whether it falls
+  in the user's preferred window
+- one indicator per category
+
+Training features are computed as of each feedback event, so nothing
+from the future leaks into an example: activity is limited to what came
+before, engagement has later feedback deltas subtracted, and CF comes
+from an item-item model built on an earlier history window only.
+
+Performance notes:
+- Feature standardization is folded into the weights at load time, so
+  inference is one (n x 5) matrix-vector product plus a per-category
+  weight lookup and a per-request constant for the time features.
+- Training solves the regularized problem with Newton steps (IRLS);
+  with a dozen features each step is one small linear solve.
+
+Usage:
+    python -m app.learned_ranking [--output data/ranker.npz] [--l2 1.0]
+
+Design for refactoring:
+- A small GBDT can be trained on the same TrainingSet and served with
+  the same score() signature
+"""
+
+import argparse
+import bisect
+import json
+import math
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from .data_store import DataStore, FEEDBACK_SCORE_DELTAS
+from .item_cf import ACTION_WEIGHTS, ItemCooccurrenceModel
+from .models import User
+
+# Heuristic weight of each component; dividing by it recovers the feature
+COMPONENT_WEIGHTS = {
+    "interest": 0.35,
+    "activity": 0.25,
+    "cf": 0.15,
+    "engagement": 0.10,
+    "recency": 0.10
+}
+BASE_FEATURES = tuple(COMPONENT_WEIGHTS)
+# Minimum heuristic score for a proactive suggestion
+HEURISTIC_SUGGESTION_THRESHOLD = 0.5
+CONTEXT_FEATURES = ("hour_sin", "hour_cos", "preferred_hour")
+
+SECONDS_PER_DAY = 86400.0
+
+
+def parse_time(value: str) -> Optional[datetime]:
+    """ISO timestamp as a local naive datetime, or None if unparsable."""
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (ValueError, AttributeError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def context_features(hour: int, user: User) -> np.ndarray:
+    """Time-of-day features for a request or feedback event."""
+    angle = 2 * math.pi * hour / 24
+    preferred = user.preferred_hour_start <= hour < user.preferred_hour_end
+    return np.array([math.sin(angle), math.cos(angle), float(preferred)])
+
+
+def calibrate_suggestion_threshold(heuristic_top: np.ndarray, learned_top: np.ndarray) -> float:
+    """
+    Learned-score bar for proactive suggestions.
+
+    Given each user's top recommendation score under the heuristic and
+    under the learned ranker, returns the lowest learned score that no
+    larger a share of users clears than clear the heuristic's bar (1.0
+    if none do). Ties are common at the top, so this is not a quantile.
+    """
+    passing = float(np.mean(heuristic_top >= HEURISTIC_SUGGESTION_THRESHOLD)) if len(heuristic_top) else 0.0
+    if not passing:
+        return 1.0
+    values = np.sort(learned_top)
+    # Share of users at or above each distinct score
+    distinct, first = np.unique(values, return_index=True)
+    clearing = 1 - first / len(values)
+    eligible = distinct[clearing <= passing]
+    return float(eligible[0]) if len(eligible) else 1.0
+
+
+def roc_auc(labels: np.ndarray, scores: np.ndarray) -> float:
+    """Area under the ROC curve (ties count half); 0.5 if one class only."""
+    positives = int(labels.sum())
+    negatives = len(labels) - positives
+    if not positives or not negatives:
+        return 0.5
+    # Average ranks over ties
+    _, inverse = np.unique(scores, return_inverse=True)
+    counts = np.bincount(inverse)
+    upper = np.cumsum(counts)
+    average_rank = upper - (counts - 1) / 2
+    ranks = average_rank[inverse]
+    return float((ranks[labels == 1].sum() - positives * (positives + 1) / 2)
+                 / (positives * negatives))
+
+
+def log_loss(labels: np.ndarray, probabilities: np.ndarray) -> float:
+    """Mean binary cross-entropy."""
+    p = np.clip(probabilities, 1e-7, 1 - 1e-7)
+    return float(-np.mean(labels * np.log(p) + (1 - labels) * np.log(1 - p)))
+
+
+class LearnedRanker:
+    """
+    Logistic regression over ranking features.
+
+    Weights are stored for standardized features (as trained); the
+    serving weights have the standardization folded in.
+
+    Scores are probabilities, not on the heuristic's scale, so the bar
+    for a proactive suggestion is stored with the model as
+    suggestion_threshold: the positive rate until calibrated against the
+    heuristic on real slates (see calibrate_suggestion_threshold).
+
+    Usage:
+        ranker = LearnedRanker.load(path)
+        scores = ranker.score(base, category_codes, category_names, hour, user)
+    """
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        bias: float,
+        mean: np.ndarray,
+        scale: np.ndarray,
+        categories: list[str],
+        trained_at: float = 0.0,
+        metrics: Optional[dict] = None,
+        suggestion_threshold: float = HEURISTIC_SUGGESTION_THRESHOLD
+    ):
+        self.weights = weights
+        self.bias = bias
+        self.mean = mean
+        self.scale = scale
+        self.categories = categories
+        self.trained_at = trained_at
+        self.metrics = metrics or {}
+        self.suggestion_threshold = suggestion_threshold
+
+        raw = weights / scale
+        n_base, n_context = len(BASE_FEATURES), len(CONTEXT_FEATURES)
+        self._base_weights = raw[:n_base]
+        self._context_weights = raw[n_base:n_base + n_context]
+        self._category_weight = dict(zip(categories, raw[n_base + n_context:]))
+        self._intercept = float(bias - raw @ mean)
+
+    @property
+    def feature_names(self) -> list[str]:
+        """Column names of the training design matrix."""
+        return [*BASE_FEATURES, *CONTEXT_FEATURES, *(f"category:{c}" for c in self.categories)]
+
+    def score(
+        self,
+        base: np.ndarray,
+        category_codes: np.ndarray,
+        category_names: list[str],
+        hour: int,
+        user: User
+    ) -> np.ndarray:
+        """
+        Engagement probability for each candidate in a slate.
+
+        Args:
+            base: (n, 5) unweighted components, columns as BASE_FEATURES
+            category_codes: (n,) indices into category_names
+            category_names: Category of each code; unknown ones weigh 0
+            hour: Local hour of the request
+            user: The user being ranked for
+        """
+        lookup = np.fromiter(
+            (self._category_weight.get(name, 0.0) for name in category_names),
+            dtype=np.float64, count=len(category_names)
+        )
+        logits = (
+            base @ self._base_weights
+            + lookup[category_codes]
+            + (self._intercept + context_features(hour, user) @ self._context_weights)
+        )
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def save(self, path: str) -> None:
+        """Persist the model to a .npz file."""
+        np.savez(
+            path,
+            weights=self.weights,
+            bias=np.array(self.bias),
+            mean=self.mean,
+            scale=self.scale,
+            categories=np.array(self.categories, dtype=str),
+            trained_at=np.array(self.trained_at),
+            metrics=np.array(json.dumps(self.metrics)),
+            suggestion_threshold=np.array(self.suggestion_threshold)
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "LearnedRanker":
+        """Load a model saved with save()."""
+        data = np.load(path, allow_pickle=False)
+        return cls(
+            weights=data["weights"],
+            bias=float(data["bias"]),
+            mean=data["mean"],
+            scale=data["scale"],
+            categories=[str(c) for c in data["categories"]],
+            trained_at=float(data["trained_at"]),
+            metrics=json.loads(str(data["metrics"])),
+            suggestion_threshold=float(data["suggestion_threshold"])
+        )
+
+    def stats(self) -> dict:
+        """Weights by feature, validation metrics and age."""
+        return {
+            "weights": {
+                name: round(float(w), 4)
+                for name, w in zip(self.feature_names, self.weights)
+            },
+            "metrics": self.metrics,
+            "suggestion_threshold": round(self.suggestion_threshold, 4),
+            "trained_at": self.trained_at
+        }
+
+
+@dataclass
+class TrainingSet:
+    """Point-in-time examples built from the feedback log, oldest first."""
+    base: np.ndarray
+    context: np.ndarray
+    categories: list[str]
+    labels: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def design_matrix(self, categories: list[str]) -> np.ndarray:
+        """Features with one indicator column per category."""
+        column = {c: i for i, c in enumerate(categories)}
+        indicators = np.zeros((len(self), len(categories)))
+        for row, category in enumerate(self.categories):
+            if category in column:
+                indicators[row, column[category]] = 1.0
+        return np.hstack([self.base, self.context, indicators])
+
+
+@dataclass
+class RankerReport:
+    """Outcome of a training run, with held-out metrics."""
+    examples: int
+    positives: int
+    validation_examples: int
+    auc: float
+    heuristic_auc: float
+    log_loss: float
+    seconds: float
+
+    def to_dict(self) -> dict:
+        return {
+            "examples": self.examples,
+            "positives": self.positives,
+            "validation_examples": self.validation_examples,
+            "auc": round(self.auc, 4),
+            "heuristic_auc": round(self.heuristic_auc, 4),
+            "log_loss": round(self.log_loss, 4),
+            "seconds": round(self.seconds, 3)
+        }
+
+
+class RankerTrainer:
+    """
+    Builds point-in-time examples from a store and fits the ranker.
+
+    The oldest history_fraction of feedback only seeds the CF model and
+    popularity; the rest become examples, of which the newest
+    validation_fraction is held out to report metrics before the final
+    fit on all examples.
+
+    Usage:
+        model, report = RankerTrainer().fit(data_store)
+    """
+
+    def __init__(
+        self,
+        l2: float = 1.0,
+        iterations: int = 25,
+        history_fraction: float = 0.2,
+        validation_fraction: float = 0.2,
+        min_examples: int = 50,
+        recent_positives: int = 20
+    ):
+        self.l2 = l2
+        self.iterations = iterations
+        self.history_fraction = history_fraction
+        self.validation_fraction = validation_fraction
+        self.min_examples = min_examples
+        self.recent_positives = recent_positives
+
+    def fit(self, data_store: DataStore) -> tuple[LearnedRanker, RankerReport]:
+        """
+        Train on the store's feedback log.
+
+        Raises ValueError if there are too few examples or only one class.
+        """
+        start = time.perf_counter()
+        examples = self.build_examples(data_store)
+        positives = int(examples.labels.sum())
+        if len(examples) < self.min_examples or positives in (0, len(examples)):
+            raise ValueError(
+                f"Not enough feedback to train: {len(examples)} examples, {positives} positive"
+            )
+
+        categories = sorted(set(examples.categories))
+        x = examples.design_matrix(categories)
+        y = examples.labels
+
+        split = int(len(examples) * (1 - self.validation_fraction))
+        mean, scale = self._standardization(x[:split])
+        weights, bias = self._fit_logistic((x[:split] - mean) / scale, y[:split])
+        probabilities = 1.0 / (1.0 + np.exp(-(((x[split:] - mean) / scale) @ weights + bias)))
+        heuristic = examples.base[split:] @ np.array(list(COMPONENT_WEIGHTS.values()))
+
+        mean, scale = self._standardization(x)
+        weights, bias = self._fit_logistic((x - mean) / scale, y)
+        report = RankerReport(
+            examples=len(examples),
+            positives=positives,
+            validation_examples=len(examples) - split,
+            auc=roc_auc(y[split:], probabilities),
+            heuristic_auc=roc_auc(y[split:], heuristic),
+            log_loss=log_loss(y[split:], probabilities),
+            seconds=time.perf_counter() - start
+        )
+        model = LearnedRanker(
+            weights, bias, mean, scale, categories,
+            trained_at=time.time(),
+            metrics={k: v for k, v in report.to_dict().items() if k != "seconds"},
+            # Above-average engagement probability, until calibrated
+            suggestion_threshold=positives / len(examples)
+        )
+        return model, report
+
+    def build_examples(self, data_store: DataStore) -> TrainingSet:
+        """One example per feedback record after the history window."""
+        feedback = [
+            (f, parse_time(f.created_at)) for f in data_store.get_feedback_log()
+        ]
+        feedback = [(f, t) for f, t in feedback if t is not None]
+        candidates = {c.id: c for c in data_store.get_all_candidates()}
+        users = data_store.get_users_by_ids(list({f.user_id for f, _ in feedback}))
+
+        # Engagement before each event: current score minus the deltas of
+        # that event and everything after it
+        engagement_before = [0.0] * len(feedback)
+        running = {cid: c.engagement_score for cid, c in candidates.items()}
+        for i in range(len(feedback) - 1, -1, -1):
+            f = feedback[i][0]
+            if f.candidate_id in running:
+                running[f.candidate_id] -= FEEDBACK_SCORE_DELTAS.get(f.action, 0.0)
+                engagement_before[i] = running[f.candidate_id]
+
+        # Activity per user, oldest first, for as-of lookups
+        activity_times: dict[str, list[datetime]] = {}
+        activity_log: dict[str, list] = {}
+        for activity in data_store.get_activity_log():
+            when = parse_time(activity.timestamp)
+            if when is not None:
+                activity_times.setdefault(activity.user_id, []).append(when)
+                activity_log.setdefault(activity.user_id, []).append(activity)
+        for user_id, times in activity_times.items():
+            order = sorted(range(len(times)), key=times.__getitem__)
+            activity_times[user_id] = [times[i] for i in order]
+            activity_log[user_id] = [activity_log[user_id][i] for i in order]
+
+        # CF and popularity come from the history window only
+        history = int(len(feedback) * self.history_fraction)
+        cf_model = ItemCooccurrenceModel.build(
+            (f.user_id, f.candidate_id) for f, _ in feedback[:history]
+            if f.action in ACTION_WEIGHTS
+        )
+        popular = Counter(
+            f.candidate_id for f, _ in feedback[:history] if f.action in ACTION_WEIGHTS
+        ).most_common(20)
+        max_popular = popular[0][1] if popular else 0
+        popularity = {cid: count / max_popular * 0.3 for cid, count in popular}
+
+        recent: dict[str, deque] = {}
+        cf_cache: dict[str, dict[str, float]] = {}
+        base, context, categories, labels = [], [], [], []
+        for i, (f, when) in enumerate(feedback):
+            candidate = candidates.get(f.candidate_id)
+            user = users.get(f.user_id)
+            if i >= history and candidate is not None and user is not None:
+                keywords = set(candidate.keywords)
+                interest = min(len(keywords & set(user.topics_of_interest)) / 3, 1.0)
+
+                times = activity_times.get(f.user_id, [])
+                before = activity_log.get(f.user_id, [])[:bisect.bisect_left(times, when)]
+                activity_keywords = set()
+                for a in before[-10:]:
+                    activity_keywords.update(a.keywords)
+                    if a.query:
+                        activity_keywords.update(a.query.lower().split())
+                activity = min(len(keywords & activity_keywords) / 5, 1.0)
+
+                if f.user_id not in cf_cache:
+                    cf_cache[f.user_id] = self._cf_scores(
+                        cf_model, recent.get(f.user_id, ()), popularity
+                    )
+                cf = cf_cache[f.user_id].get(f.candidate_id, 0.0)
+
+                engagement = min(engagement_before[i] / 5, 1.0)
+                created = parse_time(candidate.created_at)
+                recency = 0.0
+                if created is not None:
+                    days = math.floor((when - created).total_seconds() / SECONDS_PER_DAY)
+                    recency = max(0, 1 - days / 30)
+
+                base.append((interest, activity, cf, engagement, recency))
+                context.append(context_features(when.hour, user))
+                categories.append(candidate.category)
+                labels.append(1.0 if f.action in ACTION_WEIGHTS else 0.0)
+
+            if f.action in ACTION_WEIGHTS:
+                recent.setdefault(f.user_id, deque(maxlen=self.recent_positives)).append(
+                    (f.candidate_id, ACTION_WEIGHTS[f.action])
+                )
+                cf_cache.pop(f.user_id, None)
+
+        return TrainingSet(
+            base=np.array(base, dtype=np.float64).reshape(-1, len(BASE_FEATURES)),
+            context=np.array(context, dtype=np.float64).reshape(-1, len(CONTEXT_FEATURES)),
+            categories=categories,
+            labels=np.array(labels, dtype=np.float64)
+        )
+
+    @staticmethod
+    def _cf_scores(
+        model: ItemCooccurrenceModel, recent, popularity: dict[str, float]
+    ) -> dict[str, float]:
+        """CF scores like CollaborativeFilteringService, from earlier positives."""
+        positives: dict[str, float] = {}
+        for candidate_id, weight in recent:
+            positives[candidate_id] = positives.get(candidate_id, 0.0) + weight
+        scores: dict[str, float] = {}
+        engaged = model.score(positives, limit=50) if positives else []
+        if engaged:
+            max_score = max(score for _, score in engaged)
+            for candidate_id, score in engaged:
+                scores[candidate_id] = score / max_score if max_score > 0 else 0
+        for candidate_id, pop_score in popularity.items():
+            scores[candidate_id] = scores.get(candidate_id, 0) + pop_score
+        return scores
+
+    @staticmethod
+    def _standardization(x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Column means and scales (1 for constant columns)."""
+        mean = x.mean(axis=0)
+        scale = x.std(axis=0)
+        scale[scale == 0] = 1.0
+        return mean, scale
+
+    def _fit_logistic(self, x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, float]:
+        """L2-regularized logistic regression by Newton's method."""
+        design = np.hstack([x, np.ones((len(x), 1))])
+        penalty = self.l2 * np.eye(design.shape[1])
+        penalty[-1, -1] = 0.0  # Bias is not regularized
+        w = np.zeros(design.shape[1])
+        for _ in range(self.iterations):
+            p = 1.0 / (1.0 + np.exp(-(design @ w)))
+            gradient = design.T @ (p - y) + penalty @ w
+            hessian = (design.T * (p * (1 - p))) @ design + penalty
+            step = np.linalg.solve(hessian + 1e-9 * np.eye(len(w)), gradient)
+            w -= step
+            if np.abs(step).max() < 1e-6:
+                break
+        return w[:-1], float(w[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the learned ranker on feedback")
+    parser.add_argument("--output", default="data/ranker.npz")
+    parser.add_argument("--l2", type=float, default=1.0)
+    parser.add_argument("--history-fraction", type=float, default=0.2)
+    args = parser.parse_args()
+
+    # Imported here: the recommendation module imports this one
+    from .recommendation import RecommendationEngine
+
+    data_store = DataStore()
+    trainer = RankerTrainer(l2=args.l2, history_fraction=args.history_fraction)
+    model, report = trainer.fit(data_store)
+    RecommendationEngine(data_store).calibrate_suggestions(
+        model, data_store.get_active_user_ids(limit=100)
+    )
+    model.save(args.output)
+    print(report.to_dict())
+
+
+if __name__ == "__main__":
+    main()
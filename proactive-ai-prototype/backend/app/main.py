@@ -10,26 +10,49 @@ API Endpoints:
 - POST /api/feedback - Record user feedback
 - GET /api/user/{user_id} - Get user profile
 - PUT /api/preferences - Update user preferences
+- GET /api/health/live - Liveness probe
+- GET /api/health/ready - Readiness probe (search indexes built)
 
 To run:
     uvicorn app.main:app --reload --port 8000
 """
 
+import asyncio
 from datetime import datetime
+import json
+from pathlib import Path
+import time
 from typing import Optional
 import uuid
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 from .data_store import DataStore
-from .recommendation import RecommendationEngine
+from .embedding import EmbeddingRetriever
+from .item_cf import ItemCooccurrenceModel, build_from_store as build_item_cf_model
+from .als import ALSTrainer, FactorModel, train_from_store as train_als_model
+from .precompute import PrecomputedRecommendations
+from .multi_retrieval import MultiSourceRetriever, default_sources
+from .diversity import MMRReranker
+from .learned_ranking import LearnedRanker, RankerTrainer
+from .tracing import Tracer
+from .recommendation import (
+    CollaborativeFilteringService, RecommendationCache, RecommendationEngine
+)
 from .conversation import ConversationService
 from .trigger import TriggerService, TriggerDecision
-from .text_similarity import TextSimilarity, QueryExpander
-from .models import User, UserActivity, Feedback, UserContext
+from .text_similarity import TextSimilarity, QueryExpander, ContentAnalyzer
+from .dedup import SimHashIndex, format_fingerprint, parse_fingerprint
+from .autocomplete import PrefixSuggester
+from .cache import LRUCache
+from .sharded_search import ShardUnavailableError, ShardedSearchIndex
+from .pagination import MAX_RESULTS, InvalidCursorError, paginate
+from .config import get_config
+from .models import Candidate, User, UserActivity, Feedback, UserContext, ScoredCandidate
 
 
 # Initialize FastAPI app
@@ -49,19 +72,380 @@ app.add_middleware(
 )
 
 # Initialize services
+_config = get_config()
 data_store = DataStore()
-recommendation_engine = RecommendationEngine(data_store)
+embedding_retriever = (
+    EmbeddingRetriever(data_store, index_path=_config.embedding_index_path)
+    if _config.embedding_retrieval else None
+)
+# Ranked slates per user, invalidated by DataStore change events
+recommendation_cache = (
+    RecommendationCache(
+        data_store,
+        max_entries=_config.recommendation_cache_size,
+        ttl_seconds=_config.recommendation_cache_ttl_seconds
+    )
+    if _config.recommendation_cache_size > 0 else None
+)
+cf_service = CollaborativeFilteringService(
+    data_store,
+    max_entries=_config.cf_cache_size,
+    ttl_seconds=_config.cf_cache_ttl_seconds
+)
+# Slates from the offline batch job (python -m app.precompute), if any
+precomputed_recommendations = (
+    PrecomputedRecommendations.load(
+        _config.precomputed_recommendations_path, data_store,
+        max_age_seconds=_config.precomputed_max_age_seconds or None
+    )
+    if _config.precomputed_recommendations_path
+    and Path(_config.precomputed_recommendations_path).exists() else None
+)
+# Concurrent keyword/TF-IDF/CF/fresh/popularity retrieval; the TF-IDF
+# source reads whichever search index is current
+multi_source_retriever = (
+    MultiSourceRetriever(data_store, default_sources(
+        data_store,
+        cf_service=cf_service,
+        similarity=lambda: text_similarity,
+        embedding_retriever=embedding_retriever,
+        timeout_ms=_config.retrieval_source_timeout_ms
+    ))
+    if _config.multi_source_retrieval else None
+)
+# Per-stage recommendation timings (a no-op unless PIPELINE_TRACING is set)
+pipeline_tracer = Tracer(enabled=_config.pipeline_tracing)
+recommendation_engine = RecommendationEngine(
+    data_store,
+    embedding_retriever,
+    vectorized_ranking=_config.vectorized_ranking,
+    cache=recommendation_cache,
+    cf_service=cf_service,
+    precomputed=precomputed_recommendations,
+    multi_source=multi_source_retriever,
+    diversity=(
+        MMRReranker(
+            lambda_=_config.mmr_lambda,
+            top_m=_config.mmr_top_m,
+            similarity=_config.mmr_similarity
+        )
+        if _config.mmr_diversity else None
+    ),
+    tracer=pipeline_tracer
+)
 conversation_service = ConversationService(data_store)
 trigger_service = TriggerService(data_store)
+# Search indexes start empty and are swapped in by the background build
 text_similarity = TextSimilarity()
-query_expander = QueryExpander()
+suggester = PrefixSuggester(text_similarity)
+sharded_index: Optional[ShardedSearchIndex] = None
+content_analyzer = ContentAnalyzer()
+duplicate_index = SimHashIndex()
+
+# Background CF model build/refresh loop, started at startup
+cf_task: Optional[asyncio.Task] = None
+
+# Background index build progress, reported by /api/health/ready
+index_status = {"state": "starting", "error": None, "build_seconds": None}
+
+query_expander = (
+    QueryExpander.from_file(_config.query_expansions_file)
+    if _config.query_expansions_file else QueryExpander()
+)
+
+# Cache ranked search results (MAX_RESULTS deep) keyed on
+# (index version, normalized query); pages are sliced from them
+search_cache = LRUCache(
+    max_entries=_config.search_cache_size,
+    ttl_seconds=_config.search_cache_ttl_seconds,
+    max_bytes=_config.search_cache_max_bytes
+)
+
+# Short-lived buffer of ranked recommendations for cursor pagination,
+# keyed on (user id, catalog version)
+recommendation_pages = LRUCache(max_entries=1024, ttl_seconds=60)
 
 # Build text similarity index on startup
 def build_similarity_index():
-    """Build TF-IDF index from all candidates."""
+    """
+    Build TF-IDF index and autocomplete suggestions from all candidates.
+
+    New indexes are built off to the side and swapped in together, so
+    requests never see a partially built index.
+    """
+    global text_similarity, suggester, sharded_index
+
     candidates = data_store.get_all_candidates()
     documents = [f"{c.title} {c.summary} {' '.join(c.keywords)}" for c in candidates]
-    text_similarity.build_index(documents)
+    similarity = TextSimilarity()
+    similarity.build_index(documents)
+    # Keep versions increasing across rebuilds so cache keys never collide
+    similarity.index_version += text_similarity.index_version
+
+    new_suggester = PrefixSuggester(similarity)
+    new_suggester.build(candidates)
+
+    new_sharded_index = None
+    if _config.search_shards > 0:
+        new_sharded_index = ShardedSearchIndex(similarity, num_shards=_config.search_shards)
+        new_sharded_index.build(list(zip((c.id for c in candidates), documents)))
+    if embedding_retriever:
+        embedding_retriever.build()
+
+    old_sharded_index = sharded_index
+    text_similarity, suggester, sharded_index = similarity, new_suggester, new_sharded_index
+    # Results scored against the old index are no longer valid
+    search_cache.clear()
+    if old_sharded_index is not None:
+        old_sharded_index.close()
+
+    # Candidates ingested while the build ran only reached the old indexes
+    built = {c.id for c in candidates}
+    for candidate in data_store.get_all_candidates():
+        if candidate.id not in built:
+            index_candidate(candidate)
+
+
+def build_dedup_index():
+    """
+    Load persisted SimHash fingerprints into the duplicate index.
+
+    Fingerprints missing from the store are computed once and persisted.
+    """
+    fingerprints = data_store.get_candidate_fingerprints()
+    missing = {
+        c.id: format_fingerprint(content_analyzer.compute_candidate_fingerprint(c))
+        for c in data_store.get_all_candidates()
+        if not fingerprints.get(c.id)
+    }
+    if missing:
+        data_store.set_candidate_fingerprints(missing)
+        fingerprints.update(missing)
+
+    for candidate_id, fingerprint in fingerprints.items():
+        duplicate_index.add(candidate_id, parse_fingerprint(fingerprint))
+
+
+def build_search_indexes():
+    """
+    Build all search indexes, then mark the service ready.
+
+    Runs in a background thread at startup so the app accepts traffic
+    (served by the degraded keyword search) while the indexes build.
+    """
+    index_status["state"] = "building"
+    start = time.perf_counter()
+    try:
+        build_similarity_index()
+        build_dedup_index()
+        if multi_source_retriever is not None:
+            multi_source_retriever.prepare()
+    except Exception as e:
+        index_status.update(state="failed", error=str(e))
+        print(f"Search index build failed: {e}")
+        return
+
+    index_status.update(state="ready", build_seconds=round(time.perf_counter() - start, 3))
+    print(f"Search indexes ready in {index_status['build_seconds']}s "
+          f"({len(duplicate_index)} fingerprints)")
+
+
+def load_item_cf_model(rebuild: bool = False):
+    """
+    Load the item-item CF model from ITEM_CF_MODEL_PATH, or build it from
+    feedback (and save it there), then switch the CF service to it.
+    """
+    path = _config.item_cf_model_path
+    start = time.perf_counter()
+    model = None
+    if path and Path(path).exists() and not rebuild:
+        try:
+            model = ItemCooccurrenceModel.load(path)
+        except Exception as e:
+            # e.g. saved by an older version with pickled IDs
+            print(f"Could not load item-item CF model from {path}, rebuilding: {e}")
+    try:
+        if model is None:
+            model = build_item_cf_model(data_store)
+            if path:
+                model.save(path)
+    except Exception as e:
+        print(f"Item-item CF model build failed: {e}")
+        return
+    cf_service.set_item_model(model)
+    print(f"Item-item CF model ready in {time.perf_counter() - start:.3f}s "
+          f"({len(model)} items, {model.num_pairs} pairs)")
+
+
+def load_als_model(rebuild: bool = False):
+    """
+    Load ALS factors from ALS_MODEL_PATH, or train them on the feedback log
+    (and save them there), then switch the CF service to them.
+    """
+    path = _config.als_model_path
+    start = time.perf_counter()
+    model = None
+    if path and Path(path).exists() and not rebuild:
+        try:
+            model = FactorModel.load(path)
+        except Exception as e:
+            # e.g. saved by an older version with pickled IDs
+            print(f"Could not load ALS model from {path}, retraining: {e}")
+    try:
+        if model is None:
+            trainer = ALSTrainer(
+                factors=_config.als_factors, workers=_config.als_workers or None
+            )
+            model, _ = train_als_model(data_store, trainer)
+            if path:
+                model.save(path)
+    except Exception as e:
+        print(f"ALS model training failed: {e}")
+        return
+    cf_service.set_factor_model(model)
+    print(f"ALS model ready in {time.perf_counter() - start:.3f}s "
+          f"({len(model.user_ids)} users x {len(model.item_ids)} items, "
+          f"{model.factors} factors)")
+
+
+def load_learned_ranker(rebuild: bool = False):
+    """
+    Load the learned ranker from LEARNED_RANKER_PATH, or train it on the
+    feedback log (and save it there), then rank with it. Ranking stays on
+    the heuristic if there is not enough feedback to train.
+    """
+    path = _config.learned_ranker_path
+    start = time.perf_counter()
+    model = None
+    if path and Path(path).exists() and not rebuild:
+        try:
+            model = LearnedRanker.load(path)
+        except Exception as e:
+            # e.g. saved by an older version (pickled metrics, no threshold)
+            print(f"Could not load learned ranker from {path}, retraining: {e}")
+    try:
+        if model is None:
+            model, _ = RankerTrainer().fit(data_store)
+            # Put the suggestion bar on the model's scale before serving
+            recommendation_engine.calibrate_suggestions(
+                model, data_store.get_active_user_ids(limit=100)
+            )
+            if path:
+                model.save(path)
+    except Exception as e:
+        print(f"Learned ranker unavailable, using heuristic ranking: {e}")
+        return
+    recommendation_engine.ranking.set_learned_ranker(model)
+    # Cached slates and page buffers were scored by the previous ranker
+    if recommendation_cache is not None:
+        recommendation_cache.clear()
+    recommendation_pages.clear()
+    print(f"Learned ranker ready in {time.perf_counter() - start:.3f}s "
+          f"(validation AUC {model.metrics.get('auc')}, "
+          f"suggestion threshold {model.suggestion_threshold:.3f})")
+
+
+def warm_cf_cache():
+    """Precompute CF scores for the most active users (background thread)."""
+    start = time.perf_counter()
+    try:
+        warmed = cf_service.warm_active_users(_config.cf_cache_warm_users)
+    except Exception as e:
+        print(f"CF cache warm-up failed: {e}")
+        return
+    print(f"Warmed CF scores for {warmed} users in {time.perf_counter() - start:.3f}s")
+
+
+def refresh_cf(rebuild: bool = False):
+    """
+    Load or rebuild the CF models and the learned ranker, drop the
+    precomputed table if it no longer matches them, then re-warm the CF
+    cache.
+    """
+    if _config.item_cf:
+        load_item_cf_model(rebuild)
+    if _config.als_cf:
+        load_als_model(rebuild)
+    if _config.learned_ranking:
+        load_learned_ranker(rebuild)
+    # A table ranked with other CF models or another ranker is never served
+    if (precomputed_recommendations is not None
+            and precomputed_recommendations.ranker != recommendation_engine.ranking.config):
+        precomputed_recommendations.clear()
+    if _config.cf_cache_warm_users > 0:
+        warm_cf_cache()
+
+
+async def maintain_cf():
+    """Prepare CF at startup and rebuild the feedback-trained models periodically."""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, refresh_cf)
+    trained_models = _config.item_cf or _config.als_cf or _config.learned_ranking
+    while trained_models and _config.cf_model_refresh_seconds > 0:
+        await asyncio.sleep(_config.cf_model_refresh_seconds)
+        await loop.run_in_executor(None, refresh_cf, True)
+
+
+def search_index_ready() -> bool:
+    """Whether the full search indexes have been built and swapped in."""
+    return index_status["state"] == "ready"
+
+
+def keyword_search(
+    query: str,
+    expansions: dict[str, float],
+    limit: int
+) -> list[tuple[str, float]]:
+    """
+    Degraded search used until the full index is ready.
+
+    Matches query tokens, hyphenated token pairs and expansion terms
+    against candidate keywords. The score is the fraction of the query's
+    tokens that matched.
+    """
+    tokens = text_similarity.tokenize(query)
+    terms = set(tokens) | set(expansions)
+    terms.update(f"{a}-{b}" for a, b in zip(tokens, tokens[1:]))
+    if not terms:
+        return []
+
+    scored = []
+    for candidate in data_store.get_candidates_by_keywords(list(terms)):
+        matched = len(set(candidate.keywords) & terms)
+        scored.append((candidate.id, min(matched / max(len(tokens), 1), 1.0)))
+    # Stable sort keeps engagement order among equal scores
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored[:limit]
+
+
+def index_candidate(candidate: Candidate):
+    """Add a newly ingested candidate to the search indexes incrementally."""
+    document = f"{candidate.title} {candidate.summary} {' '.join(candidate.keywords)}"
+    text_similarity.add_document(document)
+    if sharded_index is not None:
+        sharded_index.add(candidate.id, document)
+    suggester.add_candidate(candidate)
+    if embedding_retriever:
+        embedding_retriever.add_candidate(candidate)
+
+
+def to_scored_candidate_response(sc: ScoredCandidate, include_signals: bool) -> "ScoredCandidateResponse":
+    """Convert a ScoredCandidate to its response model."""
+    return ScoredCandidateResponse(
+        candidate=CandidateResponse(
+            id=sc.candidate.id,
+            title=sc.candidate.title,
+            summary=sc.candidate.summary,
+            category=sc.candidate.category,
+            keywords=sc.candidate.keywords,
+            source=sc.candidate.source
+        ),
+        score=round(sc.score, 2),
+        signals=[
+            SignalResponse(type=s.type, description=s.description)
+            for s in sc.signals
+        ] if include_signals else []
+    )
 
 
 # Request/Response Models
@@ -101,6 +485,14 @@ class RecommendationResponse(BaseModel):
     user_id: str
     recommendations: list[ScoredCandidateResponse]
     timestamp: str
+    next_cursor: Optional[str] = None
+
+
+class BatchRecommendationRequest(BaseModel):
+    """Request for recommendations for many users in one call."""
+    user_ids: list[str] = Field(min_length=1, max_length=10000)
+    limit: int = Field(default=5, ge=1, le=50)
+    include_signals: bool = False
 
 
 class ChatRequest(BaseModel):
@@ -201,6 +593,7 @@ class SearchRequest(BaseModel):
     """Request for semantic search."""
     query: str
     limit: int = Field(default=5, ge=1, le=20)
+    cursor: Optional[str] = None  # next_cursor from the previous page
 
 
 class SearchResponse(BaseModel):
@@ -208,6 +601,46 @@ class SearchResponse(BaseModel):
     query: str
     results: list[ScoredCandidateResponse]
     expanded_terms: list[str]
+    corrections: dict[str, list[str]] = {}
+    degraded: bool = False
+    next_cursor: Optional[str] = None
+
+
+class BatchSearchRequest(BaseModel):
+    """Request for several semantic searches in one call."""
+    queries: list[str] = Field(min_length=1, max_length=50)
+    limit: int = Field(default=5, ge=1, le=20)
+
+
+class BatchSearchResponse(BaseModel):
+    """Response with one search result set per query, in request order."""
+    results: list[SearchResponse]
+
+
+class SuggestionResponse(BaseModel):
+    """A single autocomplete suggestion."""
+    text: str
+    kind: str
+    candidate_id: Optional[str] = None
+
+
+class SuggestResponse(BaseModel):
+    """Response with autocomplete suggestions for a prefix."""
+    prefix: str
+    suggestions: list[SuggestionResponse]
+
+
+class CreateCandidateRequest(BaseModel):
+    """Request to add a candidate to the pool."""
+    id: str
+    title: str
+    summary: str
+    category: str
+    keywords: list[str] = []
+    source: str = ""
+    content_type: str = "article"
+    difficulty: str = "intermediate"
+    priority: str = "medium"
 
 
 class AnalyticsResponse(BaseModel):
@@ -238,10 +671,37 @@ async def root():
     }
 
 
+@app.get("/api/health/live")
+async def liveness():
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "live"}
+
+
+@app.get("/api/health/ready")
+async def readiness():
+    """
+    Readiness probe: search indexes are built.
+
+    Returns 503 while the background build is running (search is served
+    by the degraded keyword path meanwhile) or if it failed.
+    """
+    body = {
+        "status": "ready" if search_index_ready() else index_status["state"],
+        "index_version": text_similarity.index_version,
+        "build_seconds": index_status["build_seconds"],
+        "error": index_status["error"]
+    }
+    return JSONResponse(status_code=200 if search_index_ready() else 503, content=body)
+
+
 @app.get("/api/recommendations", response_model=RecommendationResponse)
 async def get_recommendations(
     user_id: str,
-    limit: int = 5
+    response: Response,
+    limit: int = 5,
+    cursor: Optional[str] = None,
+    include_signals: bool = True,
+    x_debug_trace: Optional[str] = Header(None)
 ):
     """
     Get personalized recommendations for a user.
@@ -250,6 +710,15 @@ async def get_recommendations(
     1. Retrieves candidates matching user interests
     2. Ranks them by relevance
     3. Returns top-K with explanation signals
+
+    Pass `next_cursor` from a response as `cursor` to get the next page.
+    A first page ranks deeply (through the recommendation cache) into a
+    short-lived buffer that its cursor pages are sliced from without
+    re-scoring, so every page comes from the same retrieval pool.
+    Explanation signals are built only for the returned page, and skipped
+    when include_signals is false. With pipeline tracing on, send
+    `X-Debug-Trace: 1` to get the stage timings of a live ranking in a
+    Server-Timing header.
     """
     try:
         # Build user context (simplified for MVP)
@@ -258,42 +727,128 @@ async def get_recommendations(
             receptivity_score=0.7  # Default for demo
         )
 
-        # Get recommendations
-        scored_candidates = recommendation_engine.get_recommendations(
-            user_id=user_id,
-            limit=limit,
-            context=context
+        buffer_key = (user_id, data_store.catalog_version)
+        ranked = recommendation_pages.get(buffer_key) if cursor else None
+        if ranked is None:
+            # Rank deep enough to serve later pages from the buffer. The
+            # pool grows with the limit, so a shallower first page would
+            # miss items that cursor pages (resuming by score) then skip
+            with pipeline_tracer.trace() as trace:
+                ranked = recommendation_engine.get_recommendations(
+                    user_id=user_id,
+                    limit=MAX_RESULTS,
+                    context=context,
+                    include_signals=False
+                )
+            if pipeline_tracer.enabled and x_debug_trace in ("1", "true"):
+                response.headers["Server-Timing"] = trace.server_timing()
+            ranked.sort(key=lambda sc: (-sc.score, sc.candidate.id))
+            recommendation_pages.set(buffer_key, ranked)
+
+        scored_candidates, next_cursor = paginate(
+            ranked, limit, key=user_id, version=data_store.catalog_version,
+            cursor=cursor, sort_key=lambda sc: (sc.score, sc.candidate.id)
         )
-
-        # Transform to response format
-        recommendations = []
-        for sc in scored_candidates:
-            recommendations.append(ScoredCandidateResponse(
-                candidate=CandidateResponse(
-                    id=sc.candidate.id,
-                    title=sc.candidate.title,
-                    summary=sc.candidate.summary,
-                    category=sc.candidate.category,
-                    keywords=sc.candidate.keywords,
-                    source=sc.candidate.source
-                ),
-                score=round(sc.score, 2),
-                signals=[
-                    SignalResponse(type=s.type, description=s.description)
-                    for s in sc.signals
-                ]
-            ))
+        if include_signals:
+            recommendation_engine.attach_signals(user_id, scored_candidates, context)
 
         return RecommendationResponse(
             user_id=user_id,
-            recommendations=recommendations,
-            timestamp=datetime.now().isoformat()
+            recommendations=[
+                to_scored_candidate_response(sc, include_signals) for sc in scored_candidates
+            ],
+            timestamp=datetime.now().isoformat(),
+            next_cursor=next_cursor
         )
 
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/recommendations/batch")
+async def get_recommendations_batch(request: BatchRecommendationRequest):
+    """
+    Get recommendations for many users in one call.
+
+    Streams newline-delimited JSON, one RecommendationResponse per user
+    as soon as that user is ranked, instead of one round-trip per user.
+    The catalog index, CF models and store lookups are shared across the
+    batch. Duplicate user IDs are answered once. A failure ends the
+    stream with an {"error": ...} line.
+    """
+    user_ids = list(dict.fromkeys(request.user_ids))
+    contexts = {
+        user_id: UserContext(user_id=user_id, receptivity_score=0.7)  # Default for demo
+        for user_id in user_ids
+    }
+
+    def generate():
+        try:
+            for user_id, scored in recommendation_engine.get_recommendations_batch(
+                user_ids,
+                limit=request.limit,
+                contexts=contexts,
+                include_signals=request.include_signals
+            ):
+                yield RecommendationResponse(
+                    user_id=user_id,
+                    recommendations=[
+                        to_scored_candidate_response(sc, request.include_signals)
+                        for sc in scored
+                    ],
+                    timestamp=datetime.now().isoformat()
+                ).model_dump_json() + "\n"
+        except Exception as e:
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    # A sync generator is iterated in the threadpool, keeping ranking
+    # off the event loop
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@app.get("/api/recommendations/cache")
+async def get_recommendation_cache_stats():
+    """Get recommendation cache, CF cache and precomputed table counters."""
+    return {
+        "catalog_version": data_store.catalog_version,
+        "cache": recommendation_cache.stats() if recommendation_cache is not None else None,
+        "cf_cache": cf_service.stats(),
+        "precomputed": (
+            precomputed_recommendations.stats()
+            if precomputed_recommendations is not None else None
+        )
+    }
+
+
+@app.get("/api/recommendations/retrieval")
+async def get_retrieval_stats():
+    """Get per-source multi-source retrieval latency, timeouts and yield."""
+    return {
+        "enabled": multi_source_retriever is not None,
+        "sources": (
+            multi_source_retriever.stats() if multi_source_retriever is not None else {}
+        )
+    }
+
+
+@app.get("/api/recommendations/metrics")
+async def get_pipeline_metrics():
+    """Get per-stage latency and candidate count histograms of the pipeline."""
+    return pipeline_tracer.stats()
+
+
+@app.get("/api/recommendations/ranker")
+async def get_ranker_stats():
+    """Get the learned ranker's weights and validation metrics, if one is loaded."""
+    model = recommendation_engine.ranking.learned
+    return {
+        "ranker": "learned" if model is not None else "heuristic",
+        "model": model.stats() if model is not None else None
+    }
+
+
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
@@ -385,6 +940,11 @@ async def record_feedback(request: FeedbackRequest):
 
         saved = data_store.record_feedback(feedback)
 
+        # Keep autocomplete ranking in line with engagement changes
+        candidate = data_store.get_candidate_by_id(request.candidate_id)
+        if candidate:
+            suggester.update_engagement(candidate.id, candidate.engagement_score)
+
         return FeedbackResponse(
             id=saved.id,
             status="recorded"
@@ -394,6 +954,64 @@ async def record_feedback(request: FeedbackRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/candidates", response_model=CandidateResponse)
+async def create_candidate(request: CreateCandidateRequest):
+    """
+    Add a new candidate to the recommendation pool.
+
+    Near-duplicates of existing candidates (by SimHash fingerprint) are
+    rejected. The candidate is added to the search and autocomplete
+    indexes incrementally, without rebuilding them.
+    """
+    try:
+        if not search_index_ready():
+            # The duplicate index is incomplete until the build finishes
+            raise HTTPException(status_code=503, detail="Search indexes are still building")
+
+        if data_store.get_candidate_by_id(request.id):
+            raise HTTPException(status_code=409, detail="Candidate already exists")
+
+        candidate = Candidate(
+            id=request.id,
+            title=request.title,
+            summary=request.summary,
+            category=request.category,
+            keywords=request.keywords,
+            source=request.source,
+            content_type=request.content_type,
+            difficulty=request.difficulty,
+            priority=request.priority
+        )
+
+        fingerprint = content_analyzer.compute_candidate_fingerprint(candidate)
+        duplicates = duplicate_index.find_near_duplicates(fingerprint)
+        if duplicates:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Near-duplicate of existing candidate '{duplicates[0][0]}'"
+            )
+
+        candidate = data_store.add_candidate(
+            candidate, fingerprint=format_fingerprint(fingerprint)
+        )
+        duplicate_index.add(candidate.id, fingerprint)
+        index_candidate(candidate)
+
+        return CandidateResponse(
+            id=candidate.id,
+            title=candidate.title,
+            summary=candidate.summary,
+            category=candidate.category,
+            keywords=candidate.keywords,
+            source=candidate.source
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/api/user", response_model=UserResponse)
 async def create_user(request: CreateUserRequest):
     """
@@ -579,7 +1197,10 @@ async def check_trigger(request: TriggerCheckRequest):
         top_rec = recommendations[0]
 
         # Check trigger decision
-        result = trigger_service.should_trigger(user, top_rec, context)
+        result = trigger_service.should_trigger(
+            user, top_rec, context,
+            min_score=recommendation_engine.ranking.suggestion_threshold
+        )
 
         # Build response
         rec_response = None
@@ -621,58 +1242,218 @@ async def semantic_search(request: SearchRequest):
     """
     Search candidates using semantic similarity.
 
-    Uses TF-IDF and query expansion to find relevant content.
+    Uses TF-IDF and query expansion to find relevant content. Misspelled
+    terms are mapped to the closest indexed vocabulary. Results for
+    repeated queries are served from the search cache. Until the search
+    indexes are ready, results come from a degraded keyword match and the
+    response is flagged `degraded`.
+
+    Pass `next_cursor` from a response as `cursor` to get the next page.
     """
     try:
-        # Expand query with related terms
-        expanded_terms = query_expander.expand(request.query)
+        # Expand query with weighted related terms
+        expansions = query_expander.expand_weighted(request.query)
+        expanded_terms = list(expansions)
 
         # Get all candidates
         candidates = data_store.get_all_candidates()
+        candidates_by_id = {c.id: c for c in candidates}
+
+        if not search_index_ready():
+            if request.cursor:
+                raise HTTPException(
+                    status_code=503, detail="Search indexes are still building"
+                )
+            similar = keyword_search(request.query, expansions, request.limit)
+            return _build_search_response(
+                request.query, expanded_terms, similar, candidates_by_id,
+                degraded=True
+            )
+
+        # Pin the indexes for this request in case a rebuild swaps them
+        similarity, shards = text_similarity, sharded_index
+        normalized = similarity.normalize_query(request.query, expansions)
+        cache_key = (similarity.index_version, normalized)
+        ranked = search_cache.get(cache_key)
+        if ranked is None:
+            # Off the event loop: shard round trips and scoring block
+            ranked = (await run_in_threadpool(
+                rank_search_results, similarity, shards, [request.query],
+                [expansions], candidates, MAX_RESULTS
+            ))[0]
+            # Ties ordered by id so cursors have a total order to resume from
+            ranked.sort(key=lambda x: (-x[1], x[0]))
+            search_cache.set(cache_key, ranked)
+
+        similar, next_cursor = paginate(
+            ranked, request.limit, key=normalized,
+            version=similarity.index_version, cursor=request.cursor,
+            sort_key=lambda x: (x[1], x[0])
+        )
+        response = _build_search_response(
+            request.query, expanded_terms, similar, candidates_by_id,
+            similarity=similarity
+        )
+        response.next_cursor = next_cursor
+        return response
 
-        # Build search documents
-        documents = [
-            (c.id, f"{c.title} {c.summary} {' '.join(c.keywords)}")
-            for c in candidates
+    except HTTPException:
+        raise
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/search/suggest", response_model=SuggestResponse)
+async def suggest(prefix: str, limit: int = Query(default=8, ge=1, le=20)):
+    """
+    Get autocomplete suggestions for a search prefix.
+
+    Suggestions are candidate titles and indexed vocabulary terms starting
+    with the prefix, ranked by document frequency and engagement.
+    """
+    return SuggestResponse(
+        prefix=prefix,
+        suggestions=[
+            SuggestionResponse(text=s.text, kind=s.kind, candidate_id=s.candidate_id)
+            for s in suggester.suggest(prefix, limit)
         ]
+    )
 
-        # Expanded query
-        full_query = f"{request.query} {' '.join(expanded_terms)}"
 
-        # Find similar documents
-        similar = text_similarity.find_similar(full_query, documents, request.limit)
+@app.get("/api/search/cache")
+async def get_search_cache_stats():
+    """Get search result cache hit/miss counters and occupancy."""
+    return {
+        "index_version": text_similarity.index_version,
+        "cache": search_cache.stats(),
+        "shards": sharded_index.stats() if sharded_index is not None else None
+    }
 
-        # Build response
-        results = []
-        for doc_id, score in similar:
-            candidate = data_store.get_candidate_by_id(doc_id)
-            if candidate:
-                results.append(ScoredCandidateResponse(
-                    candidate=CandidateResponse(
-                        id=candidate.id,
-                        title=candidate.title,
-                        summary=candidate.summary,
-                        category=candidate.category,
-                        keywords=candidate.keywords,
-                        source=candidate.source
-                    ),
-                    score=round(score, 3),
-                    signals=[SignalResponse(
-                        type="semantic_match",
-                        description=f"Semantic similarity: {score:.1%}"
-                    )]
-                ))
-
-        return SearchResponse(
-            query=request.query,
-            results=results,
-            expanded_terms=expanded_terms
+
+@app.post("/api/search/batch", response_model=BatchSearchResponse)
+async def batch_search(request: BatchSearchRequest):
+    """
+    Run several semantic searches in one request.
+
+    All queries are expanded, vectorized together and scored against
+    the candidate pool in a single pass, avoiding per-request overhead
+    for clients such as digest jobs.
+    """
+    try:
+        expansions = [query_expander.expand_weighted(q) for q in request.queries]
+        expanded = [list(e) for e in expansions]
+
+        candidates = data_store.get_all_candidates()
+        candidates_by_id = {c.id: c for c in candidates}
+
+        if not search_index_ready():
+            return BatchSearchResponse(results=[
+                _build_search_response(
+                    query, terms,
+                    keyword_search(query, e, request.limit),
+                    candidates_by_id, degraded=True
+                )
+                for query, terms, e in zip(request.queries, expanded, expansions)
+            ])
+
+        similarity, shards = text_similarity, sharded_index
+        similar_per_query = await run_in_threadpool(
+            rank_search_results, similarity, shards, request.queries,
+            expansions, candidates, request.limit
         )
 
+        return BatchSearchResponse(results=[
+            _build_search_response(
+                query, terms, similar, candidates_by_id, similarity=similarity
+            )
+            for query, terms, similar in zip(request.queries, expanded, similar_per_query)
+        ])
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def rank_search_results(
+    similarity: TextSimilarity,
+    shards: Optional[ShardedSearchIndex],
+    queries: list[str],
+    expansions: list[dict[str, float]],
+    candidates: list[Candidate],
+    limit: int
+) -> list[list[tuple[str, float]]]:
+    """
+    Top (candidate_id, score) pairs per query, from the shard workers when
+    they are running, else scored in-process. Blocks; call it from a
+    worker thread.
+    """
+    if shards is not None and shards.ready:
+        try:
+            # Fan out to the shard workers
+            return shards.search_batch(
+                [similarity.compute_query_vector(q, e) for q, e in zip(queries, expansions)],
+                limit
+            )
+        except ShardUnavailableError as e:
+            # The index has shut itself down; later searches skip it
+            print(f"Sharded search unavailable, searching in-process: {e}")
+
+    # Build search documents
+    documents = [
+        (c.id, f"{c.title} {c.summary} {' '.join(c.keywords)}")
+        for c in candidates
+    ]
+    if len(queries) == 1:
+        return [similarity.find_similar(queries[0], documents, limit, expansions=expansions[0])]
+    return similarity.find_similar_batch(queries, documents, limit, expansions=expansions)
+
+
+def _build_search_response(
+    query: str,
+    expanded_terms: list[str],
+    similar: list[tuple[str, float]],
+    candidates_by_id: dict,
+    similarity: Optional[TextSimilarity] = None,
+    degraded: bool = False
+) -> SearchResponse:
+    """
+    Build a search response from (candidate_id, score) pairs.
+
+    Corrections come from `similarity`; degraded responses have none.
+    """
+    results = []
+    for doc_id, score in similar:
+        candidate = candidates_by_id.get(doc_id)
+        if candidate:
+            results.append(ScoredCandidateResponse(
+                candidate=CandidateResponse(
+                    id=candidate.id,
+                    title=candidate.title,
+                    summary=candidate.summary,
+                    category=candidate.category,
+                    keywords=candidate.keywords,
+                    source=candidate.source
+                ),
+                score=round(score, 3),
+                signals=[SignalResponse(
+                    type="keyword_match",
+                    description=f"Keyword match: {score:.0%} of query terms"
+                ) if degraded else SignalResponse(
+                    type="semantic_match",
+                    description=f"Semantic similarity: {score:.1%}"
+                )]
+            ))
+
+    return SearchResponse(
+        query=query,
+        results=results,
+        expanded_terms=expanded_terms,
+        corrections=similarity.correct_query(query) if similarity else {},
+        degraded=degraded
+    )
+
+
 @app.get("/api/analytics", response_model=AnalyticsResponse)
 async def get_analytics():
     """
@@ -890,12 +1671,24 @@ async def startup_event():
     print(f"Loaded {len(data_store.get_all_candidates())} candidates")
     print(f"Loaded {len(data_store._data.get('users', []))} users")
 
-    # Build text similarity index
-    build_similarity_index()
-    print("Text similarity index built")
+    # Build search indexes in the background; /api/health/ready reports
+    # when they are swapped in
+    asyncio.get_running_loop().run_in_executor(None, build_search_indexes)
+    print("Building search indexes in the background")
+
+    # Load/build the CF models and warm the CF cache, then keep
+    # refreshing the models in the background
+    global cf_task
+    cf_task = asyncio.create_task(maintain_cf())
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
     print("Proactive AI Recommendation System shutting down...")
+    if cf_task is not None:
+        cf_task.cancel()
+    if sharded_index is not None:
+        sharded_index.close()
+    if multi_source_retriever is not None:
+        multi_source_retriever.close()
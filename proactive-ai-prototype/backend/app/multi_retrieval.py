@@ -0,0 +1,523 @@
+"""
+Multi-Source Retrieval.
+
+Runs several candidate retrievers concurrently and merges their results
+into one pool for ranking:
+- keyword: user interests and activity keywords against candidate
+  keywords, through postings cached per catalog version
+- activity_text: TF-IDF cosine between the user's recent activity text
+  (search queries and keywords) and candidate documents
+- cf: top collaborative filtering scores (CF neighbors / item model)
+- fresh: newest content
+- popular: most positively engaged content
+- embedding: dense nearest neighbors, when an embedding index is configured
+
+Each source has a budget: the share of the pool it may fill (its quota)
+and a timeout. Sources that miss their timeout are left out of the merge,
+so one slow retriever cannot blow the request's latency budget.
+
+Performance notes:
+- Sources run on a shared thread pool and are waited on in deadline
+  order; a late source is abandoned rather than joined (its thread
+  finishes in the background). A source is not called again while an
+  abandoned call is still running, so a hung source holds at most one
+  thread and cannot starve the others.
+- Threads overlap waiting and NumPy work; pure-Python sources still
+  share the GIL, which is why timeouts bound the merge, not the sources.
+- Per-request state (recent activity) is fetched once and handed to
+  every source. Fresh/popular orderings are cached until the catalog or
+  feedback changes. TF-IDF document postings are rebuilt in a background
+  thread when the catalog or search index changes; requests keep using
+  the previous postings meanwhile, so an ingest never stalls one.
+
+Design for refactoring:
+- Sources can call remote retrieval services behind the same interface
+- Quotas can be learned from per-source engagement
+"""
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .data_store import DataStore
+from .embedding import EmbeddingRetriever
+from .models import Candidate, User, UserActivity
+from .text_similarity import TextSimilarity
+
+
+@dataclass
+class SourceBudget:
+    """How much of the pool a source may fill, and how long it may take."""
+    quota: float
+    timeout_ms: float = 50.0
+
+
+class CatalogIndex:
+    """
+    Keyword postings over a catalog snapshot, ordered by engagement.
+
+    Built once per batch or catalog version so keyword retrieval for each
+    user is a union of postings instead of a catalog scan. match() returns
+    what DataStore.get_candidates_by_keywords would for the same snapshot.
+    """
+
+    def __init__(self, catalog: list[Candidate]):
+        self.catalog = catalog
+        # Stable sort, so engagement ties keep catalog order
+        self.ordered = sorted(catalog, key=lambda c: c.engagement_score, reverse=True)
+        self.postings: dict[str, list[int]] = defaultdict(list)
+        for position, candidate in enumerate(self.ordered):
+            for keyword in set(candidate.keywords):
+                self.postings[keyword].append(position)
+
+    def match(self, keywords: set[str], limit: int) -> list[Candidate]:
+        """Candidates with any of the keywords, highest engagement first."""
+        positions = set()
+        for keyword in keywords:
+            positions.update(self.postings.get(keyword, ()))
+        return [self.ordered[p] for p in sorted(positions)[:limit]]
+
+
+class RetrievalSource(ABC):
+    """A retriever contributing candidates to the merged pool."""
+
+    name = "source"
+
+    @abstractmethod
+    def retrieve(
+        self, user: User, activities: list[UserActivity], limit: int
+    ) -> list[Candidate]:
+        """Up to `limit` candidates for the user, best first."""
+        pass
+
+    def prepare(self) -> None:
+        """Build any cached index ahead of the first request."""
+        pass
+
+
+class KeywordSource(RetrievalSource):
+    """Candidates sharing keywords with the user's interests and activity."""
+
+    name = "keyword"
+
+    def __init__(self, data_store: DataStore):
+        self.data_store = data_store
+        self._index: Optional[CatalogIndex] = None
+        self._version: Optional[int] = None
+
+    def retrieve(self, user, activities, limit):
+        keywords = set(user.topics_of_interest)
+        keywords.update(DataStore.keywords_from_activity(activities))
+        self.prepare()
+        return self._index.match(keywords, limit)
+
+    def prepare(self) -> None:
+        if self._version != self.data_store.catalog_version:
+            version = self.data_store.catalog_version
+            self._index = CatalogIndex(self.data_store.get_all_candidates())
+            self._version = version
+
+
+class ActivityTextSource(RetrievalSource):
+    """
+    TF-IDF cosine between recent activity text and candidate documents.
+
+    Normalized document vectors are kept in term postings, so a query
+    only touches the documents sharing one of its terms. prepare() builds
+    them; after the catalog or the search index changes, a request starts
+    one background rebuild and is served from the previous postings (new
+    candidates appear once it is swapped in). Nothing is returned until
+    the search index has IDF statistics.
+    """
+
+    name = "activity_text"
+
+    def __init__(self, data_store: DataStore, similarity: Callable[[], TextSimilarity]):
+        self.data_store = data_store
+        # A callable, since the app swaps in a new index after rebuilds
+        self.similarity = similarity
+        self._lock = threading.Lock()
+        self._version: Optional[tuple[int, int]] = None
+        self._ids: list[str] = []
+        self._postings: dict[str, list[tuple[int, float]]] = {}
+        self._rebuilding = False
+
+    def retrieve(self, user, activities, limit):
+        text = " ".join(
+            " ".join([a.query, *a.keywords]) for a in activities
+        )
+        if not text.strip():
+            return []
+
+        similarity = self.similarity()
+        if not similarity.num_documents:
+            # Search index not built yet: no IDF to weight terms with
+            return []
+        ids, postings = self._current(similarity)
+        query = similarity.compute_tfidf_vector(text)
+        norm = math.sqrt(sum(w * w for w in query.values()))
+        if not norm:
+            return []
+
+        scores: dict[int, float] = defaultdict(float)
+        for term, weight in query.items():
+            for doc, doc_weight in postings.get(term, ()):
+                scores[doc] += weight * doc_weight
+        best = sorted(scores.items(), key=lambda pair: (-pair[1], pair[0]))[:limit]
+        return self.data_store.get_candidates_by_ids([ids[doc] for doc, _ in best])
+
+    def prepare(self) -> None:
+        similarity = self.similarity()
+        if similarity.num_documents:
+            self._rebuild(similarity)
+
+    def _current(
+        self, similarity: TextSimilarity
+    ) -> tuple[list[str], dict[str, list[tuple[int, float]]]]:
+        """(document IDs, term postings), starting a background rebuild if stale."""
+        version = (self.data_store.catalog_version, similarity.index_version)
+        with self._lock:
+            if version != self._version and not self._rebuilding:
+                self._rebuilding = True
+                threading.Thread(
+                    target=self._rebuild_in_background, args=(similarity,),
+                    name="activity-text-postings", daemon=True
+                ).start()
+            return self._ids, self._postings
+
+    def _rebuild_in_background(self, similarity: TextSimilarity) -> None:
+        try:
+            self._rebuild(similarity)
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def _rebuild(self, similarity: TextSimilarity) -> None:
+        """Vectorize the catalog into fresh postings and swap them in."""
+        # Versions read first: a change during the build triggers another
+        version = (self.data_store.catalog_version, similarity.index_version)
+        ids = []
+        postings: dict[str, list[tuple[int, float]]] = defaultdict(list)
+        for c in self.data_store.get_all_candidates():
+            vector = similarity.compute_tfidf_vector(
+                f"{c.title} {c.summary} {' '.join(c.keywords)}"
+            )
+            norm = math.sqrt(sum(w * w for w in vector.values()))
+            if not norm:
+                continue
+            for term, weight in vector.items():
+                postings[term].append((len(ids), weight / norm))
+            ids.append(c.id)
+        with self._lock:
+            self._ids, self._postings, self._version = ids, dict(postings), version
+
+
+class CFSource(RetrievalSource):
+    """Highest collaborative filtering scores for the user."""
+
+    name = "cf"
+
+    def __init__(self, data_store: DataStore, cf_service):
+        self.data_store = data_store
+        self.cf_service = cf_service
+
+    def retrieve(self, user, activities, limit):
+        scores = self.cf_service.get_cf_scores(user.id)
+        best = sorted(scores.items(), key=lambda pair: (-pair[1], pair[0]))[:limit]
+        return self.data_store.get_candidates_by_ids([cid for cid, _ in best])
+
+
+class FreshSource(RetrievalSource):
+    """Newest candidates, ordering cached per catalog version."""
+
+    name = "fresh"
+
+    def __init__(self, data_store: DataStore):
+        self.data_store = data_store
+        self._version: Optional[int] = None
+        self._ordered: list[Candidate] = []
+
+    def retrieve(self, user, activities, limit):
+        if self._version != self.data_store.catalog_version:
+            version = self.data_store.catalog_version
+            # ISO timestamps sort chronologically as strings; undated last
+            self._ordered = sorted(
+                self.data_store.get_all_candidates(),
+                key=lambda c: c.created_at, reverse=True
+            )
+            self._version = version
+        return self._ordered[:limit]
+
+
+class PopularitySource(RetrievalSource):
+    """Most positively engaged candidates, recounted after new feedback."""
+
+    name = "popular"
+
+    def __init__(self, data_store: DataStore, depth: int = 200):
+        self.data_store = data_store
+        self.depth = depth
+        self._ordered: Optional[list[Candidate]] = None
+        data_store.subscribe(self._on_change)
+
+    def retrieve(self, user, activities, limit):
+        ordered = self._ordered
+        if ordered is None:
+            popular = self.data_store.get_popular_candidates(limit=self.depth)
+            ordered = self.data_store.get_candidates_by_ids([cid for cid, _ in popular])
+            self._ordered = ordered
+        return ordered[:limit]
+
+    def _on_change(self, event: str, user_id: Optional[str]) -> None:
+        """DataStore listener: recount on feedback or catalog changes."""
+        if event in ("feedback", "catalog"):
+            self._ordered = None
+
+
+class EmbeddingSource(RetrievalSource):
+    """Dense nearest neighbors of the user's interest embedding."""
+
+    name = "embedding"
+
+    def __init__(self, embedding_retriever: EmbeddingRetriever):
+        self.embedding_retriever = embedding_retriever
+
+    def retrieve(self, user, activities, limit):
+        return self.embedding_retriever.retrieve(user, limit)
+
+
+# Pool shares and timeouts used by default_sources
+DEFAULT_BUDGETS = {
+    "keyword": SourceBudget(quota=0.35),
+    "activity_text": SourceBudget(quota=0.2),
+    "cf": SourceBudget(quota=0.2),
+    "embedding": SourceBudget(quota=0.15),
+    "fresh": SourceBudget(quota=0.05, timeout_ms=20.0),
+    "popular": SourceBudget(quota=0.05, timeout_ms=20.0)
+}
+
+
+class MultiSourceRetriever:
+    """
+    Concurrent retrieval from several sources with per-source budgets.
+
+    Sources earlier in the list win ties in the merge.
+
+    Usage:
+        retriever = MultiSourceRetriever(
+            data_store, default_sources(data_store, cf_service, ...)
+        )
+        pool = retriever.retrieve(user, limit=50, exclude=shown_ids)
+    """
+
+    def __init__(
+        self,
+        data_store: DataStore,
+        sources: list[tuple[RetrievalSource, SourceBudget]],
+        max_workers: Optional[int] = None
+    ):
+        self.data_store = data_store
+        self.sources = sources
+        # Spare threads so abandoned late sources do not delay new requests
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or 2 * len(sources),
+            thread_name_prefix="retrieval"
+        )
+        self._stats = {
+            source.name: {
+                "calls": 0, "timeouts": 0, "skipped": 0, "errors": 0,
+                "candidates": 0, "ms": 0.0
+            }
+            for source, _ in sources
+        }
+        self._stats_lock = threading.Lock()
+        # Timed-out calls still running, per source name (shared by the
+        # request threads, hence the lock)
+        self._abandoned: dict[str, Future] = {}
+        self._abandoned_lock = threading.Lock()
+
+    def retrieve(
+        self,
+        user: User,
+        limit: int,
+        exclude: Optional[set[str]] = None,
+        activities: Optional[list[UserActivity]] = None
+    ) -> list[Candidate]:
+        """
+        Merged, deduplicated pool of up to `limit` candidates.
+
+        Args:
+            user: The user to retrieve for
+            limit: Pool size
+            exclude: Candidate IDs to leave out (e.g. already shown)
+            activities: The user's recent activity, newest first, if
+                already fetched
+
+        Returns:
+            Candidates interleaved across sources, each source filling
+            at most its quota before leftovers backfill the pool
+        """
+        exclude = exclude or set()
+        if activities is None:
+            activities = self.data_store.get_user_activity(user.id, limit=20)
+
+        start = time.perf_counter()
+        futures = []
+        for source, budget in self.sources:
+            with self._abandoned_lock:
+                abandoned = self._abandoned.get(source.name)
+                stuck = abandoned is not None and not abandoned.done()
+                if abandoned is not None and not stuck:
+                    del self._abandoned[source.name]
+            if stuck:
+                # Still stuck on an earlier request: skip, like a timeout
+                self._count(source.name, "skipped")
+                continue
+            # Over-fetch so duplicates and excluded candidates leave
+            # enough to fill the quota and backfill the pool
+            wanted = 2 * self.quota(budget, limit) + len(exclude)
+            futures.append((
+                source, budget,
+                self._executor.submit(self._timed, source, user, activities, wanted)
+            ))
+
+        results = []
+        for source, budget, future in sorted(futures, key=lambda f: f[1].timeout_ms):
+            remaining = start + budget.timeout_ms / 1000 - time.perf_counter()
+            try:
+                results.append((source, budget, future.result(timeout=max(remaining, 0.0))))
+            except FutureTimeoutError:
+                if not future.cancel():
+                    # Already running: keep it from being called again until done
+                    with self._abandoned_lock:
+                        self._abandoned[source.name] = future
+                self._count(source.name, "timeouts")
+            except Exception:
+                self._count(source.name, "errors")
+        # Merge in source order, not completion order
+        order = {source.name: i for i, (source, _) in enumerate(self.sources)}
+        results.sort(key=lambda r: order[r[0].name])
+        return self.merge(results, limit, exclude)
+
+    @staticmethod
+    def quota(budget: SourceBudget, limit: int) -> int:
+        """Max candidates a source may place in a pool of `limit`."""
+        return max(1, math.ceil(limit * budget.quota))
+
+    def merge(
+        self,
+        results: list[tuple[RetrievalSource, SourceBudget, list[Candidate]]],
+        limit: int,
+        exclude: set[str]
+    ) -> list[Candidate]:
+        """Round-robin merge honouring quotas, then backfill from leftovers."""
+        lists = [
+            [c for c in candidates if c.id not in exclude]
+            for _, _, candidates in results
+        ]
+        quotas = [self.quota(budget, limit) for _, budget, _ in results]
+        positions = [0] * len(lists)
+        merged: list[Candidate] = []
+        seen: set[str] = set()
+
+        for capped in (True, False):
+            taken = [0] * len(lists)
+            progress = True
+            while progress and len(merged) < limit:
+                progress = False
+                for i, candidates in enumerate(lists):
+                    if capped and taken[i] >= quotas[i]:
+                        continue
+                    # Skip duplicates already placed by another source
+                    while positions[i] < len(candidates) and candidates[positions[i]].id in seen:
+                        positions[i] += 1
+                    if positions[i] >= len(candidates):
+                        continue
+                    candidate = candidates[positions[i]]
+                    positions[i] += 1
+                    seen.add(candidate.id)
+                    merged.append(candidate)
+                    taken[i] += 1
+                    progress = True
+                    if len(merged) >= limit:
+                        break
+        return merged
+
+    def _timed(
+        self, source: RetrievalSource, user: User, activities: list[UserActivity], limit: int
+    ) -> list[Candidate]:
+        """Run a source, recording its latency and output size."""
+        start = time.perf_counter()
+        candidates = source.retrieve(user, activities, limit)
+        with self._stats_lock:
+            stats = self._stats[source.name]
+            stats["calls"] += 1
+            stats["ms"] += (time.perf_counter() - start) * 1000
+            stats["candidates"] += len(candidates)
+        return candidates
+
+    def _count(self, name: str, counter: str) -> None:
+        """Increment a source's timeout or error counter."""
+        with self._stats_lock:
+            self._stats[name][counter] += 1
+
+    def stats(self) -> dict:
+        """
+        Per-source calls, timeouts, skips (while a timed-out call was still
+        running), errors, mean latency and yield.
+        """
+        with self._stats_lock:
+            return {
+                name: {
+                    "calls": s["calls"],
+                    "timeouts": s["timeouts"],
+                    "skipped": s["skipped"],
+                    "errors": s["errors"],
+                    "mean_ms": round(s["ms"] / s["calls"], 3) if s["calls"] else 0.0,
+                    "mean_candidates": round(s["candidates"] / s["calls"], 1) if s["calls"] else 0.0
+                }
+                for name, s in self._stats.items()
+            }
+
+    def prepare(self) -> None:
+        """Build every source's cached index, e.g. after a search index rebuild."""
+        for source, _ in self.sources:
+            source.prepare()
+
+    def close(self) -> None:
+        """Stop the worker threads without waiting for abandoned sources."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def default_sources(
+    data_store: DataStore,
+    cf_service=None,
+    similarity: Optional[Callable[[], TextSimilarity]] = None,
+    embedding_retriever: Optional[EmbeddingRetriever] = None,
+    timeout_ms: Optional[float] = None
+) -> list[tuple[RetrievalSource, SourceBudget]]:
+    """
+    The standard sources with DEFAULT_BUDGETS, skipping any whose
+    dependency is not given. timeout_ms overrides every source's timeout.
+    """
+    sources: list[RetrievalSource] = [KeywordSource(data_store)]
+    if similarity is not None:
+        sources.append(ActivityTextSource(data_store, similarity))
+    if cf_service is not None:
+        sources.append(CFSource(data_store, cf_service))
+    if embedding_retriever is not None:
+        sources.append(EmbeddingSource(embedding_retriever))
+    sources += [FreshSource(data_store), PopularitySource(data_store)]
+
+    budgets = []
+    for source in sources:
+        budget = DEFAULT_BUDGETS[source.name]
+        if timeout_ms is not None:
+            budget = SourceBudget(quota=budget.quota, timeout_ms=timeout_ms)
+        budgets.append((source, budget))
+    return budgets
@@ -0,0 +1,118 @@
+"""
+Cursor Pagination.
+
+Opaque cursors for paging through ranked results (search hits,
+recommendations). A cursor records where the previous page ended - the
+last score and id - plus the index version and a hash of the query it
+belongs to.
+
+Performance notes:
+- Ranked lists are computed once to MAX_RESULTS deep and kept in a
+  short-lived per-query buffer; later pages are a binary search for the
+  cursor position in that buffer, with no re-scoring.
+- If the buffer has expired, the list is recomputed and the page resumes
+  from the cursor's score threshold, so results stay consistent.
+
+Design for refactoring:
+- Can be replaced with search_after cursors of a search engine
+"""
+
+import base64
+import hashlib
+import json
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Callable, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Depth of the ranked list kept per query; pages end here
+MAX_RESULTS = 200
+
+
+class InvalidCursorError(ValueError):
+    """Raised for malformed cursors or cursors that no longer apply."""
+
+
+@dataclass
+class Cursor:
+    """Decoded pagination cursor."""
+    score: float
+    last_id: str
+    version: int
+    query_hash: str
+
+
+def query_hash(key: Hashable) -> str:
+    """Short stable hash tying a cursor to the query it was issued for."""
+    return hashlib.blake2b(repr(key).encode("utf-8"), digest_size=6).hexdigest()
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    """Serialize a cursor to an opaque URL-safe string."""
+    payload = json.dumps(
+        [cursor.score, cursor.last_id, cursor.version, cursor.query_hash],
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(value: str) -> Cursor:
+    """Parse a cursor produced by encode_cursor."""
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        score, last_id, version, key_hash = json.loads(
+            base64.urlsafe_b64decode(padded.encode("ascii"))
+        )
+        return Cursor(float(score), str(last_id), int(version), str(key_hash))
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise InvalidCursorError("Malformed cursor") from e
+
+
+def paginate(
+    ranked: list[T],
+    limit: int,
+    key: Hashable,
+    version: int,
+    cursor: Optional[str],
+    sort_key: Callable[[T], tuple[float, str]]
+) -> tuple[list[T], Optional[str]]:
+    """
+    Get one page of a ranked list and the cursor for the next page.
+
+    Args:
+        ranked: Items ordered by score descending, then id ascending
+        limit: Page size
+        key: Identity of the query (used to reject foreign cursors)
+        version: Index/catalog version the ranking was computed against
+        cursor: Cursor from the previous page, or None for the first page
+        sort_key: Returns (score, id) for an item
+
+    Returns:
+        (page items, next cursor or None on the last page)
+
+    Raises:
+        InvalidCursorError: Cursor is malformed, belongs to another query,
+            or was issued for a different index version
+    """
+    key_hash = query_hash(key)
+    start = 0
+    if cursor:
+        position = decode_cursor(cursor)
+        if position.query_hash != key_hash:
+            raise InvalidCursorError("Cursor does not belong to this query")
+        if position.version != version:
+            raise InvalidCursorError(
+                "Results have changed since this cursor was issued; "
+                "start again from the first page"
+            )
+        # Items sort by (-score, id); resume strictly after the cursor
+        order = [(-score, item_id) for score, item_id in map(sort_key, ranked)]
+        start = bisect_right(order, (-position.score, position.last_id))
+
+    page = ranked[start:start + limit]
+    if not page or start + limit >= len(ranked):
+        return page, None
+
+    score, last_id = sort_key(page[-1])
+    return page, encode_cursor(Cursor(score, last_id, version, key_hash))
@@ -0,0 +1,490 @@
+"""
+Batch Recommendation Precomputation.
+
+Offline job that ranks the top-N candidates for every user and writes
+them to a precomputed table, so proactive pushes (and first pages of
+recommendations) are served without running retrieval and ranking.
+
+Performance notes:
+- The store is read once in the parent; each worker process receives
+  the snapshot (and the item-item CF model, built once) a single time
+  through the pool initializer, not per task.
+- Users are sent in chunks of IDs to keep pickling overhead small
+  relative to the ranking work.
+- Slates are ranked without a request context. The timing factor adds
+  the same amount to every candidate, so PrecomputedRecommendations
+  re-applies it at serve time for any receptivity (the learned ranker
+  does not use it at all). Under the category penalty a repeated
+  category gains only 80% of it, so an item just past the stored depth
+  can occasionally belong at the bottom of a served slate.
+- The job ranks with the server's ranker, diversity and CF settings
+  (LEARNED_RANKING, MMR_*, ITEM_CF / ALS_CF and their saved models); the
+  table records them and is only served by an engine configured the
+  same way (with the same CF model), and only until it is older than
+  PRECOMPUTED_MAX_AGE_SECONDS.
+
+Usage:
+    python -m app.precompute [--workers 4] [--chunk-size 64] [--depth 50]
+
+Design for refactoring:
+- The table can move to Redis or a key-value store with the same get()
+- The job can run on a scheduler ahead of users' preferred hours
+"""
+
+import argparse
+import json
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from .als import ALSTrainer, FactorModel, train_from_store as train_als_model
+from .cache import estimate_size
+from .config import get_config
+from .data_store import DataStore
+from .diversity import MMRReranker
+from .item_cf import ItemCooccurrenceModel, build_from_store as build_item_cf_model
+from .learned_ranking import LearnedRanker
+from .models import ScoredCandidate, UserContext
+
+# (candidate_id, score without timing, category), best first
+SlateEntry = tuple[str, float, str]
+
+# Ranking settings of a table built before they were recorded (its CF
+# model is unknown, so it matches no engine)
+DEFAULT_RANKER = {"ranker": "heuristic", "diversity": "category", "cf": "unknown"}
+
+# Engine owned by each worker process, set by _init_worker
+_worker_engine = None
+
+
+def _build_engine(
+    data_store: DataStore,
+    item_model: Optional[ItemCooccurrenceModel],
+    learned_ranker: Optional[LearnedRanker] = None,
+    mmr: Optional[dict] = None,
+    factor_model: Optional[FactorModel] = None
+):
+    """
+    Recommendation engine for batch ranking (no caches, NumPy ranker),
+    with the given CF models, learned ranker and MMR settings, if any.
+    """
+    # Imported here: recommendation imports this module for serving
+    from .recommendation import RecommendationEngine
+
+    engine = RecommendationEngine(
+        data_store,
+        vectorized_ranking=True,
+        diversity=MMRReranker(**mmr) if mmr else None,
+        learned_ranker=learned_ranker
+    )
+    if item_model is not None:
+        engine.ranking.cf_service.set_item_model(item_model)
+    if factor_model is not None:
+        engine.ranking.cf_service.set_factor_model(factor_model)
+    return engine
+
+
+def _init_worker(
+    data: dict,
+    item_model: Optional[ItemCooccurrenceModel],
+    learned_ranker: Optional[LearnedRanker],
+    mmr: Optional[dict],
+    factor_model: Optional[FactorModel]
+) -> None:
+    """Pool initializer: build this process's engine from the snapshot."""
+    global _worker_engine
+    _worker_engine = _build_engine(
+        DataStore(data=data), item_model, learned_ranker, mmr, factor_model
+    )
+
+
+def rank_user(engine, user_id: str, depth: int) -> list[SlateEntry]:
+    """Top-`depth` slate for one user, ordered by (-score, id)."""
+    scored = engine.get_recommendations(
+        user_id, limit=depth, context=None, include_signals=False
+    )
+    scored.sort(key=lambda sc: (-sc.score, sc.candidate.id))
+    return [(sc.candidate.id, sc.score, sc.candidate.category) for sc in scored]
+
+
+def _rank_chunk(args: tuple[list[str], int]) -> list[tuple[str, list[SlateEntry]]]:
+    """Worker task: rank a chunk of users."""
+    user_ids, depth = args
+    return [(user_id, rank_user(_worker_engine, user_id, depth)) for user_id in user_ids]
+
+
+def peak_memory_mb() -> dict:
+    """Peak resident memory of this process and its finished children, in MiB."""
+    # ru_maxrss is KiB on Linux
+    return {
+        "parent": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "workers": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1)
+    }
+
+
+@dataclass
+class PrecomputeReport:
+    """Outcome, throughput and memory of a precomputation run."""
+    users: int
+    workers: int
+    chunk_size: int
+    depth: int
+    ranker: dict
+    seconds: float
+    table_bytes: int
+    peak_memory_mb: dict
+
+    @property
+    def users_per_second(self) -> float:
+        return self.users / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "users": self.users,
+            "workers": self.workers,
+            "chunk_size": self.chunk_size,
+            "depth": self.depth,
+            "ranker": self.ranker,
+            "seconds": round(self.seconds, 3),
+            "users_per_second": round(self.users_per_second, 1),
+            "table_mb": round(self.table_bytes / (1024 * 1024), 2),
+            "peak_memory_mb": self.peak_memory_mb
+        }
+
+
+class BatchRecommender:
+    """
+    Parallel top-N ranking for every user in a store.
+
+    Ranks with the heuristic and category penalty unless given a learned
+    ranker and/or MMR settings (MMRReranker keyword arguments; each
+    worker builds its own reranker from them). CF scores come from the
+    models passed to run(), as the serving CF service would pick them.
+
+    Usage:
+        batch = BatchRecommender(workers=4, depth=50)
+        slates, report = batch.run(data_store)
+        PrecomputedRecommendations(
+            data_store, slates, depth=50, generated_at=time.time(), ranker=report.ranker
+        ).save(path)
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        chunk_size: int = 64,
+        depth: int = 50,
+        learned_ranker: Optional[LearnedRanker] = None,
+        mmr: Optional[dict] = None
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.depth = depth
+        self.learned_ranker = learned_ranker
+        self.mmr = mmr
+
+    def run(
+        self,
+        data_store: DataStore,
+        item_cf: bool = True,
+        item_model: Optional[ItemCooccurrenceModel] = None,
+        factor_model: Optional[FactorModel] = None
+    ) -> tuple[dict[str, list[SlateEntry]], PrecomputeReport]:
+        """
+        Rank every user, in parallel when workers > 1.
+
+        CF uses the ALS factors if given, else the item-item model (the
+        one given, or built from the store if item_cf), else user-based.
+        Returns (user ID -> slate, report); report.ranker is the table's
+        ranking_config.
+        """
+        # Imported here: recommendation imports this module for serving
+        from .recommendation import cf_backend, ranking_config
+
+        start = time.perf_counter()
+        user_ids = data_store.get_user_ids()
+        # CF model is corpus-wide, so it is built once before fanning out
+        if not item_cf:
+            item_model = None
+        elif item_model is None and factor_model is None:
+            item_model = build_item_cf_model(data_store)
+
+        slates: dict[str, list[SlateEntry]] = {}
+        workers = 1 if self.workers == 1 or len(user_ids) <= self.chunk_size else self.workers
+        if workers == 1:
+            engine = _build_engine(
+                data_store, item_model, self.learned_ranker, self.mmr, factor_model
+            )
+            for user_id in user_ids:
+                slates[user_id] = rank_user(engine, user_id, self.depth)
+        else:
+            chunks = [
+                (user_ids[i:i + self.chunk_size], self.depth)
+                for i in range(0, len(user_ids), self.chunk_size)
+            ]
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(
+                    data_store.snapshot(), item_model, self.learned_ranker, self.mmr, factor_model
+                )
+            ) as pool:
+                for results in pool.map(_rank_chunk, chunks):
+                    slates.update(results)
+
+        report = PrecomputeReport(
+            users=len(user_ids),
+            workers=workers,
+            chunk_size=self.chunk_size,
+            depth=self.depth,
+            ranker=ranking_config(
+                self.learned_ranker,
+                MMRReranker(**self.mmr) if self.mmr else None,
+                cf_backend(item_model, factor_model)
+            ),
+            seconds=time.perf_counter() - start,
+            table_bytes=estimate_size(slates),
+            peak_memory_mb=peak_memory_mb()
+        )
+        return slates, report
+
+
+class PrecomputedRecommendations:
+    """
+    Table of precomputed slates served by RecommendationEngine.
+
+    A user's slate is dropped as soon as their profile, activity or
+    feedback changes, and the whole table when the catalog changes, so
+    stale slates fall back to live ranking. The table records how it was
+    ranked (see ranking_config): lookups from an engine ranking another
+    way, or once the table is older than max_age_seconds (None: no
+    limit), miss as well.
+
+    Usage:
+        table = PrecomputedRecommendations.load(path, data_store, max_age_seconds=86400)
+        scored = table.get(user_id, limit=5, context=context, ranker=engine.ranking.config)
+    """
+
+    # Mirror RankingService's timing weight and diversity penalty
+    TIMING_WEIGHT = 0.05
+    DIVERSITY_PENALTY = 0.8
+
+    def __init__(
+        self,
+        data_store: DataStore,
+        slates: Optional[dict[str, list[SlateEntry]]] = None,
+        depth: int = 50,
+        generated_at: float = 0.0,
+        ranker: Optional[dict] = None,
+        max_age_seconds: Optional[float] = None
+    ):
+        self.data_store = data_store
+        self._slates = slates or {}
+        self.depth = depth
+        self.generated_at = generated_at
+        self.ranker = ranker or DEFAULT_RANKER
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        # Lookups refused because of the ranker or the table's age
+        self.skipped = 0
+        self.invalidations = 0
+        data_store.subscribe(self._on_change)
+
+    def __len__(self) -> int:
+        return len(self._slates)
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.generated_at
+
+    @property
+    def expired(self) -> bool:
+        return self.max_age_seconds is not None and self.age_seconds > self.max_age_seconds
+
+    def get(
+        self,
+        user_id: str,
+        limit: int,
+        context: Optional[UserContext] = None,
+        ranker: Optional[dict] = None
+    ) -> Optional[list[ScoredCandidate]]:
+        """
+        Top-`limit` precomputed recommendations (without signals), or None
+        if the user has no fresh slate, limit exceeds the table depth, the
+        table has expired, or the serving ranker settings (if given)
+        differ from the table's.
+        """
+        if self.expired or (ranker is not None and ranker != self.ranker):
+            self.skipped += 1
+            self.misses += 1
+            return None
+        slate = self._slates.get(user_id)
+        if slate is None or limit > self.depth:
+            self.misses += 1
+            return None
+        self.hits += 1
+
+        ranked = self._apply_timing(slate, context)[:limit]
+        candidates = {
+            c.id: c for c in self.data_store.get_candidates_by_ids([cid for _, cid in ranked])
+        }
+        return [
+            ScoredCandidate(candidate=candidates[cid], score=score, signals=[])
+            for score, cid in ranked if cid in candidates
+        ]
+
+    def _apply_timing(
+        self, slate: list[SlateEntry], context: Optional[UserContext]
+    ) -> list[tuple[float, str]]:
+        """
+        Re-score a context-free slate for a request context.
+
+        Learned scores do not depend on the context. MMR is unchanged by
+        adding the same timing term to every relevance, so it shifts the
+        adjusted scores as is. Under the category penalty, within a slate
+        ordered best first, the first item of each category is the one
+        that escaped the penalty, so its raw score is known; the timing
+        term is added to raw scores before the penalty, as in ranking.
+        """
+        if self.ranker["ranker"] != "heuristic":
+            return [(score, candidate_id) for candidate_id, score, _ in slate]
+        timing = context.receptivity_score * self.TIMING_WEIGHT if context else 0.0
+        if self.ranker["diversity"] != "category":
+            return [(score + timing, candidate_id) for candidate_id, score, _ in slate]
+        seen_categories = set()
+        rescored = []
+        for candidate_id, score, category in slate:
+            penalty = self.DIVERSITY_PENALTY if category in seen_categories else 1.0
+            seen_categories.add(category)
+            raw = score / penalty
+            rescored.append((min(raw + timing, 1.0) * penalty, candidate_id))
+        rescored.sort(key=lambda pair: (-pair[0], pair[1]))
+        return rescored
+
+    def clear(self) -> None:
+        """Drop every slate (e.g. after the serving ranker changes)."""
+        self.invalidations += len(self._slates)
+        self._slates = {}
+
+    def _on_change(self, event: str, user_id: Optional[str]) -> None:
+        """DataStore listener: drop slates the change makes stale."""
+        if event == "catalog":
+            self.clear()
+        elif user_id and self._slates.pop(user_id, None) is not None:
+            self.invalidations += 1
+
+    def save(self, path: str) -> None:
+        """Write the table as JSON."""
+        with open(path, "w") as f:
+            json.dump({
+                "generated_at": self.generated_at,
+                "depth": self.depth,
+                "ranker": self.ranker,
+                "slates": self._slates
+            }, f)
+
+    @classmethod
+    def load(
+        cls, path: str, data_store: DataStore, max_age_seconds: Optional[float] = None
+    ) -> "PrecomputedRecommendations":
+        """Load a table written with save()."""
+        with open(path, "r") as f:
+            data = json.load(f)
+        slates = {
+            user_id: [tuple(entry) for entry in slate]
+            for user_id, slate in data["slates"].items()
+        }
+        return cls(
+            data_store, slates,
+            depth=data["depth"],
+            generated_at=data["generated_at"],
+            ranker=data.get("ranker"),
+            max_age_seconds=max_age_seconds
+        )
+
+    def stats(self) -> dict:
+        """Table size, ranker, age and hit counters."""
+        lookups = self.hits + self.misses
+        return {
+            "users": len(self._slates),
+            "depth": self.depth,
+            "ranker": self.ranker,
+            "generated_at": self.generated_at,
+            "age_seconds": round(self.age_seconds, 1),
+            "expired": self.expired,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "skipped": self.skipped,
+            "invalidations": self.invalidations
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute recommendations for all users.")
+    parser.add_argument("--output", default="data/precomputed_recommendations.json")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--depth", type=int, default=50,
+                        help="Recommendations kept per user")
+    parser.add_argument("--no-item-cf", action="store_true",
+                        help="Use user-based CF instead of the item-item model "
+                             "(unless ALS_CF is on)")
+    args = parser.parse_args()
+
+    # Rank the way the server does, so it will serve the table
+    config = get_config()
+    learned_ranker = None
+    if config.learned_ranking and config.learned_ranker_path and Path(config.learned_ranker_path).exists():
+        learned_ranker = LearnedRanker.load(config.learned_ranker_path)
+    mmr = (
+        {"lambda_": config.mmr_lambda, "top_m": config.mmr_top_m, "similarity": config.mmr_similarity}
+        if config.mmr_diversity else None
+    )
+    data_store = DataStore()
+    # CF models as the server gets them: loaded from their paths, or built
+    # and saved there (a server only matches the table if it loads the
+    # same model files)
+    item_model = factor_model = None
+    if config.als_cf:
+        path = config.als_model_path
+        if path and Path(path).exists():
+            factor_model = FactorModel.load(path)
+        else:
+            trainer = ALSTrainer(factors=config.als_factors, workers=config.als_workers or None)
+            factor_model, _ = train_als_model(data_store, trainer)
+            if path:
+                factor_model.save(path)
+    if config.item_cf and not args.no_item_cf:
+        path = config.item_cf_model_path
+        if path and Path(path).exists():
+            item_model = ItemCooccurrenceModel.load(path)
+        else:
+            item_model = build_item_cf_model(data_store)
+            if path:
+                item_model.save(path)
+
+    batch = BatchRecommender(
+        workers=args.workers, chunk_size=args.chunk_size, depth=args.depth,
+        learned_ranker=learned_ranker, mmr=mmr
+    )
+    slates, report = batch.run(
+        data_store,
+        item_cf=config.item_cf and not args.no_item_cf,
+        item_model=item_model,
+        factor_model=factor_model
+    )
+    PrecomputedRecommendations(
+        data_store, slates, depth=args.depth, generated_at=time.time(), ranker=report.ranker
+    ).save(args.output)
+    print(report.to_dict())
+
+
+if __name__ == "__main__":
+    main()
@@ -12,13 +12,29 @@ Design for refactoring:
 - Retrieval can be enhanced with vector search
 """
 
-from datetime import datetime
-from typing import Optional
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, Optional
+
+import numpy as np
 
 from .models import (
     Candidate, User, UserActivity, UserContext, Signal, ScoredCandidate
 )
+from .cache import LRUCache
 from .data_store import DataStore
+from .als import FactorModel
+from .diversity import MMRReranker
+from .learned_ranking import (
+    COMPONENT_WEIGHTS, HEURISTIC_SUGGESTION_THRESHOLD, LearnedRanker,
+    calibrate_suggestion_threshold
+)
+from .embedding import EmbeddingRetriever
+from .item_cf import ACTION_WEIGHTS, ItemCooccurrenceModel
+from .multi_retrieval import CatalogIndex, MultiSourceRetriever
+from .precompute import PrecomputedRecommendations
+from .tracing import NULL_TRACER, Tracer
 
 
 class RetrievalService:
@@ -26,14 +42,22 @@ class RetrievalService:
     Stage 1: Candidate Retrieval.
 
     Responsible for fetching relevant candidates from the pool.
-    Currently uses keyword matching; can be enhanced with:
-    - Embedding-based similarity search
-    - Collaborative filtering
-    - Content-based filtering
+    Uses keyword matching, optionally blended with embedding-based
+    similarity search, or a MultiSourceRetriever that runs keyword,
+    TF-IDF, CF, fresh and popularity retrievers concurrently.
     """
 
-    def __init__(self, data_store: DataStore):
+    def __init__(
+        self,
+        data_store: DataStore,
+        embedding_retriever: Optional[EmbeddingRetriever] = None,
+        multi_source: Optional[MultiSourceRetriever] = None,
+        tracer: Tracer = NULL_TRACER
+    ):
         self.data_store = data_store
+        self.embedding_retriever = embedding_retriever
+        self.multi_source = multi_source
+        self.tracer = tracer
 
     def retrieve_candidates(
         self,
@@ -47,7 +71,15 @@ class RetrievalService:
         1. Match user's explicit interests
         2. Match keywords from recent activity
         3. Include high-engagement content
+        4. Nearest neighbors in embedding space (if configured)
+
+        With a multi-source retriever, its merged pool is used instead.
         """
+        if self.multi_source is not None:
+            with self.tracer.span("filter_shown"):
+                shown_ids = set(self.data_store.get_shown_candidates(user.id))
+            return self.multi_source.retrieve(user, limit, exclude=shown_ids)
+
         # Combine user interests with activity-derived keywords
         keywords = list(set(user.topics_of_interest))
         activity_keywords = self.data_store.get_user_keywords(user.id)
@@ -56,25 +88,125 @@ class RetrievalService:
         # Get candidates matching keywords
         candidates = self.data_store.get_candidates_by_keywords(keywords, limit * 2)
 
+        if self.embedding_retriever:
+            # Interleave so dense matches are not crowded out by keyword hits
+            dense = self.embedding_retriever.retrieve(user, limit * 2)
+            candidates = self._interleave(candidates, dense)
+
         # Filter out already-shown candidates
-        shown_ids = set(self.data_store.get_shown_candidates(user.id))
-        candidates = [c for c in candidates if c.id not in shown_ids]
+        with self.tracer.span("filter_shown") as span:
+            shown_ids = set(self.data_store.get_shown_candidates(user.id))
+            candidates = [c for c in candidates if c.id not in shown_ids]
+            span.set_count(len(candidates))
 
         return candidates[:limit]
 
+    def retrieve_batch(
+        self,
+        users: list[User],
+        limit: int,
+        catalog_index: CatalogIndex,
+        activities: dict[str, list[UserActivity]],
+        shown: dict[str, list[str]]
+    ) -> dict[str, list[Candidate]]:
+        """
+        retrieve_candidates for many users against one catalog index.
+
+        Activity and shown candidates come prefetched for the whole batch,
+        so no user triggers a scan of the store.
+        """
+        pools = {}
+        for user in users:
+            if self.multi_source is not None:
+                pools[user.id] = self.multi_source.retrieve(
+                    user, limit, exclude=set(shown.get(user.id, ())),
+                    activities=activities.get(user.id, [])
+                )
+                continue
+
+            keywords = set(user.topics_of_interest)
+            keywords.update(DataStore.keywords_from_activity(activities.get(user.id, [])))
+            candidates = catalog_index.match(keywords, limit * 2)
+
+            if self.embedding_retriever:
+                dense = self.embedding_retriever.retrieve(user, limit * 2)
+                candidates = self._interleave(candidates, dense)
+
+            shown_ids = set(shown.get(user.id, ()))
+            pools[user.id] = [c for c in candidates if c.id not in shown_ids][:limit]
+        return pools
+
+    @staticmethod
+    def _interleave(*sources: list[Candidate]) -> list[Candidate]:
+        """Round-robin merge of candidate lists, dropping duplicates."""
+        merged = []
+        seen = set()
+        for i in range(max((len(s) for s in sources), default=0)):
+            for source in sources:
+                if i < len(source) and source[i].id not in seen:
+                    seen.add(source[i].id)
+                    merged.append(source[i])
+        return merged
+
 
 class CollaborativeFilteringService:
     """
     Collaborative filtering based recommendations.
 
     Uses user-item interactions to find:
-    - Similar users (user-based CF)
+    - Items close to the user in latent-factor space (ALS, once a
+      FactorModel is set)
+    - Items co-engaged with the user's recent positives (item-based CF,
+      once an ItemCooccurrenceModel is set)
+    - Similar users (user-based CF, when neither model is set)
     - Popular items (popularity baseline)
+
+    Performance notes:
+    - Factor scoring is one matrix-vector product; users unseen at
+      training time or with newer feedback are folded in on demand.
+    - Item-based scoring is a sparse lookup over the user's recent
+      positives in the precomputed model; user-based scoring rescans
+      feedback for every similar user.
+    - Scores are cached per user in a bounded LRU with TTL. Feedback drops
+      the giving user's entry (and with user-based CF, those of every user
+      who could have them as a neighbor); a profile change drops that
+      user's entry.
+    - Popularity shifts from other users' feedback are bounded by the TTL.
+    - warm() precomputes entries, e.g. for active users at startup.
     """
 
-    def __init__(self, data_store: DataStore):
+    def __init__(
+        self,
+        data_store: DataStore,
+        max_entries: int = 4096,
+        ttl_seconds: float = 600.0,
+        recent_positives: int = 20
+    ):
         self.data_store = data_store
-        self._cf_cache: dict[str, dict] = {}
+        self.recent_positives = recent_positives
+        self.item_model: Optional[ItemCooccurrenceModel] = None
+        self.factor_model: Optional[FactorModel] = None
+        # Users whose feedback changed since the factor model was trained
+        self._refold: set[str] = set()
+        self._cf_cache = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.invalidations = 0
+        data_store.subscribe(self._on_change)
+
+    @property
+    def backend(self) -> str:
+        """The model CF scores currently come from; see cf_backend."""
+        return cf_backend(self.item_model, self.factor_model)
+
+    def set_item_model(self, model: Optional[ItemCooccurrenceModel]) -> None:
+        """Switch to (or refresh) item-based CF; cached scores are dropped."""
+        self.item_model = model
+        self.clear_cache()
+
+    def set_factor_model(self, model: Optional[FactorModel]) -> None:
+        """Switch to (or refresh) ALS factors; cached scores are dropped."""
+        self.factor_model = model
+        self._refold.clear()
+        self.clear_cache()
 
     def get_cf_scores(self, user_id: str) -> dict[str, float]:
         """
@@ -82,19 +214,29 @@ class CollaborativeFilteringService:
 
         Returns dict mapping candidate_id to CF score (0-1).
         """
-        # Check cache (simple TTL-free cache for MVP)
-        if user_id in self._cf_cache:
-            return self._cf_cache[user_id]
+        cf_scores = self._cf_cache.get(user_id)
+        if cf_scores is None:
+            cf_scores = self._compute_cf_scores(user_id)
+            self._cf_cache.set(user_id, cf_scores)
+        return cf_scores
 
+    def _compute_cf_scores(self, user_id: str) -> dict[str, float]:
+        """Blend item- or user-based engagement with popularity."""
         cf_scores: dict[str, float] = {}
 
-        # Get candidates from similar users
-        similar_user_candidates = self.data_store.get_candidates_engaged_by_similar_users(
-            user_id, limit=50
-        )
-        if similar_user_candidates:
-            max_score = max(score for _, score in similar_user_candidates)
-            for candidate_id, score in similar_user_candidates:
+        # Get candidates from the best available model: latent factors,
+        # item co-engagement, then similar users
+        if self.factor_model is not None:
+            engaged = self._factor_candidates(user_id, limit=50)
+        elif self.item_model is not None:
+            engaged = self._item_based_candidates(user_id, limit=50)
+        else:
+            engaged = self.data_store.get_candidates_engaged_by_similar_users(
+                user_id, limit=50
+            )
+        if engaged:
+            max_score = max(score for _, score in engaged)
+            for candidate_id, score in engaged:
                 # Normalize to 0-1
                 cf_scores[candidate_id] = score / max_score if max_score > 0 else 0
 
@@ -107,17 +249,192 @@ class CollaborativeFilteringService:
                 # Add to existing CF score or use popularity alone
                 cf_scores[candidate_id] = cf_scores.get(candidate_id, 0) + pop_score
 
-        # Cache results
-        self._cf_cache[user_id] = cf_scores
         return cf_scores
 
+    def _item_based_candidates(self, user_id: str, limit: int) -> list[tuple[str, float]]:
+        """Unseen neighbors of the user's recent positives in the item model."""
+        positives: dict[str, float] = {}
+        for _, candidate_id, action in self.data_store.get_positive_feedback(
+            user_id, limit=self.recent_positives
+        ):
+            positives[candidate_id] = positives.get(candidate_id, 0.0) + ACTION_WEIGHTS[action]
+        if not positives:
+            return []
+        return self.item_model.score(
+            positives, exclude=set(self.data_store.get_shown_candidates(user_id)), limit=limit
+        )
+
+    def _factor_candidates(self, user_id: str, limit: int) -> list[tuple[str, float]]:
+        """Unseen items scored by the user's (trained or folded-in) factors."""
+        model = self.factor_model
+        vector = None if user_id in self._refold else model.user_vector(user_id)
+        if vector is None:
+            interactions = {
+                candidate_id: weight
+                for _, candidate_id, weight in self.data_store.get_feedback_interactions(user_id)
+            }
+            vector = model.fold_in(interactions)
+            if vector is None:
+                return []
+        return model.score(
+            vector, exclude=set(self.data_store.get_shown_candidates(user_id)), limit=limit
+        )
+
+    def warm(self, user_ids: Iterable[str]) -> int:
+        """Precompute (or refresh) cached scores for users. Returns count."""
+        warmed = 0
+        for user_id in user_ids:
+            self._cf_cache.set(user_id, self._compute_cf_scores(user_id))
+            warmed += 1
+        return warmed
+
+    def warm_active_users(self, limit: int = 100) -> int:
+        """Precompute scores for the most recently active users."""
+        return self.warm(self.data_store.get_active_user_ids(limit))
+
     def clear_cache(self, user_id: Optional[str] = None) -> None:
         """Clear CF cache for a user or all users."""
         if user_id:
-            self._cf_cache.pop(user_id, None)
+            if self._cf_cache.invalidate(user_id):
+                self.invalidations += 1
         else:
+            self.invalidations += len(self._cf_cache)
             self._cf_cache.clear()
 
+    def invalidate_neighborhood(self, user_id: str) -> int:
+        """
+        Drop a user's entry and every entry that may use them as a neighbor.
+
+        Similarity is symmetric, so anyone who could list this user among
+        their top neighbors has positive similarity to them.
+        """
+        affected = {user_id}
+        affected.update(
+            other for other, _ in self.data_store.find_similar_users(user_id, limit=None)
+        )
+        removed = self._cf_cache.invalidate_where(lambda key: key in affected)
+        self.invalidations += removed
+        return removed
+
+    def _on_change(self, event: str, user_id: Optional[str]) -> None:
+        """DataStore listener: keep cached scores in step with feedback."""
+        if event == "feedback" and user_id:
+            if self.factor_model is not None:
+                # Fold the user in again from their current feedback
+                self._refold.add(user_id)
+                self.clear_cache(user_id)
+            elif self.item_model is not None:
+                # Item-based scores depend only on the user's own feedback
+                self.clear_cache(user_id)
+            else:
+                self.invalidate_neighborhood(user_id)
+        elif event == "user" and user_id:
+            # Interests decide the user's neighbors
+            self.clear_cache(user_id)
+
+    def stats(self) -> dict:
+        """Hit/miss counters, occupancy, invalidations and the item model."""
+        return {
+            **self._cf_cache.stats(),
+            "invalidations": self.invalidations,
+            "item_model": self.item_model.stats() if self.item_model is not None else None,
+            "factor_model": (
+                self.factor_model.stats() if self.factor_model is not None else None
+            )
+        }
+
+
+def utc_now() -> datetime:
+    """The current time: the default ranking clock (replays supply their own)."""
+    return datetime.now(timezone.utc)
+
+
+@lru_cache(maxsize=65536)
+def parse_timestamp(value: str) -> Optional[datetime]:
+    """Parse an ISO timestamp once per distinct value (None if invalid)."""
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+@dataclass
+class ScoreComponents:
+    """Weighted per-factor scores for one candidate (see score_components)."""
+    interest_matches: int = 0
+    interest: float = 0.0
+    activity: float = 0.0
+    cf: float = 0.0
+    engagement: float = 0.0
+    recency: float = 0.0
+    days_old: Optional[int] = None
+    timing: float = 0.0
+
+    @property
+    def total(self) -> float:
+        """Final score, capped to the 0-1 range."""
+        return min(
+            self.interest + self.activity + self.cf
+            + self.engagement + self.recency + self.timing,
+            1.0
+        )
+
+
+@dataclass
+class RankingContext:
+    """
+    Per-request state shared by every candidate being scored.
+
+    Built once by RankingService.build_context so the scoring loop only
+    does per-candidate work.
+    """
+    user: User
+    interests: frozenset[str]
+    activity_keywords: frozenset[str]
+    recent_activity_type: Optional[str]
+    context: Optional[UserContext]
+    cf_scores: dict[str, float]
+    now_utc: datetime
+    now_local: datetime
+
+    def days_since(self, created: datetime) -> int:
+        """Whole days from a (naive or aware) timestamp to now."""
+        now = self.now_local if created.tzinfo is None else self.now_utc
+        return (now - created).days
+
+
+def cf_backend(
+    item_model: Optional[ItemCooccurrenceModel] = None,
+    factor_model: Optional[FactorModel] = None
+) -> str:
+    """
+    The CF model scores come from, as CollaborativeFilteringService picks
+    it: "als@<trained_at>", "item@<built_at>" or "user" (user-based).
+    """
+    if factor_model is not None:
+        return f"als@{factor_model.trained_at}"
+    if item_model is not None:
+        return f"item@{item_model.built_at}"
+    return "user"
+
+
+def ranking_config(
+    learned: Optional[LearnedRanker] = None,
+    diversity: Optional[MMRReranker] = None,
+    cf: str = "user"
+) -> dict:
+    """
+    The settings that determine slate scores (ranker, diversity and CF
+    backend, see cf_backend), to check that stored slates were ranked the
+    way they would be now.
+    """
+    config = {"ranker": "heuristic", "diversity": "category", "cf": cf}
+    if learned is not None:
+        config["ranker"] = f"learned@{learned.trained_at}"
+    if diversity is not None:
+        config["diversity"] = f"mmr({diversity.lambda_},{diversity.top_m},{diversity.similarity})"
+    return config
+
 
 class RankingService:
     """
@@ -130,19 +447,71 @@ class RankingService:
     - Transformer-based rankers
     """
 
-    def __init__(self, data_store: DataStore):
+    def __init__(
+        self,
+        data_store: DataStore,
+        cf_service: Optional[CollaborativeFilteringService] = None,
+        diversity: Optional[MMRReranker] = None,
+        learned: Optional[LearnedRanker] = None,
+        clock: Callable[[], datetime] = utc_now,
+        tracer: Tracer = NULL_TRACER
+    ):
         self.data_store = data_store
-        self.cf_service = CollaborativeFilteringService(data_store)
+        self.cf_service = cf_service or CollaborativeFilteringService(data_store)
+        # MMR reranking in place of the category penalty, if set
+        self.diversity = diversity
+        # Trained model replacing the hand-set weights, if set
+        self.learned = learned
+        # Returns "now" (timezone-aware) for recency and time-of-day scoring
+        self.clock = clock
+        self.tracer = tracer
+
+    def set_learned_ranker(self, model: Optional[LearnedRanker]) -> None:
+        """Score with a trained model, or the heuristic when None."""
+        self.learned = model
+
+    @property
+    def config(self) -> dict:
+        """The active ranker, diversity and CF settings; see ranking_config."""
+        return ranking_config(self.learned, self.diversity, self.cf_service.backend)
+
+    @property
+    def suggestion_threshold(self) -> float:
+        """Minimum score for a proactive suggestion, on the active ranker's scale."""
+        if self.learned is not None:
+            return self.learned.suggestion_threshold
+        return HEURISTIC_SUGGESTION_THRESHOLD
+
+    def learned_scores(
+        self,
+        base: np.ndarray,
+        category_codes: np.ndarray,
+        category_names: list[str],
+        ranking_context: RankingContext
+    ) -> np.ndarray:
+        """Scores from the learned ranker; see LearnedRanker.score."""
+        return self.learned.score(
+            base, category_codes, category_names,
+            ranking_context.now_local.hour, ranking_context.user
+        )
 
     def rank_candidates(
         self,
         candidates: list[Candidate],
         user: User,
-        context: Optional[UserContext] = None
+        context: Optional[UserContext] = None,
+        limit: Optional[int] = None,
+        include_signals: bool = True,
+        ranking_context: Optional[RankingContext] = None
     ) -> list[ScoredCandidate]:
         """
         Score and rank candidates for a user.
 
+        Scores stay numeric while ranking; explanation signals are built
+        only for the items returned (the top `limit`, if given), and not
+        at all when include_signals is False. A prebuilt ranking_context
+        (see build_context) skips gathering the per-request state.
+
         Scoring factors:
         - Interest match: How well keywords match user interests (35%)
         - Activity relevance: Match with recent user activity (25%)
@@ -150,44 +519,99 @@ class RankingService:
         - Engagement: Historical engagement score of the content (10%)
         - Recency: Prefer fresh content (10%)
         - Timing: Is this the right time to show this? (5%)
-        - Diversity: Avoid too many similar suggestions
+        - Diversity: Avoid too many similar suggestions (category penalty,
+          or MMR over the top-M when a reranker is configured)
         """
         scored = []
-        user_activities = self.data_store.get_user_activity(user.id, limit=20)
-
-        # Get CF scores for this user
-        cf_scores = self.cf_service.get_cf_scores(user.id)
+        components = {}
+        ranking_context = ranking_context or self.build_context(user, context)
 
         for candidate in candidates:
-            score, signals = self._compute_score(
-                candidate, user, user_activities, context, cf_scores
-            )
-            scored.append(ScoredCandidate(
-                candidate=candidate,
-                score=score,
-                signals=signals
-            ))
-
-        # Sort by score descending
-        scored.sort(key=lambda x: x.score, reverse=True)
-
-        # Apply diversity penalty (reduce score for similar consecutive items)
-        scored = self._apply_diversity(scored)
+            item_components = self.score_components(candidate, ranking_context)
+            item = ScoredCandidate(candidate=candidate, score=item_components.total)
+            components[id(item)] = item_components
+            scored.append(item)
+
+        if self.learned is not None and scored:
+            # Replace the weighted sum with the model's engagement probability
+            base = np.array([
+                [getattr(components[id(item)], name) / weight
+                 for name, weight in COMPONENT_WEIGHTS.items()]
+                for item in scored
+            ])
+            codes: dict[str, int] = {}
+            category_codes = np.array([
+                codes.setdefault(item.candidate.category, len(codes)) for item in scored
+            ])
+            probabilities = self.learned_scores(base, category_codes, list(codes), ranking_context)
+            for item, probability in zip(scored, probabilities):
+                item.score = float(probability)
+
+        with self.tracer.span("diversity") as span:
+            span.set_count(len(scored))
+            if self.diversity is not None:
+                # MMR selects and orders the top `limit` itself
+                scored = self.diversity.rerank(scored, limit)
+            else:
+                # Sort by score descending
+                scored.sort(key=lambda x: x.score, reverse=True)
+
+                # Apply diversity penalty (reduce score for similar consecutive items)
+                scored = self._apply_diversity(scored)
+
+        if limit is not None:
+            scored = scored[:limit]
+        if include_signals:
+            for item in scored:
+                item.signals = self.explain(components[id(item)], ranking_context)
 
         return scored
 
-    def _compute_score(
+    def build_context(
         self,
-        candidate: Candidate,
         user: User,
-        activities: list[UserActivity],
-        context: Optional[UserContext],
-        cf_scores: Optional[dict[str, float]] = None
-    ) -> tuple[float, list[Signal]]:
+        context: Optional[UserContext] = None,
+        activities: Optional[list[UserActivity]] = None
+    ) -> RankingContext:
         """
-        Compute relevance score and explanation signals.
+        Gather everything about the request that does not depend on the
+        candidate: interest and activity keyword sets, CF scores, and the
+        current time (from the service's clock).
 
-        Returns (score, signals) where score is 0-1 normalized.
+        Pass the user's recent activity (newest first) if already fetched.
+        """
+        if activities is None:
+            activities = self.data_store.get_user_activity(user.id, limit=20)
+
+        activity_keywords = set()
+        for a in activities[:10]:
+            activity_keywords.update(a.keywords)
+            if a.query:
+                activity_keywords.update(a.query.lower().split())
+
+        with self.tracer.span("cf") as span:
+            cf_scores = self.cf_service.get_cf_scores(user.id)
+            span.set_count(len(cf_scores))
+
+        now = self.clock()
+        return RankingContext(
+            user=user,
+            interests=frozenset(user.topics_of_interest),
+            activity_keywords=frozenset(activity_keywords),
+            recent_activity_type=activities[0].activity_type if activities else None,
+            context=context,
+            cf_scores=cf_scores,
+            now_utc=now,
+            now_local=now.astimezone().replace(tzinfo=None)
+        )
+
+    def score_components(
+        self,
+        candidate: Candidate,
+        ranking_context: RankingContext
+    ) -> ScoreComponents:
+        """
+        Compute the weighted score components for one candidate.
 
         Weight distribution:
         - Interest match: 35%
@@ -197,96 +621,106 @@ class RankingService:
         - Recency: 10%
         - Timing: 5%
         """
-        signals = []
-        score_components = []
+        keywords = set(candidate.keywords)
+        components = ScoreComponents()
 
         # 1. Interest match (weight: 0.35)
-        interest_matches = candidate.matches_interests(user.topics_of_interest)
-        if interest_matches > 0:
-            interest_score = min(interest_matches / 3, 1.0) * 0.35
-            score_components.append(interest_score)
-            signals.append(Signal(
-                type="match",
-                description=f"Matches {interest_matches} of your interests",
-                weight=interest_score
-            ))
+        components.interest_matches = len(keywords & ranking_context.interests)
+        components.interest = min(components.interest_matches / 3, 1.0) * 0.35
 
         # 2. Activity relevance (weight: 0.25)
-        activity_keywords = []
-        for a in activities[:10]:
-            activity_keywords.extend(a.keywords)
-            if a.query:
-                activity_keywords.extend(a.query.lower().split())
-
-        activity_matches = len(set(candidate.keywords) & set(activity_keywords))
-        if activity_matches > 0:
-            activity_score = min(activity_matches / 5, 1.0) * 0.25
-            score_components.append(activity_score)
-
-            # Generate descriptive signal based on activity type
-            recent_activity = activities[0] if activities else None
-            if recent_activity:
-                if recent_activity.activity_type == "article_read":
-                    signals.append(Signal(
-                        type="reading_history",
-                        description=f"Related to articles you've been reading",
-                        weight=activity_score
-                    ))
-                elif recent_activity.activity_type == "search":
-                    signals.append(Signal(
-                        type="search_history",
-                        description=f"Related to your recent searches",
-                        weight=activity_score
-                    ))
+        activity_matches = len(keywords & ranking_context.activity_keywords)
+        components.activity = min(activity_matches / 5, 1.0) * 0.25
 
         # 3. Collaborative filtering (weight: 0.15)
-        if cf_scores and candidate.id in cf_scores:
-            cf_score = cf_scores[candidate.id] * 0.15
-            score_components.append(cf_score)
-            if cf_score > 0.05:  # Only show signal if significant
-                signals.append(Signal(
-                    type="similar_users",
-                    description="Liked by users with similar interests",
-                    weight=cf_score
-                ))
+        components.cf = ranking_context.cf_scores.get(candidate.id, 0.0) * 0.15
 
         # 4. Engagement score (weight: 0.10)
-        engagement_score = min(candidate.engagement_score / 5, 1.0) * 0.10
-        score_components.append(engagement_score)
+        components.engagement = min(candidate.engagement_score / 5, 1.0) * 0.10
 
         # 5. Recency (weight: 0.10)
-        try:
-            created = datetime.fromisoformat(candidate.created_at.replace('Z', '+00:00'))
-            days_old = (datetime.now(created.tzinfo) - created).days
-            recency_score = max(0, 1 - days_old / 30) * 0.10
-            score_components.append(recency_score)
-            if days_old < 3:
-                signals.append(Signal(
-                    type="trending",
-                    description="Fresh content from the last few days",
-                    weight=recency_score
-                ))
-        except (ValueError, TypeError):
-            pass
+        created = parse_timestamp(candidate.created_at)
+        if created is not None:
+            components.days_old = ranking_context.days_since(created)
+            components.recency = max(0, 1 - components.days_old / 30) * 0.10
 
         # 6. Timing (weight: 0.05)
-        if context:
-            timing_score = context.receptivity_score * 0.05
-            score_components.append(timing_score)
-            if context.receptivity_score > 0.7:
+        if ranking_context.context:
+            components.timing = ranking_context.context.receptivity_score * 0.05
+
+        return components
+
+    def attach_signals(
+        self,
+        scored: list[ScoredCandidate],
+        user: User,
+        context: Optional[UserContext] = None
+    ) -> None:
+        """
+        Build explanation signals for already-ranked items, in place.
+
+        Used when signals were skipped during ranking, e.g. for one page
+        of a deeper ranked list.
+        """
+        ranking_context = self.build_context(user, context)
+        for item in scored:
+            item.signals = self.explain(
+                self.score_components(item.candidate, ranking_context), ranking_context
+            )
+
+    def explain(
+        self,
+        components: ScoreComponents,
+        ranking_context: RankingContext
+    ) -> list[Signal]:
+        """Build the explanation signals for a candidate's score components."""
+        signals = []
+
+        if components.interest_matches > 0:
+            signals.append(Signal(
+                type="match",
+                description=f"Matches {components.interest_matches} of your interests",
+                weight=components.interest
+            ))
+
+        # Describe activity matches by the most recent activity type
+        if components.activity > 0:
+            if ranking_context.recent_activity_type == "article_read":
+                signals.append(Signal(
+                    type="reading_history",
+                    description="Related to articles you've been reading",
+                    weight=components.activity
+                ))
+            elif ranking_context.recent_activity_type == "search":
                 signals.append(Signal(
-                    type="timing",
-                    description="Optimal time based on your patterns",
-                    weight=timing_score
+                    type="search_history",
+                    description="Related to your recent searches",
+                    weight=components.activity
                 ))
 
-        # Calculate final score
-        total_score = sum(score_components)
+        if components.cf > 0.05:  # Only show signal if significant
+            signals.append(Signal(
+                type="similar_users",
+                description="Liked by users with similar interests",
+                weight=components.cf
+            ))
+
+        if components.days_old is not None and components.days_old < 3:
+            signals.append(Signal(
+                type="trending",
+                description="Fresh content from the last few days",
+                weight=components.recency
+            ))
 
-        # Normalize to 0-1 range
-        normalized_score = min(total_score / 1.0, 1.0)
+        context = ranking_context.context
+        if context and context.receptivity_score > 0.7:
+            signals.append(Signal(
+                type="timing",
+                description="Optimal time based on your patterns",
+                weight=components.timing
+            ))
 
-        return normalized_score, signals
+        return signals
 
     def _apply_diversity(
         self, scored: list[ScoredCandidate]
@@ -312,6 +746,88 @@ class RankingService:
         return result
 
 
+class RecommendationCache:
+    """
+    Cache of ranked recommendation slates per user.
+
+    Entries are keyed on (user, limit, signals flag, receptivity, catalog
+    version), expire after a TTL and are bounded by LRU. They are dropped
+    as soon as the DataStore reports a change to that user's profile,
+    activity or feedback, and all at once when the catalog changes.
+    Items are copied in and out, so callers that rescore or attach
+    signals to a slate never alter the cached one.
+    """
+
+    def __init__(
+        self,
+        data_store: DataStore,
+        max_entries: int = 2048,
+        ttl_seconds: float = 300.0
+    ):
+        self.data_store = data_store
+        self._cache = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.invalidations = 0
+        data_store.subscribe(self._on_change)
+
+    def _key(
+        self,
+        user_id: str,
+        limit: int,
+        context: Optional[UserContext],
+        include_signals: bool
+    ) -> tuple:
+        receptivity = round(context.receptivity_score, 2) if context else None
+        return (user_id, limit, include_signals, receptivity, self.data_store.catalog_version)
+
+    def get(
+        self,
+        user_id: str,
+        limit: int,
+        context: Optional[UserContext],
+        include_signals: bool
+    ) -> Optional[list[ScoredCandidate]]:
+        """Cached slate, or None on miss. Returns new items each time."""
+        slate = self._cache.get(self._key(user_id, limit, context, include_signals))
+        return self._copy(slate) if slate is not None else None
+
+    def set(
+        self,
+        user_id: str,
+        limit: int,
+        context: Optional[UserContext],
+        include_signals: bool,
+        slate: list[ScoredCandidate]
+    ) -> None:
+        self._cache.set(self._key(user_id, limit, context, include_signals), self._copy(slate))
+
+    @staticmethod
+    def _copy(slate: list[ScoredCandidate]) -> list[ScoredCandidate]:
+        """Copies of the items (candidates are shared; they are not mutated)."""
+        return [replace(item, signals=list(item.signals)) for item in slate]
+
+    def invalidate_user(self, user_id: str) -> int:
+        """Drop every cached slate for a user. Returns count."""
+        removed = self._cache.invalidate_where(lambda key: key[0] == user_id)
+        self.invalidations += removed
+        return removed
+
+    def clear(self) -> None:
+        """Drop every cached slate (e.g. after the ranker changes)."""
+        self.invalidations += len(self._cache)
+        self._cache.clear()
+
+    def _on_change(self, event: str, user_id: Optional[str]) -> None:
+        """DataStore listener: invalidate exactly what the change affects."""
+        if event == "catalog":
+            self.clear()
+        elif user_id:
+            self.invalidate_user(user_id)
+
+    def stats(self) -> dict:
+        """Hit/miss counters, occupancy and event-driven invalidations."""
+        return {**self._cache.stats(), "invalidations": self.invalidations}
+
+
 class RecommendationEngine:
     """
     Main recommendation engine combining retrieval and ranking.
@@ -321,16 +837,44 @@ class RecommendationEngine:
         recommendations = engine.get_recommendations(user_id, limit=5)
     """
 
-    def __init__(self, data_store: DataStore):
+    def __init__(
+        self,
+        data_store: DataStore,
+        embedding_retriever: Optional[EmbeddingRetriever] = None,
+        vectorized_ranking: bool = False,
+        cache: Optional[RecommendationCache] = None,
+        cf_service: Optional[CollaborativeFilteringService] = None,
+        precomputed: Optional[PrecomputedRecommendations] = None,
+        multi_source: Optional[MultiSourceRetriever] = None,
+        diversity: Optional[MMRReranker] = None,
+        learned_ranker: Optional[LearnedRanker] = None,
+        clock: Callable[[], datetime] = utc_now,
+        tracer: Tracer = NULL_TRACER
+    ):
         self.data_store = data_store
-        self.retrieval = RetrievalService(data_store)
-        self.ranking = RankingService(data_store)
+        self.tracer = tracer
+        self.retrieval = RetrievalService(data_store, embedding_retriever, multi_source, tracer)
+        self.ranking = RankingService(
+            data_store, cf_service, diversity, learned_ranker, clock, tracer
+        )
+        self.cache = cache
+        self.precomputed = precomputed
+        self.vectorized_ranker = None
+        if vectorized_ranking:
+            # Imported here: vector_ranking builds on this module
+            from .vector_ranking import VectorizedRanker
+            self.vectorized_ranker = VectorizedRanker(data_store, self.ranking)
+
+    def set_tracer(self, tracer: Tracer) -> None:
+        """Record stage timings into a different tracer (every stage)."""
+        self.tracer = self.retrieval.tracer = self.ranking.tracer = tracer
 
     def get_recommendations(
         self,
         user_id: str,
         limit: int = 5,
-        context: Optional[UserContext] = None
+        context: Optional[UserContext] = None,
+        include_signals: bool = True
     ) -> list[ScoredCandidate]:
         """
         Get personalized recommendations for a user.
@@ -339,31 +883,214 @@ class RecommendationEngine:
         1. Fetch user profile
         2. Retrieve candidate pool
         3. Rank candidates
-        4. Return top-K
+        4. Return top-K (with signals unless include_signals is False)
+
+        Slates are served from the recommendation cache, then the
+        precomputed table, when configured. Each stage is timed by the
+        engine's tracer.
         """
-        # Get user
-        user = self.data_store.get_user(user_id)
-        if not user:
-            # Create default user if not exists
-            user = User(
-                id=user_id,
-                name="Anonymous",
-                email="",
-                topics_of_interest=["general"]
-            )
+        with self.tracer.span("request") as request_span:
+            with self.tracer.span("cache") as span:
+                scored = self._serve_stored(user_id, limit, context, include_signals)
+                span.set_count(len(scored) if scored is not None else 0)
+            if scored is None:
+                scored = self._rank(user_id, limit, context, include_signals)
+                if self.cache is not None:
+                    self.cache.set(user_id, limit, context, include_signals, scored)
+            request_span.set_count(len(scored))
+        return scored
+
+    def get_recommendations_batch(
+        self,
+        user_ids: list[str],
+        limit: int = 5,
+        contexts: Optional[dict[str, UserContext]] = None,
+        include_signals: bool = True,
+        chunk_size: int = 256
+    ) -> Iterator[tuple[str, list[ScoredCandidate]]]:
+        """
+        Recommendations for many users, yielded as each user completes.
+
+        Results match get_recommendations for each user, but the catalog
+        is indexed once for the whole batch and each chunk of users has
+        its profiles, activity and shown candidates fetched in one pass
+        over the store. Cached and precomputed slates are yielded first
+        within a chunk.
+        """
+        contexts = contexts or {}
+        catalog_index = None
+        for i in range(0, len(user_ids), chunk_size):
+            misses = []
+            for user_id in user_ids[i:i + chunk_size]:
+                context = contexts.get(user_id)
+                scored = self._serve_stored(user_id, limit, context, include_signals)
+                if scored is None:
+                    misses.append(user_id)
+                else:
+                    yield user_id, scored
+            if not misses:
+                continue
+
+            if catalog_index is None:
+                catalog_index = CatalogIndex(self.data_store.get_all_candidates())
+            with self.tracer.span("user_batch") as span:
+                known = self.data_store.get_users_by_ids(misses)
+                users = [known.get(user_id) or self._default_user(user_id) for user_id in misses]
+                activities = self.data_store.get_user_activity_batch(misses, limit=20)
+                span.set_count(len(users))
+            with self.tracer.span("retrieve_batch") as span:
+                shown = self.data_store.get_shown_candidates_batch(misses)
+                pools = self.retrieval.retrieve_batch(
+                    users, limit * 5, catalog_index, activities, shown
+                )
+                span.set_count(sum(len(pool) for pool in pools.values()))
+
+            for user in users:
+                context = contexts.get(user.id)
+                candidates = pools[user.id] or self._fallback_pool(
+                    catalog_index.catalog, shown.get(user.id, ()), limit
+                )
+                ranking_context = self.ranking.build_context(
+                    user, context, activities=activities[user.id]
+                )
+                scored = self._rank_pool(
+                    user, candidates, limit, context, include_signals, ranking_context
+                )
+                if self.cache is not None:
+                    self.cache.set(user.id, limit, context, include_signals, scored)
+                yield user.id, scored
+
+    def _serve_stored(
+        self,
+        user_id: str,
+        limit: int,
+        context: Optional[UserContext],
+        include_signals: bool
+    ) -> Optional[list[ScoredCandidate]]:
+        """A slate from the cache or precomputed table, or None if neither has one."""
+        if self.cache is not None:
+            cached = self.cache.get(user_id, limit, context, include_signals)
+            if cached is not None:
+                return cached
+
+        if self.precomputed is None:
+            return None
+        scored = self.precomputed.get(user_id, limit, context, self.ranking.config)
+        if scored is None:
+            return None
+        if include_signals:
+            self.attach_signals(user_id, scored, context)
+        if self.cache is not None:
+            self.cache.set(user_id, limit, context, include_signals, scored)
+        return scored
+
+    def _rank(
+        self,
+        user_id: str,
+        limit: int,
+        context: Optional[UserContext],
+        include_signals: bool
+    ) -> list[ScoredCandidate]:
+        """Run retrieval and ranking for one request."""
+        with self.tracer.span("user"):
+            user = self._get_user(user_id)
 
         # Retrieve candidates
-        candidates = self.retrieval.retrieve_candidates(user, limit=limit * 5)
+        with self.tracer.span("retrieve") as span:
+            candidates = self.retrieval.retrieve_candidates(user, limit=limit * 5)
+
+            if not candidates:
+                # Fallback to all candidates if no matches
+                candidates = self._fallback_pool(
+                    self.data_store.get_all_candidates(),
+                    self.data_store.get_shown_candidates(user.id), limit
+                )
+            span.set_count(len(candidates))
+
+        return self._rank_pool(user, candidates, limit, context, include_signals)
+
+    @staticmethod
+    def _fallback_pool(
+        catalog: list[Candidate], shown: Iterable[str], limit: int
+    ) -> list[Candidate]:
+        """Pool used when retrieval finds nothing: catalog items not yet shown."""
+        shown_ids = set(shown)
+        return [c for c in catalog if c.id not in shown_ids][:limit * 3]
 
-        if not candidates:
-            # Fallback to all candidates if no matches
-            candidates = self.data_store.get_all_candidates()[:limit * 3]
+    def _rank_pool(
+        self,
+        user: User,
+        candidates: list[Candidate],
+        limit: int,
+        context: Optional[UserContext],
+        include_signals: bool,
+        ranking_context: Optional[RankingContext] = None
+    ) -> list[ScoredCandidate]:
+        """Rank a retrieved pool and return the top `limit`."""
+        with self.tracer.span("rank") as span:
+            span.set_count(len(candidates))
+            if self.vectorized_ranker:
+                # Rank with array ops and select top-K in one step
+                return self.vectorized_ranker.rank_top_k(
+                    candidates, user, context, k=limit,
+                    include_signals=include_signals, ranking_context=ranking_context
+                )
+
+            # Rank candidates and return top-K
+            return self.ranking.rank_candidates(
+                candidates, user, context, limit=limit,
+                include_signals=include_signals, ranking_context=ranking_context
+            )
 
-        # Rank candidates
-        scored = self.ranking.rank_candidates(candidates, user, context)
+    def attach_signals(
+        self,
+        user_id: str,
+        scored: list[ScoredCandidate],
+        context: Optional[UserContext] = None
+    ) -> None:
+        """Build explanation signals for recommendations ranked without them."""
+        self.ranking.attach_signals(scored, self._get_user(user_id), context)
+
+    def _get_user(self, user_id: str) -> User:
+        """Get a user, or a default profile if they do not exist."""
+        return self.data_store.get_user(user_id) or self._default_user(user_id)
+
+    @staticmethod
+    def _default_user(user_id: str) -> User:
+        """Profile used for users that do not exist yet."""
+        return User(
+            id=user_id,
+            name="Anonymous",
+            email="",
+            topics_of_interest=["general"]
+        )
 
-        # Return top-K
-        return scored[:limit]
+    def calibrate_suggestions(self, model: LearnedRanker, user_ids: list[str]) -> float:
+        """
+        Set a learned model's suggestion_threshold so that it passes the
+        same share of these users' top recommendations as the heuristic.
+
+        Ranks each user with both rankers on uncached engines (this
+        engine's model and caches are left alone). Returns the threshold.
+        """
+        tops = []
+        for learned in (None, model):
+            engine = RecommendationEngine(
+                self.data_store,
+                vectorized_ranking=True,
+                cf_service=self.ranking.cf_service,
+                diversity=self.ranking.diversity,
+                learned_ranker=learned,
+                clock=self.ranking.clock
+            )
+            scores = []
+            for user_id in user_ids:
+                context = UserContext(user_id=user_id, receptivity_score=0.7)
+                slate = engine.get_recommendations(user_id, 1, context, include_signals=False)
+                scores.append(slate[0].score if slate else 0.0)
+            tops.append(np.array(scores))
+        model.suggestion_threshold = calibrate_suggestion_threshold(*tops)
+        return model.suggestion_threshold
 
     def get_proactive_suggestion(
         self,
@@ -382,8 +1109,8 @@ class RecommendationEngine:
 
         top = recommendations[0]
 
-        # Quality threshold: only suggest if score > 0.5
-        if top.score < 0.5:
+        # Quality threshold, calibrated to the ranker in use
+        if top.score < self.ranking.suggestion_threshold:
             return None
 
         return top
@@ -0,0 +1,341 @@
+"""
+Offline Replay Evaluation.
+
+Replays the store's activity and feedback log in time order through a
+RecommendationEngine whose clock is moved to each event's timestamp, so
+every request sees only what had happened by then. The oldest part of
+the log is loaded up front as history; over the rest, each positive
+engagement ("started" / "replied") becomes a recommendation request for
+that user just before the engagement is recorded, judged against what
+the user went on to engage with within the horizon.
+
+Quality and speed are reported from the same run, so a ranking change
+that helps one at the cost of the other shows up in both:
+- NDCG@k and recall@k against the horizon's engagements (items already
+  shown to the user, which the pipeline never re-recommends, and items
+  not yet in the catalog are left out of the relevant set)
+- coverage: share of the catalog recommended at least once
+- latency percentiles per pipeline stage (from the engine's tracer,
+  see app.tracing), for ingesting events, and request throughput
+
+The replay starts from the catalog as of the cutoff, with later items
+released as the clock passes their created_at, and with engagement
+scores rewound by the deltas of the feedback still to be replayed.
+User profiles (interests, preferred hours) are current, not historical.
+
+Usage:
+    python -m app.replay [--data data/candidates.json] [--k 10] [--eval-fraction 0.2]
+"""
+
+import argparse
+import bisect
+import math
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from .data_store import DataStore, FEEDBACK_SCORE_DELTAS
+from .diversity import MMRReranker
+from .item_cf import ACTION_WEIGHTS
+from .learned_ranking import RankerTrainer
+from .models import Feedback, UserActivity, UserContext
+from .recommendation import RecommendationEngine, parse_timestamp
+from .tracing import Tracer
+
+
+def event_time(value: Optional[str]) -> Optional[datetime]:
+    """Timestamp as an aware UTC datetime (naive ones are local), or None."""
+    parsed = parse_timestamp(value) if value else None
+    return parsed.astimezone(timezone.utc) if parsed is not None else None
+
+
+def ndcg_at_k(ranked: list[str], relevant: set[str], k: int) -> float:
+    """Binary-relevance NDCG of the first k IDs."""
+    dcg = sum(1 / math.log2(i + 2) for i, cid in enumerate(ranked[:k]) if cid in relevant)
+    ideal = sum(1 / math.log2(i + 2) for i in range(min(len(relevant), k)))
+    return dcg / ideal if ideal else 0.0
+
+
+class ReplayClock:
+    """Clock for RankingService that returns the replay's current time."""
+
+    def __init__(self, now: Optional[datetime] = None):
+        self.now = now or datetime.now(timezone.utc)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+class ReplayStore(DataStore):
+    """In-memory DataStore for replays: changes never reach the data file."""
+
+    def _save_data(self) -> None:
+        pass
+
+    def add_candidates(self, candidates: list[dict]) -> None:
+        """Add raw candidate records as one catalog change."""
+        self._data.setdefault("candidates", []).extend(candidates)
+        self.catalog_version += 1
+        self._notify("catalog")
+
+
+# Builds the engine under test on the replay store (which holds only the
+# history at that point, so models trained here see no future events)
+EngineFactory = Callable[[DataStore, ReplayClock], RecommendationEngine]
+
+
+def default_engine(data_store: DataStore, clock: ReplayClock) -> RecommendationEngine:
+    """The serving pipeline without caches: vectorized heuristic ranking."""
+    return RecommendationEngine(data_store, vectorized_ranking=True, clock=clock)
+
+
+@dataclass
+class ReplayReport:
+    """Quality and latency of one replay."""
+    k: int
+    events: int
+    requests: int
+    ndcg: float
+    recall: float
+    coverage: float
+    latency_ms: dict[str, dict]
+    requests_per_second: float
+    seconds: float
+
+    def to_dict(self) -> dict:
+        return {
+            "k": self.k,
+            "events": self.events,
+            "requests": self.requests,
+            f"ndcg@{self.k}": round(self.ndcg, 4),
+            f"recall@{self.k}": round(self.recall, 4),
+            "coverage": round(self.coverage, 4),
+            "latency_ms": self.latency_ms,
+            "requests_per_second": round(self.requests_per_second, 1),
+            "seconds": round(self.seconds, 3)
+        }
+
+
+class ReplayHarness:
+    """
+    Time-ordered replay of a store's log through a recommendation engine.
+
+    The oldest (1 - eval_fraction) of timestamped events is history;
+    the rest are replayed one at a time. Events without a parsable
+    timestamp are treated as history.
+
+    Usage:
+        report = ReplayHarness(k=10).run(DataStore())
+    """
+
+    def __init__(
+        self,
+        k: int = 10,
+        eval_fraction: float = 0.2,
+        horizon_hours: float = 24.0,
+        receptivity: float = 0.7,
+        max_requests: Optional[int] = None
+    ):
+        if not 0 < eval_fraction <= 1:
+            raise ValueError("eval_fraction must be in (0, 1]")
+        self.k = k
+        self.eval_fraction = eval_fraction
+        self.horizon = timedelta(hours=horizon_hours)
+        self.receptivity = receptivity
+        self.max_requests = max_requests
+
+    def run(
+        self, source: DataStore, engine_factory: EngineFactory = default_engine
+    ) -> ReplayReport:
+        """Replay the source store's log; the source is not modified."""
+        start = time.perf_counter()
+        data = source.snapshot()
+        untimed, events = self._events(data)
+        split = len(events) - max(1, int(len(events) * self.eval_fraction)) if events else 0
+        history, replayed = events[:split], events[split:]
+        cutoff = replayed[0][0] if replayed else datetime.now(timezone.utc)
+
+        store, pending = self._initial_store(data, untimed + history, replayed, cutoff)
+        available = {c["id"] for c in store.snapshot().get("candidates", [])}
+        clock = ReplayClock(cutoff)
+        engine = engine_factory(store, clock)
+        tracer = Tracer()
+        engine.set_tracer(tracer)
+        engagements = self._engagements(replayed)
+
+        requests, ndcg, recall = 0, 0.0, 0.0
+        recommended: set[str] = set()
+        for when, kind, record in replayed:
+            clock.now = when
+            released = []
+            while pending and pending[0][0] <= when:
+                released.append(pending.popleft()[1])
+            if released:
+                store.add_candidates(released)
+                available.update(c["id"] for c in released)
+
+            is_request = (
+                kind == "feedback" and record.get("action") in ACTION_WEIGHTS
+                and (self.max_requests is None or requests < self.max_requests)
+            )
+            if is_request:
+                user_id = record["user_id"]
+                relevant = self._relevant(
+                    engagements[user_id], when, available, set(store.get_shown_candidates(user_id))
+                )
+                if relevant:
+                    slate = engine.get_recommendations(
+                        user_id, self.k,
+                        UserContext(user_id=user_id, receptivity_score=self.receptivity),
+                        include_signals=False
+                    )
+                    ranked = [sc.candidate.id for sc in slate]
+                    ndcg += ndcg_at_k(ranked, relevant, self.k)
+                    recall += len(relevant.intersection(ranked[:self.k])) / len(relevant)
+                    recommended.update(ranked)
+                    requests += 1
+
+            with tracer.span("ingest"):
+                self._apply(store, kind, record)
+
+        stages = tracer.stats()["stages"]
+        request_seconds = stages["request"]["duration_ms"]["sum"] / 1000 if requests else 0.0
+        return ReplayReport(
+            k=self.k,
+            events=len(replayed),
+            requests=requests,
+            ndcg=ndcg / requests if requests else 0.0,
+            recall=recall / requests if requests else 0.0,
+            coverage=len(recommended) / len(available) if available else 0.0,
+            latency_ms={name: stage["duration_ms"] for name, stage in stages.items()},
+            requests_per_second=requests / request_seconds if request_seconds else 0.0,
+            seconds=time.perf_counter() - start
+        )
+
+    @staticmethod
+    def _events(data: dict) -> tuple[list, list]:
+        """
+        (untimed, timed) events as (time, kind, record), timed ones in
+        time order; activity sorts before feedback at the same instant.
+        """
+        untimed, timed = [], []
+        sources = (
+            ("activity", "timestamp", data.get("user_activity", [])),
+            ("feedback", "created_at", data.get("feedback", []))
+        )
+        for kind, field, records in sources:
+            for record in records:
+                when = event_time(record.get(field))
+                (timed if when is not None else untimed).append((when, kind, record))
+        timed.sort(key=lambda event: (event[0], event[1] == "feedback"))
+        return untimed, timed
+
+    @staticmethod
+    def _initial_store(
+        data: dict, history: list, replayed: list, cutoff: datetime
+    ) -> tuple[ReplayStore, deque]:
+        """
+        Store as of the cutoff, and the candidates to release later
+        ((created time, record), oldest first).
+        """
+        # Engagement before the replay: current score minus replayed deltas
+        deltas: dict[str, float] = defaultdict(float)
+        for _, kind, record in replayed:
+            if kind == "feedback":
+                deltas[record["candidate_id"]] += FEEDBACK_SCORE_DELTAS.get(record.get("action"), 0.0)
+
+        catalog, pending = [], []
+        for candidate in data.get("candidates", []):
+            record = {**candidate}
+            record["engagement_score"] = record.get("engagement_score", 0) - deltas.get(record["id"], 0.0)
+            created = event_time(record.get("created_at"))
+            if created is not None and created > cutoff:
+                pending.append((created, record))
+            else:
+                catalog.append(record)
+        pending.sort(key=lambda item: item[0])
+
+        store = ReplayStore(data={
+            "candidates": catalog,
+            "users": list(data.get("users", [])),
+            "user_activity": [r for _, kind, r in history if kind == "activity"],
+            "feedback": [r for _, kind, r in history if kind == "feedback"]
+        })
+        return store, deque(pending)
+
+    @staticmethod
+    def _engagements(replayed: list) -> dict[str, tuple[list, list]]:
+        """Per user, the (times, candidate IDs) of replayed positive feedback."""
+        engagements: dict[str, tuple[list, list]] = defaultdict(lambda: ([], []))
+        for when, kind, record in replayed:
+            if kind == "feedback" and record.get("action") in ACTION_WEIGHTS:
+                times, ids = engagements[record["user_id"]]
+                times.append(when)
+                ids.append(record["candidate_id"])
+        return engagements
+
+    def _relevant(
+        self,
+        engagements: tuple[list, list],
+        when: datetime,
+        available: set[str],
+        shown: set[str]
+    ) -> set[str]:
+        """Candidates engaged with in [when, when + horizon] that can be recommended now."""
+        times, ids = engagements
+        lo = bisect.bisect_left(times, when)
+        hi = bisect.bisect_right(times, when + self.horizon)
+        return {cid for cid in ids[lo:hi] if cid in available and cid not in shown}
+
+    @staticmethod
+    def _apply(store: DataStore, kind: str, record: dict) -> None:
+        """Record one event through the store, as the API would."""
+        if kind == "activity":
+            store.add_user_activity(UserActivity(**record))
+        else:
+            store.record_feedback(Feedback(**record))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the activity/feedback log")
+    parser.add_argument("--data", default="data/candidates.json")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--eval-fraction", type=float, default=0.2)
+    parser.add_argument("--horizon-hours", type=float, default=24.0)
+    parser.add_argument("--max-requests", type=int, default=None)
+    parser.add_argument("--python-ranking", action="store_true",
+                        help="Rank with the per-candidate Python path")
+    parser.add_argument("--mmr-lambda", type=float, default=None,
+                        help="Rerank the top-M with MMR at this lambda")
+    parser.add_argument("--learned", action="store_true",
+                        help="Train the learned ranker on the history and rank with it")
+    args = parser.parse_args()
+
+    def engine_factory(data_store: DataStore, clock: ReplayClock) -> RecommendationEngine:
+        learned = None
+        if args.learned:
+            try:
+                learned, ranker_report = RankerTrainer().fit(data_store)
+                print(f"Learned ranker: {ranker_report.to_dict()}")
+            except ValueError as e:
+                print(f"Learned ranker unavailable ({e}); using heuristic weights")
+        return RecommendationEngine(
+            data_store,
+            vectorized_ranking=not args.python_ranking,
+            diversity=MMRReranker(lambda_=args.mmr_lambda) if args.mmr_lambda else None,
+            learned_ranker=learned,
+            clock=clock
+        )
+
+    harness = ReplayHarness(
+        k=args.k, eval_fraction=args.eval_fraction,
+        horizon_hours=args.horizon_hours, max_requests=args.max_requests
+    )
+    report = harness.run(DataStore(args.data), engine_factory)
+    print(report.to_dict())
+
+
+if __name__ == "__main__":
+    main()
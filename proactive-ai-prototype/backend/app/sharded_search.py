@@ -0,0 +1,289 @@
+"""
+Sharded Search.
+
+Partitions the TF-IDF search corpus into N shards, each owned by a worker
+process with its own inverted index. A query vector is computed once in
+the parent, fanned out to every shard over a pipe, and the per-shard
+top-k lists are merged with a heap.
+
+Performance notes:
+- Shards score postings in parallel, so query latency on large catalogs
+  drops roughly with the number of cores instead of being bound by one
+  Python thread.
+- Document weights are computed with the corpus-wide IDF (exported from
+  TextSimilarity), so scores are comparable across shards and the merge
+  is exact.
+- Documents are assigned to shards by a stable hash of their ID, so
+  incremental adds always land on the same shard.
+- Each shard keeps the IDF statistics it was built with, and weights
+  documents added later with them too, while the in-process path uses
+  the current IDF; rebuild to refresh weights after large ingests.
+- Searches block on the shard pipes, so async callers run them in a
+  thread pool. If a worker dies, or does not reply within the timeout,
+  the index shuts down and raises ShardUnavailableError so the caller
+  can search in-process.
+
+Design for refactoring:
+- Can be replaced with Elasticsearch/OpenSearch shards or a Rust index
+"""
+
+import hashlib
+import heapq
+import math
+import multiprocessing
+import threading
+import time
+from itertools import islice
+from multiprocessing.connection import Connection
+
+from .text_similarity import TextSimilarity
+
+
+class SearchShard:
+    """
+    Inverted index over one partition of the corpus.
+
+    Postings hold L2-normalized TF-IDF weights, so a query's cosine
+    similarity to a document is its dot product divided by the query norm.
+    """
+
+    def __init__(self, document_frequencies: dict[str, int], num_documents: int):
+        self.similarity = TextSimilarity()
+        self.similarity.load_index(document_frequencies, num_documents)
+        self._ids: list[str] = []
+        # term -> [(document index, normalized weight)]
+        self._postings: dict[str, list[tuple[int, float]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index one document."""
+        vector = self.similarity.compute_tfidf_vector(text)
+        norm = math.sqrt(sum(v ** 2 for v in vector.values()))
+        index = len(self._ids)
+        self._ids.append(doc_id)
+        if norm == 0:
+            return
+        for term, weight in vector.items():
+            self._postings.setdefault(term, []).append((index, weight / norm))
+
+    def search(self, query_vector: dict[str, float], top_k: int) -> list[tuple[str, float]]:
+        """Top-k (id, cosine score) pairs for a query vector, best first."""
+        query_norm = math.sqrt(sum(v ** 2 for v in query_vector.values()))
+        if query_norm == 0:
+            return []
+
+        dots: dict[int, float] = {}
+        for term, query_weight in query_vector.items():
+            for index, doc_weight in self._postings.get(term, ()):
+                dots[index] = dots.get(index, 0.0) + query_weight * doc_weight
+
+        top = heapq.nlargest(top_k, dots.items(), key=lambda x: x[1])
+        return [
+            (self._ids[index], dot / query_norm)
+            for index, dot in top if dot > 0
+        ]
+
+
+def _shard_worker(
+    conn: Connection,
+    document_frequencies: dict[str, int],
+    num_documents: int,
+    documents: list[tuple[str, str]]
+) -> None:
+    """
+    Worker process loop: build a shard, then serve requests until closed.
+
+    Messages are ("search", [query vectors], top_k), ("add", id, text)
+    and ("close",).
+    """
+    shard = SearchShard(document_frequencies, num_documents)
+    for doc_id, text in documents:
+        shard.add(doc_id, text)
+    conn.send(len(shard))
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message[0] == "search":
+            _, query_vectors, top_k = message
+            conn.send([shard.search(vector, top_k) for vector in query_vectors])
+        elif message[0] == "add":
+            shard.add(message[1], message[2])
+        elif message[0] == "close":
+            break
+    conn.close()
+
+
+class ShardUnavailableError(RuntimeError):
+    """The shard workers are not running (never built, closed, or died)."""
+    pass
+
+
+def shard_for(doc_id: str, num_shards: int) -> int:
+    """Stable shard number for a document ID."""
+    digest = hashlib.blake2b(doc_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % num_shards
+
+
+class ShardedSearchIndex:
+    """
+    TF-IDF search index partitioned across worker processes.
+
+    Usage:
+        index = ShardedSearchIndex(text_similarity, num_shards=4)
+        index.build(documents)
+        index.search(text_similarity.compute_query_vector(query), top_k=10)
+        index.close()
+    """
+
+    def __init__(
+        self, similarity: TextSimilarity, num_shards: int = 4, timeout_seconds: float = 2.0
+    ):
+        self.similarity = similarity
+        self.num_shards = num_shards
+        # Longest wait for all shards' replies to one search
+        self.timeout_seconds = timeout_seconds
+        self._connections: list[Connection] = []
+        self._processes: list[multiprocessing.Process] = []
+        self._sizes: list[int] = []
+        # One query in flight at a time (replies are read in send order),
+        # and no shutdown while one is
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(self._sizes)
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._connections)
+
+    def build(self, documents: list[tuple[str, str]]) -> None:
+        """
+        Partition (id, text) documents and start one worker per shard.
+
+        Uses the IDF statistics currently held by `similarity`, so build
+        the TextSimilarity index over the same corpus first.
+        """
+        self.close()
+
+        partitions: list[list[tuple[str, str]]] = [[] for _ in range(self.num_shards)]
+        for doc_id, text in documents:
+            partitions[shard_for(doc_id, self.num_shards)].append((doc_id, text))
+
+        document_frequencies, num_documents = self.similarity.export_index()
+        # spawn, not fork: the server process may already be running threads
+        context = multiprocessing.get_context("spawn")
+        for partition in partitions:
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_shard_worker,
+                args=(child_conn, document_frequencies, num_documents, partition),
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+
+        # Shards build concurrently; wait for all of them
+        self._sizes = [conn.recv() for conn in self._connections]
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index a new document on its shard (shuts down if the worker died)."""
+        shard = shard_for(doc_id, self.num_shards)
+        with self._lock:
+            if not self._connections:
+                return
+            try:
+                self._connections[shard].send(("add", doc_id, text))
+            except (BrokenPipeError, OSError):
+                self._shutdown()
+                return
+            self._sizes[shard] += 1
+
+    def search(self, query_vector: dict[str, float], top_k: int = 10) -> list[tuple[str, float]]:
+        """
+        Top-k (id, score) pairs across all shards, best first.
+
+        Raises ShardUnavailableError if the workers are not running.
+        """
+        return self.search_batch([query_vector], top_k)[0]
+
+    def search_batch(
+        self,
+        query_vectors: list[dict[str, float]],
+        top_k: int = 10
+    ) -> list[list[tuple[str, float]]]:
+        """
+        Search several query vectors with one round trip per shard.
+
+        Returns one list of (id, score) pairs per query, best first.
+        Raises ShardUnavailableError if the workers are not running, or if
+        one dies or misses the timeout mid-query (the index is shut down,
+        so ready turns false).
+        """
+        if not query_vectors:
+            return []
+
+        with self._lock:
+            if not self._connections:
+                raise ShardUnavailableError("Search shards are not running")
+            try:
+                # Send to every shard before reading, so they score in parallel
+                for conn in self._connections:
+                    conn.send(("search", query_vectors, top_k))
+                deadline = time.monotonic() + self.timeout_seconds
+                per_shard = []
+                for shard, conn in enumerate(self._connections):
+                    if not conn.poll(max(deadline - time.monotonic(), 0.0)):
+                        raise TimeoutError(f"shard {shard} did not reply in {self.timeout_seconds}s")
+                    per_shard.append(conn.recv())
+            except (EOFError, TimeoutError, OSError) as e:
+                # Replies from the other shards are now out of step
+                self._shutdown()
+                raise ShardUnavailableError(f"Search shard worker failed: {e!r}") from e
+
+        return [
+            self._merge([results[i] for results in per_shard], top_k)
+            for i in range(len(query_vectors))
+        ]
+
+    @staticmethod
+    def _merge(
+        shard_results: list[list[tuple[str, float]]],
+        top_k: int
+    ) -> list[tuple[str, float]]:
+        """Merge per-shard sorted top-k lists into a global top-k."""
+        merged = heapq.merge(*shard_results, key=lambda x: x[1], reverse=True)
+        return list(islice(merged, top_k))
+
+    def close(self) -> None:
+        """Stop all shard workers (after any query in flight)."""
+        with self._lock:
+            self._shutdown()
+
+    def _shutdown(self) -> None:
+        """Stop all shard workers; the caller holds the lock."""
+        for conn in self._connections:
+            try:
+                conn.send(("close",))
+            except (BrokenPipeError, OSError):
+                pass
+            conn.close()
+        for process in self._processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                # Hung workers never read "close"
+                process.kill()
+                process.join()
+        self._connections = []
+        self._processes = []
+        self._sizes = []
+
+    def stats(self) -> dict:
+        """Shard count and documents per shard."""
+        return {"num_shards": self.num_shards, "documents_per_shard": list(self._sizes)}
@@ -9,11 +9,16 @@ Design for refactoring:
 - Can integrate with vector databases (Pinecone, Weaviate, Milvus)
 """
 
+import heapq
+import json
 import math
 import re
-from collections import Counter
+from collections import Counter, deque
 from typing import Optional
 
+from .dedup import format_fingerprint, simhash
+from .models import Candidate
+
 
 class TextSimilarity:
     """
@@ -26,6 +31,11 @@ class TextSimilarity:
     def __init__(self):
         self._document_frequencies: dict[str, int] = {}
         self._num_documents: int = 0
+        # Bumped whenever the index changes so callers can invalidate caches
+        self.index_version: int = 0
+        # Character trigram -> vocabulary terms, for typo-tolerant lookup
+        self._trigram_index: dict[str, list[str]] = {}
+        self._correction_cache: dict[str, list[str]] = {}
         self._stopwords = {
             'a', 'an', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
             'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
@@ -88,6 +98,197 @@ class TextSimilarity:
                 self._document_frequencies[token] = \
                     self._document_frequencies.get(token, 0) + 1
 
+        self._build_trigram_index()
+        self.index_version += 1
+
+    @property
+    def num_documents(self) -> int:
+        """Number of documents in the IDF statistics."""
+        return self._num_documents
+
+    def export_index(self) -> tuple[dict[str, int], int]:
+        """
+        Get the IDF statistics (document frequencies, corpus size).
+
+        Used to share one corpus-wide index with worker processes.
+        """
+        return dict(self._document_frequencies), self._num_documents
+
+    def load_index(
+        self, document_frequencies: dict[str, int], num_documents: int
+    ) -> None:
+        """Load IDF statistics computed elsewhere, e.g. by export_index."""
+        self._document_frequencies = dict(document_frequencies)
+        self._num_documents = num_documents
+        self._build_trigram_index()
+        self.index_version += 1
+
+    def add_document(self, document: str) -> None:
+        """
+        Add one document to the IDF index without a full rebuild.
+
+        New vocabulary terms are added to the trigram index as well.
+        """
+        self._num_documents += 1
+        for token in set(self.tokenize(document)):
+            if token not in self._document_frequencies:
+                self._document_frequencies[token] = 0
+                for gram in self._trigrams(token):
+                    self._trigram_index.setdefault(gram, []).append(token)
+            self._document_frequencies[token] += 1
+
+        # Cached corrections may now have a closer match
+        self._correction_cache = {}
+        self.index_version += 1
+
+    # Typo tolerance
+
+    # Tokens shorter than this are never corrected (too ambiguous)
+    MIN_CORRECTION_LENGTH = 4
+    MAX_CORRECTION_CACHE = 10000
+
+    def _build_trigram_index(self) -> None:
+        """Index every vocabulary term by its padded character trigrams."""
+        self._trigram_index = {}
+        self._correction_cache = {}
+        for term in self._document_frequencies:
+            for gram in self._trigrams(term):
+                self._trigram_index.setdefault(gram, []).append(term)
+
+    @staticmethod
+    def _trigrams(term: str, padded: bool = True) -> set[str]:
+        """Character trigrams of a term, padded so short words still index."""
+        text = f"$${term}$" if padded else term
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    @staticmethod
+    def _bounded_edit_distance(a: str, b: str, bound: int) -> int:
+        """
+        Levenshtein distance with adjacent transpositions counted as one
+        edit ("kafak" -> "kafka"), giving up once it must exceed bound.
+
+        Returns bound + 1 when the distance is larger than bound.
+        """
+        if abs(len(a) - len(b)) > bound:
+            return bound + 1
+
+        before_previous: list[int] = []
+        previous = list(range(len(b) + 1))
+        for i, char_a in enumerate(a, 1):
+            current = [i] + [0] * len(b)
+            row_min = i
+            for j, char_b in enumerate(b, 1):
+                current[j] = min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (char_a != char_b)
+                )
+                if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                    current[j] = min(current[j], before_previous[j - 2] + 1)
+                row_min = min(row_min, current[j])
+            if row_min > bound:
+                return bound + 1
+            before_previous, previous = previous, current
+        return min(previous[-1], bound + 1)
+
+    def correct_token(self, token: str) -> list[str]:
+        """
+        Map a token to the closest vocabulary terms.
+
+        Known tokens map to themselves. Unknown tokens are matched against
+        vocabulary terms sharing enough trigrams, then verified with a
+        bounded Levenshtein distance (1 for short words, 2 otherwise). If nothing
+        is within the bound, falls back to vocabulary terms containing the
+        token as a substring. Returns [] when there is no good match.
+        """
+        if token in self._document_frequencies:
+            return [token]
+        if len(token) < self.MIN_CORRECTION_LENGTH:
+            return []
+        if token in self._correction_cache:
+            return self._correction_cache[token]
+
+        bound = 1 if len(token) <= 5 else 2
+        grams = self._trigrams(token)
+        # Each edit destroys at most 4 trigrams (transpositions included)
+        min_shared = max(1, len(grams) - 4 * bound)
+
+        shared: Counter = Counter()
+        for gram in grams:
+            shared.update(self._trigram_index.get(gram, ()))
+
+        best_distance = bound + 1
+        matches: list[str] = []
+        for term, count in shared.most_common():
+            if count < min_shared:
+                break
+            distance = self._bounded_edit_distance(token, term, min(bound, best_distance))
+            if distance < best_distance:
+                best_distance, matches = distance, [term]
+            elif distance == best_distance and distance <= bound:
+                matches.append(term)
+
+        if not matches:
+            matches = self.terms_containing(token, limit=3)
+
+        if len(self._correction_cache) >= self.MAX_CORRECTION_CACHE:
+            self._correction_cache.clear()
+        self._correction_cache[token] = matches
+        return matches
+
+    def terms_containing(self, fragment: str, limit: int = 10) -> list[str]:
+        """
+        Find vocabulary terms containing fragment, most frequent first.
+
+        Uses the trigram index to narrow candidates before checking.
+        """
+        if len(fragment) < 3:
+            return []
+
+        candidates: Optional[set[str]] = None
+        for gram in self._trigrams(fragment, padded=False):
+            terms = set(self._trigram_index.get(gram, ()))
+            candidates = terms if candidates is None else candidates & terms
+            if not candidates:
+                return []
+
+        matches = [t for t in candidates if fragment in t and t != fragment]
+        matches.sort(key=lambda t: (-self._document_frequencies.get(t, 0), t))
+        return matches[:limit]
+
+    def correct_query(self, query: str) -> dict[str, list[str]]:
+        """
+        Get typo corrections applied to a query.
+
+        Returns dict mapping each unknown query token to the vocabulary
+        terms it was replaced with.
+        """
+        corrections = {}
+        for token in set(self.tokenize(query)):
+            if token not in self._document_frequencies:
+                corrected = self.correct_token(token)
+                if corrected:
+                    corrections[token] = corrected
+        return corrections
+
+    def normalize_query(
+        self,
+        query: str,
+        expansions: Optional[dict[str, float]] = None
+    ) -> tuple[tuple[str, float, float], ...]:
+        """
+        Canonical form of an expanded query as a sorted weighted token multiset.
+
+        Queries that differ only in case, punctuation, stopwords or word
+        order normalize to the same value, so it can be used as a cache key.
+        """
+        counts, expansion_weights = self._query_term_counts(query, expansions)
+        terms = set(counts) | set(expansion_weights)
+        return tuple(sorted(
+            (t, counts.get(t, 0), round(expansion_weights.get(t, 0.0), 4))
+            for t in terms
+        ))
+
     def compute_tfidf_vector(self, text: str) -> dict[str, float]:
         """
         Compute TF-IDF vector for a document.
@@ -100,6 +301,61 @@ class TextSimilarity:
             for term, tf_score in tf.items()
         }
 
+    def compute_query_vector(
+        self,
+        query: str,
+        expansions: Optional[dict[str, float]] = None
+    ) -> dict[str, float]:
+        """
+        Compute TF-IDF vector for a query with weighted expansion terms.
+
+        Expansion tokens add their weight to the raw term count, and tokens
+        that only come from expansions are scaled down by that weight, so
+        related terms broaden the query without outweighing the user's
+        own words. Without expansions this equals compute_tfidf_vector.
+        """
+        counts, expansion_weights = self._query_term_counts(query, expansions)
+        if not counts and not expansion_weights:
+            return {}
+
+        freqs = {
+            term: counts.get(term, 0) + expansion_weights.get(term, 0.0)
+            for term in set(counts) | set(expansion_weights)
+        }
+        max_freq = max(counts.values()) if counts else max(freqs.values())
+
+        vector = {}
+        for term, freq in freqs.items():
+            tf = 0.5 + 0.5 * min(freq / max_freq, 1.0)
+            if term not in counts:
+                tf *= min(expansion_weights[term], 1.0)
+            vector[term] = tf * self.compute_idf(term)
+        return vector
+
+    def _query_term_counts(
+        self,
+        query: str,
+        expansions: Optional[dict[str, float]]
+    ) -> tuple[Counter, dict[str, float]]:
+        """
+        Split a query into user token counts and expansion token weights.
+
+        Unknown user tokens are replaced by their typo corrections, with the
+        token's count shared between equally close matches.
+        """
+        counts: Counter = Counter()
+        for token, count in Counter(self.tokenize(query)).items():
+            corrected = self.correct_token(token) if self._trigram_index else []
+            if not corrected:
+                counts[token] += count
+            for term in corrected:
+                counts[term] += count / len(corrected)
+        expansion_weights: dict[str, float] = {}
+        for term, weight in (expansions or {}).items():
+            for token in self.tokenize(term):
+                expansion_weights[token] = max(expansion_weights.get(token, 0.0), weight)
+        return counts, expansion_weights
+
     def cosine_similarity(
         self,
         vec1: dict[str, float],
@@ -143,7 +399,8 @@ class TextSimilarity:
         self,
         query: str,
         documents: list[tuple[str, str]],  # (id, text) pairs
-        top_k: int = 10
+        top_k: int = 10,
+        expansions: Optional[dict[str, float]] = None
     ) -> list[tuple[str, float]]:
         """
         Find most similar documents to a query.
@@ -152,11 +409,12 @@ class TextSimilarity:
             query: The search query
             documents: List of (id, text) pairs to search
             top_k: Number of results to return
+            expansions: Optional {term: weight} query expansions
 
         Returns:
             List of (id, similarity_score) pairs, sorted by score descending
         """
-        query_vec = self.compute_tfidf_vector(query)
+        query_vec = self.compute_query_vector(query, expansions)
 
         scores = []
         for doc_id, doc_text in documents:
@@ -169,10 +427,73 @@ class TextSimilarity:
         scores.sort(key=lambda x: x[1], reverse=True)
         return scores[:top_k]
 
+    def find_similar_batch(
+        self,
+        queries: list[str],
+        documents: list[tuple[str, str]],  # (id, text) pairs
+        top_k: int = 10,
+        expansions: Optional[list[dict[str, float]]] = None
+    ) -> list[list[tuple[str, float]]]:
+        """
+        Find most similar documents for several queries at once.
+
+        All queries are vectorized up front and merged into a single
+        term -> [(query_index, weight)] map, so each document is vectorized
+        once and scored against every query in one pass over the corpus.
+
+        Args:
+            queries: The search queries
+            documents: List of (id, text) pairs to search
+            top_k: Number of results to return per query
+            expansions: Optional {term: weight} expansions, one per query
+
+        Returns:
+            One list of (id, similarity_score) pairs per query, in the
+            same order as `queries`, each sorted by score descending
+        """
+        query_norms = []
+        query_terms: dict[str, list[tuple[int, float]]] = {}
+        for i, query in enumerate(queries):
+            query_vec = self.compute_query_vector(
+                query, expansions[i] if expansions else None
+            )
+            query_norms.append(math.sqrt(sum(v ** 2 for v in query_vec.values())))
+            for term, weight in query_vec.items():
+                query_terms.setdefault(term, []).append((i, weight))
+
+        scores: list[list[tuple[float, str]]] = [[] for _ in queries]
+        for doc_id, doc_text in documents:
+            doc_vec = self.compute_tfidf_vector(doc_text)
+
+            # Accumulate dot products only for queries sharing a term
+            dots: dict[int, float] = {}
+            for term, doc_weight in doc_vec.items():
+                for i, query_weight in query_terms.get(term, ()):
+                    dots[i] = dots.get(i, 0.0) + query_weight * doc_weight
+            if not dots:
+                continue
+
+            doc_norm = math.sqrt(sum(v ** 2 for v in doc_vec.values()))
+            for i, dot in dots.items():
+                if dot > 0 and query_norms[i] > 0 and doc_norm > 0:
+                    scores[i].append((dot / (query_norms[i] * doc_norm), doc_id))
+
+        return [
+            [(doc_id, score) for score, doc_id in
+             heapq.nlargest(top_k, query_scores, key=lambda x: x[0])]
+            for query_scores in scores
+        ]
+
 
 class QueryExpander:
     """
     Expands user queries with related terms for better retrieval.
+
+    The expansion dictionary is compiled once into an Aho-Corasick
+    automaton over word tokens, so single- and multi-word phrases are
+    matched in one left-to-right scan of the query regardless of how
+    many phrases the dictionary holds. Each expansion carries a weight
+    (0-1) that scales its contribution to the query vector.
     """
 
     # Domain-specific synonyms and related terms
@@ -189,20 +510,121 @@ class QueryExpander:
         'security': ['auth', 'authentication', 'authorization', 'encryption'],
     }
 
-    def expand(self, query: str) -> list[str]:
+    # Weight for expansions listed without an explicit weight
+    DEFAULT_WEIGHT = 0.5
+
+    def __init__(
+        self,
+        expansions: Optional[dict] = None,
+        default_weight: float = DEFAULT_WEIGHT
+    ):
         """
-        Expand a query with related terms.
+        Compile an expansion dictionary.
 
-        Returns list of additional terms to include in search.
+        Args:
+            expansions: Mapping of phrase to related terms, either as a
+                list (uses default_weight) or a {term: weight} dict.
+                Defaults to EXPANSIONS.
+            default_weight: Weight for terms given as a plain list
         """
-        words = query.lower().split()
-        expansions = []
+        self.default_weight = default_weight
+        self._compile(self.EXPANSIONS if expansions is None else expansions)
 
-        for word in words:
-            if word in self.EXPANSIONS:
-                expansions.extend(self.EXPANSIONS[word])
+    @classmethod
+    def from_file(
+        cls, path: str, default_weight: float = DEFAULT_WEIGHT
+    ) -> "QueryExpander":
+        """
+        Load an expansion dictionary from a JSON file.
 
-        return list(set(expansions))
+        Expected format (phrases may span several words):
+            {
+                "kafka": ["streaming", "messaging"],
+                "machine learning": {"ml": 0.9, "deep-learning": 0.4}
+            }
+        """
+        with open(path, "r") as f:
+            return cls(json.load(f), default_weight)
+
+    def _compile(self, expansions: dict) -> None:
+        """Build the goto/failure/output tables of the automaton."""
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[list[int]] = [[]]
+        self._phrase_weights: list[dict[str, float]] = []
+
+        for phrase, related in expansions.items():
+            words = self._words(phrase)
+            if not words:
+                continue
+            if isinstance(related, dict):
+                weights = {term: float(w) for term, w in related.items()}
+            else:
+                weights = {term: self.default_weight for term in related}
+
+            state = 0
+            for word in words:
+                nxt = self._goto[state].get(word)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][word] = nxt
+                state = nxt
+            self._output[state].append(len(self._phrase_weights))
+            self._phrase_weights.append(weights)
+
+        # Breadth-first pass to link each state to its longest proper suffix
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(word, 0)
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    @staticmethod
+    def _words(text: str) -> list[str]:
+        """Lowercase word tokens, splitting on punctuation and hyphens."""
+        return re.findall(r'[a-z0-9]+', text.lower())
+
+    def expand_weighted(self, query: str) -> dict[str, float]:
+        """
+        Expand a query with weighted related terms.
+
+        Returns dict mapping each related term to its weight, ordered by
+        weight descending. When several matched phrases share a term, the
+        highest weight wins.
+        """
+        expansions: dict[str, float] = {}
+        matched: set[int] = set()
+        state = 0
+
+        for word in self._words(query):
+            while state and word not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(word, 0)
+            matched.update(self._output[state])
+
+        for phrase_id in matched:
+            for term, weight in self._phrase_weights[phrase_id].items():
+                if weight > expansions.get(term, 0.0):
+                    expansions[term] = weight
+
+        return dict(sorted(expansions.items(), key=lambda x: (-x[1], x[0])))
+
+    def expand(self, query: str) -> list[str]:
+        """
+        Expand a query with related terms.
+
+        Returns list of additional terms to include in search,
+        highest weight first.
+        """
+        return list(self.expand_weighted(query))
 
 
 class ContentAnalyzer:
@@ -210,18 +632,28 @@ class ContentAnalyzer:
     Analyzes content to extract features for recommendation.
     """
 
-    def __init__(self):
-        self.similarity = TextSimilarity()
+    def __init__(self, similarity: Optional[TextSimilarity] = None):
+        self.similarity = similarity or TextSimilarity()
+
+    def fit(self, documents: list[str]) -> None:
+        """Build corpus IDF statistics used by extract_topics."""
+        self.similarity.build_index(documents)
 
     def extract_topics(self, text: str, top_k: int = 5) -> list[str]:
         """
         Extract main topics from text based on TF-IDF scores.
+
+        Uses corpus IDF once the analyzer is fitted, so words common to
+        every document rank below distinctive ones; before that, falls
+        back to term frequency alone.
         """
-        tokens = self.similarity.tokenize(text)
-        tf = self.similarity.compute_tf(tokens)
+        if self.similarity.num_documents > 0:
+            scores = self.similarity.compute_tfidf_vector(text)
+        else:
+            scores = self.similarity.compute_tf(self.similarity.tokenize(text))
 
-        # Sort by TF score
-        sorted_terms = sorted(tf.items(), key=lambda x: x[1], reverse=True)
+        # Sort by score, then alphabetically for stable output
+        sorted_terms = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
         return [term for term, _ in sorted_terms[:top_k]]
 
     def compute_reading_level(self, text: str) -> str:
@@ -244,10 +676,27 @@ class ContentAnalyzer:
         else:
             return "advanced"
 
+    def compute_simhash(self, text: str) -> int:
+        """
+        Compute a 64-bit SimHash fingerprint of the full text.
+
+        Features are word unigrams and bigrams weighted by term frequency,
+        so near-duplicate texts get fingerprints a few bits apart.
+        """
+        tokens = self.similarity.tokenize(text)
+        features = Counter(tokens)
+        features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+        return simhash(features.items())
+
+    def compute_candidate_fingerprint(self, candidate: Candidate) -> int:
+        """SimHash of the candidate's title and summary."""
+        return self.compute_simhash(f"{candidate.title} {candidate.summary}")
+
     def compute_content_hash(self, text: str) -> str:
         """
-        Compute a simple hash for content deduplication.
+        Compute a stable content fingerprint for deduplication.
+
+        Returns the SimHash as 16 hex characters; identical across
+        processes, so it can be persisted.
         """
-        # Use first 100 chars normalized as a simple hash
-        normalized = re.sub(r'\s+', ' ', text.lower().strip())[:100]
-        return str(hash(normalized))
+        return format_fingerprint(self.compute_simhash(text))
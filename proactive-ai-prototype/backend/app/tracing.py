@@ -0,0 +1,234 @@
+"""
+Pipeline Tracing.
+
+Lightweight spans around the recommendation pipeline's stages (user
+lookup, retrieval, shown-filtering, CF, ranking, diversity). Each span
+records its duration, and optionally how many candidates it handled,
+into per-stage histograms; a request can also collect its own spans
+(e.g. for a Server-Timing debug header).
+
+Performance notes:
+- A disabled tracer hands out one shared no-op span, so an
+  instrumented stage costs a method call and an empty with-block.
+- Durations come from the monotonic perf_counter_ns clock.
+- Histograms keep fixed log-spaced bucket counts (about 19% wide), so
+  memory is constant however many requests are recorded; percentiles
+  are interpolated within the bucket.
+- The per-request trace lives in a ContextVar, so concurrent requests
+  (threads or asyncio tasks) never see each other's spans.
+
+Usage:
+    tracer = Tracer()
+    with tracer.span("retrieve") as span:
+        candidates = retrieve(...)
+        span.set_count(len(candidates))
+
+Design for refactoring:
+- Spans map directly onto OpenTelemetry spans, and histograms onto
+  Prometheus histograms, if an exporter is added
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+# Upper bounds of the duration buckets (ms): 1 us to ~65 s, 4 per doubling
+DURATION_BUCKETS_MS = tuple(0.001 * 2 ** (i / 4) for i in range(97))
+# Upper bounds of the candidate count buckets: 0, 1, 2, 4, ... 2^20
+COUNT_BUCKETS = (0,) + tuple(2 ** i for i in range(21))
+
+
+class Histogram:
+    """Thread-safe fixed-bucket histogram (the last bucket is unbounded)."""
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds, value)] += 1
+            self.count += 1
+            self.total += value
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    def percentile(self, q: float) -> float:
+        """
+        Estimated q-th percentile (0-100): linear within the bucket,
+        clamped to the observed range.
+        """
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / n
+                return min(max(estimate, self.min), self.max)
+            seen += n
+        return self.max
+
+    def snapshot(self) -> dict:
+        """Count, sum, mean, max and estimated p50/p95/p99."""
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "max": round(self.max, 3),
+            "p50": round(self.percentile(50), 3),
+            "p95": round(self.percentile(95), 3),
+            "p99": round(self.percentile(99), 3)
+        }
+
+
+class Span:
+    """One timed stage. Set the number of candidates it handled with set_count."""
+    __slots__ = ("name", "duration_ms", "count", "_tracer", "_start")
+
+    def __init__(self, tracer: "Tracer", name: str):
+        self.name = name
+        self.duration_ms = 0.0
+        self.count: Optional[int] = None
+        self._tracer = tracer
+        self._start = 0
+
+    def set_count(self, count: int) -> None:
+        self.count = count
+
+    def __enter__(self) -> "Span":
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.duration_ms = (time.perf_counter_ns() - self._start) / 1e6
+        self._tracer._record(self)
+
+
+class _NoopSpan:
+    """Shared span handed out while tracing is disabled."""
+    __slots__ = ()
+
+    def set_count(self, count: int) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """Spans recorded during one request, in completion order."""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def server_timing(self) -> str:
+        """The spans as a Server-Timing header value."""
+        entries = []
+        for span in self.spans:
+            entry = f"{span.name};dur={span.duration_ms:.3f}"
+            if span.count is not None:
+                entry += f';desc="{span.count} candidates"'
+            entries.append(entry)
+        return ", ".join(entries)
+
+    def to_dict(self) -> list[dict]:
+        return [
+            {"stage": s.name, "duration_ms": round(s.duration_ms, 3), "candidates": s.count}
+            for s in self.spans
+        ]
+
+
+class Tracer:
+    """
+    Per-stage duration and candidate count histograms.
+
+    Spans nest freely (e.g. "cf" runs inside "rank"); each stage name has
+    its own histograms, so nested time is counted in both.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._durations: dict[str, Histogram] = {}
+        self._counts: dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        self._trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+    def span(self, name: str):
+        """Context manager timing one stage (a no-op when disabled)."""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name)
+
+    @contextmanager
+    def trace(self) -> Iterator[Trace]:
+        """Also collect the spans finished inside this block (e.g. one request)."""
+        trace = Trace()
+        token = self._trace.set(trace)
+        try:
+            yield trace
+        finally:
+            self._trace.reset(token)
+
+    def _record(self, span: Span) -> None:
+        durations = self._durations.get(span.name)
+        if durations is None:
+            with self._lock:
+                durations = self._durations.setdefault(span.name, Histogram(DURATION_BUCKETS_MS))
+        durations.observe(span.duration_ms)
+        if span.count is not None:
+            counts = self._counts.get(span.name)
+            if counts is None:
+                with self._lock:
+                    counts = self._counts.setdefault(span.name, Histogram(COUNT_BUCKETS))
+            counts.observe(span.count)
+
+        trace = self._trace.get()
+        if trace is not None:
+            trace.spans.append(span)
+
+    def stage_stats(self, name: str) -> Optional[dict]:
+        """Duration (ms) and candidate count summaries for one stage, or None."""
+        durations = self._durations.get(name)
+        if durations is None:
+            return None
+        counts = self._counts.get(name)
+        return {
+            "duration_ms": durations.snapshot(),
+            "candidates": counts.snapshot() if counts is not None else None
+        }
+
+    def stats(self) -> dict:
+        """Every stage's summaries."""
+        return {
+            "enabled": self.enabled,
+            "stages": {name: self.stage_stats(name) for name in list(self._durations)}
+        }
+
+    def reset(self) -> None:
+        """Drop all recorded histograms."""
+        with self._lock:
+            self._durations.clear()
+            self._counts.clear()
+
+
+# Shared disabled tracer: the default for services not given one
+NULL_TRACER = Tracer(enabled=False)
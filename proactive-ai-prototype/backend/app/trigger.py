@@ -71,11 +71,15 @@ class TriggerService:
         self,
         user: User,
         recommendation: ScoredCandidate,
-        context: Optional[UserContext] = None
+        context: Optional[UserContext] = None,
+        min_score: float = 0.5
     ) -> TriggerResult:
         """
         Determine if we should send a proactive message now.
 
+        min_score is the recommendation quality bar, on the scale of the
+        ranker that scored it (see RankingService.suggestion_threshold).
+
         Evaluation order:
         1. Check user preferences (hard constraints)
         2. Check timing constraints
@@ -121,7 +125,7 @@ class TriggerService:
                 )
 
         # 4. Check recommendation quality threshold
-        if recommendation.score < 0.5:
+        if recommendation.score < min_score:
             return TriggerResult(
                 decision=TriggerDecision.SKIP,
                 reason=f"Recommendation score too low ({recommendation.score:.2f})",
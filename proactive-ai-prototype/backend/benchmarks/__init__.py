@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for the backend services.
+
+Run from the backend directory, e.g.:
+    python -m benchmarks.bench_autocomplete
+"""
@@ -0,0 +1,76 @@
+"""
+Implicit ALS benchmark.
+
+Trains the ALS model on a synthetic feedback log with one worker and
+with several, reporting training time and speedup, then compares
+per-user CF serving latency of the factor model (one mat-vec, or a
+fold-in for unseen users) against user-based CF.
+
+Usage:
+    python -m benchmarks.bench_als [--users 5000] [--candidates 5000] [--workers 1 4]
+"""
+
+import argparse
+import time
+
+from app.als import ALSTrainer
+from app.recommendation import CollaborativeFilteringService
+from benchmarks.bench_autocomplete import percentile
+from benchmarks.synthetic import synthetic_store
+
+
+def serving_latencies(cf: CollaborativeFilteringService, user_ids: list[str]) -> list[float]:
+    """Uncached CF scoring latency per user, in milliseconds."""
+    latencies = []
+    for user_id in user_ids:
+        start = time.perf_counter()
+        cf._compute_cf_scores(user_id)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--feedback-per-user", type=int, default=30)
+    parser.add_argument("--factors", type=int, default=32)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    store = synthetic_store(
+        args.candidates, num_users=args.users, feedback_per_user=args.feedback_per_user
+    )
+    interactions = store.get_feedback_interactions()
+    print(f"{len(interactions):,} (user, candidate) interactions")
+
+    print(f"{'workers':>8} {'train (s)':>10} {'speedup':>8}")
+    model, baseline = None, None
+    for workers in args.workers:
+        trainer = ALSTrainer(
+            factors=args.factors, iterations=args.iterations,
+            workers=workers, chunk_size=max(256, args.users // (workers * 4))
+        )
+        model, report = trainer.fit(interactions)
+        baseline = baseline or report.seconds
+        print(f"{report.workers:>8} {report.seconds:>10.2f} {baseline / report.seconds:>7.1f}x")
+
+    user_ids = [f"user-{i}" for i in range(args.queries)]
+    cf = CollaborativeFilteringService(store)
+    runs = [("user-based", None), ("als", model)]
+    print(f"\n{'cf':>12} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for name, factor_model in runs:
+        cf.set_factor_model(factor_model)
+        latencies = serving_latencies(cf, user_ids)
+        print(f"{name:>12} {percentile(latencies, 50):>9.2f} {percentile(latencies, 99):>9.2f}")
+
+    # Serving for users unseen at training time goes through fold-in
+    cf._refold.update(user_ids)
+    latencies = serving_latencies(cf, user_ids)
+    print(f"{'als fold-in':>12} {percentile(latencies, 50):>9.2f} {percentile(latencies, 99):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Dense retrieval recall vs. latency benchmark.
+
+Builds an IVF EmbeddingIndex over synthetic clustered unit vectors and
+compares approximate search at several nprobe settings against exact
+brute-force search: recall@k, mean and p99 latency per query.
+
+Usage:
+    python -m benchmarks.bench_ann [--vectors 200000] [--dim 256] [--k 10]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.embedding import EmbeddingIndex
+
+
+def synthetic_vectors(n: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """Unit vectors drawn around random cluster centers (text-like structure)."""
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, n)
+    vectors = centers[labels] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def timed_search(search, queries: np.ndarray) -> tuple[list, np.ndarray]:
+    """Run search for each query, returning results and latencies in ms."""
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(search(query))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--vectors", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vectors = synthetic_vectors(args.vectors, args.dim, clusters=1000, rng=rng)
+    ids = [f"doc-{i}" for i in range(args.vectors)]
+    queries = synthetic_vectors(args.queries, args.dim, clusters=1000, rng=rng)
+
+    start = time.perf_counter()
+    index = EmbeddingIndex.build(ids, vectors, seed=args.seed)
+    print(f"Built IVF index: {len(index):,} x {index.dim} float32, "
+          f"{len(index.centroids)} lists in {time.perf_counter() - start:.1f}s")
+
+    path = "/tmp/bench_ann_index.npz"
+    start = time.perf_counter()
+    index.save(path)
+    index = EmbeddingIndex.load(path)
+    print(f"Save + load round trip: {time.perf_counter() - start:.2f}s\n")
+
+    exact, exact_ms = timed_search(lambda q: index.search_exact(q, args.k), queries)
+    truth = [{item_id for item_id, _ in result} for result in exact]
+    print(f"{'method':>12} {'recall@' + str(args.k):>10} {'mean ms':>9} {'p99 ms':>9}")
+    print(f"{'exact':>12} {1.0:>10.3f} {exact_ms.mean():>9.3f} "
+          f"{np.percentile(exact_ms, 99):>9.3f}")
+
+    for nprobe in (1, 2, 4, 8, 16, 32, 64):
+        approx, approx_ms = timed_search(
+            lambda q: index.search(q, args.k, nprobe=nprobe), queries
+        )
+        recall = np.mean([
+            len(truth[i] & {item_id for item_id, _ in result}) / args.k
+            for i, result in enumerate(approx)
+        ])
+        print(f"{'nprobe=' + str(nprobe):>12} {recall:>10.3f} {approx_ms.mean():>9.3f} "
+              f"{np.percentile(approx_ms, 99):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Autocomplete latency benchmark.
+
+Builds a PrefixSuggester over synthetic vocabulary terms and reports build
+time, lookup latency percentiles across prefix lengths, and incremental
+insert cost.
+
+Usage:
+    python -m benchmarks.bench_autocomplete [--terms 1000000] [--queries 20000]
+"""
+
+import argparse
+import random
+import string
+import time
+
+from app.autocomplete import PrefixSuggester, Suggestion
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def random_term(rng: random.Random) -> str:
+    """A pronounceable-ish random term, 4-12 characters."""
+    letters = string.ascii_lowercase
+    return "".join(rng.choice(letters) for _ in range(rng.randint(4, 12)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--terms", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    terms = {random_term(rng) for _ in range(args.terms)}
+    entries = [
+        Suggestion(text=t, kind="term", score=rng.paretovariate(1.5), candidate_id=None)
+        for t in terms
+    ]
+
+    suggester = PrefixSuggester()
+    start = time.perf_counter()
+    suggester.load(entries)
+    build_seconds = time.perf_counter() - start
+    print(f"Built {len(suggester):,} entries in {build_seconds:.2f}s "
+          f"({len(suggester._top):,} precomputed prefixes)")
+
+    words = list(terms)
+    print(f"\n{'prefix len':>10} {'p50 (us)':>10} {'p99 (us)':>10} {'max (us)':>10}")
+    for length in (1, 2, 3, 4, 6):
+        latencies = []
+        for _ in range(args.queries // 5):
+            prefix = rng.choice(words)[:length]
+            start = time.perf_counter()
+            suggester.suggest(prefix, limit=8)
+            latencies.append((time.perf_counter() - start) * 1e6)
+        print(f"{length:>10} {percentile(latencies, 50):>10.1f} "
+              f"{percentile(latencies, 99):>10.1f} {max(latencies):>10.1f}")
+
+    latencies = []
+    for _ in range(1000):
+        entry = Suggestion(
+            text=random_term(rng), kind="term",
+            score=rng.paretovariate(1.5), candidate_id=None
+        )
+        start = time.perf_counter()
+        suggester.insert(entry)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    print(f"\nIncremental insert: p50 {percentile(latencies, 50):.1f}us, "
+          f"p99 {percentile(latencies, 99):.1f}us")
+
+
+if __name__ == "__main__":
+    main()
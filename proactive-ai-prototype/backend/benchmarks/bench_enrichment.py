@@ -0,0 +1,70 @@
+"""
+Catalog enrichment scaling benchmark.
+
+Runs CatalogEnricher over a synthetic catalog with an increasing number of
+worker processes and reports docs/sec, speedup over one worker, and
+parallel efficiency per core. Nothing is written to the data store.
+
+Usage:
+    python -m benchmarks.bench_enrichment [--docs 50000] [--max-workers 8]
+"""
+
+import argparse
+import os
+import random
+
+from app.enrichment import CatalogEnricher
+from app.models import Candidate
+
+
+def synthetic_catalog(n: int, rng: random.Random, vocab_size: int = 5000) -> list[Candidate]:
+    """Candidates with Zipf-ish word usage over a random vocabulary."""
+    vocab = [f"term{i}" for i in range(vocab_size)]
+    weights = [1 / (rank + 1) for rank in range(vocab_size)]
+    candidates = []
+    for i in range(n):
+        title = " ".join(rng.choices(vocab, weights, k=8))
+        summary = ". ".join(
+            " ".join(rng.choices(vocab, weights, k=rng.randint(8, 20)))
+            for _ in range(3)
+        )
+        candidates.append(Candidate(
+            id=f"c{i}", title=title, summary=summary, category="bench",
+            keywords=rng.sample(vocab[:200], 4), source="bench"
+        ))
+    return candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--docs", type=int, default=50_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    candidates = synthetic_catalog(args.docs, random.Random(args.seed))
+    print(f"{args.docs:,} documents, chunk size {args.chunk_size}, "
+          f"{os.cpu_count()} CPUs")
+
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= args.max_workers:
+        worker_counts.append(worker_counts[-1] * 2)
+    if worker_counts[-1] != args.max_workers:
+        worker_counts.append(args.max_workers)
+
+    print(f"\n{'workers':>8} {'seconds':>9} {'docs/sec':>10} {'speedup':>8} "
+          f"{'efficiency':>10}")
+    baseline = None
+    for workers in worker_counts:
+        enricher = CatalogEnricher(workers=workers, chunk_size=args.chunk_size)
+        _, report = enricher.enrich(candidates)
+        if baseline is None:
+            baseline = report.docs_per_second
+        speedup = report.docs_per_second / baseline
+        print(f"{workers:>8} {report.seconds:>9.2f} {report.docs_per_second:>10,.0f} "
+              f"{speedup:>7.2f}x {speedup / workers:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
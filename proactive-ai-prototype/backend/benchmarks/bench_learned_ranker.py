@@ -0,0 +1,91 @@
+"""
+Learned ranker benchmark and latency budget check.
+
+Trains the logistic-regression ranker on a synthetic feedback log and
+reports its held-out metrics, then times inference over a slate of
+candidates: LearnedRanker.score() alone (the budgeted step) and the full
+VectorizedRanker.rank_top_k with the learned model versus the heuristic.
+
+Exits with status 1 if p99 inference latency exceeds the budget, so it
+can gate changes to the model or features.
+
+Usage:
+    python -m benchmarks.bench_learned_ranker [--slate 500] [--budget-ms 2.0]
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from app.learned_ranking import COMPONENT_WEIGHTS, RankerTrainer
+from app.models import UserContext
+from app.recommendation import RankingService
+from app.vector_ranking import VectorizedRanker
+from benchmarks.bench_autocomplete import percentile
+from benchmarks.synthetic import synthetic_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--feedback-per-user", type=int, default=40)
+    parser.add_argument("--slate", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--budget-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    store = synthetic_store(
+        args.candidates, num_users=args.users, feedback_per_user=args.feedback_per_user
+    )
+    model, report = RankerTrainer().fit(store)
+    print(f"Trained: {report.to_dict()}")
+
+    heuristic = RankingService(store)
+    learned = RankingService(store, heuristic.cf_service, learned=model)
+    slate = store.get_all_candidates()[:args.slate]
+    user = store.get_user("user-0")
+    ranking_context = heuristic.build_context(
+        user, UserContext(user_id=user.id, receptivity_score=0.7)
+    )
+
+    # Inference alone, on the features VectorizedRanker computes
+    ranker = VectorizedRanker(store, learned)
+    features = ranker.features(slate)
+    rows = np.array([features.row_of[c.id] for c in slate])
+    components = ranker.score_components(features, rows, slate, ranking_context)
+    base = np.column_stack([
+        components[name] / weight for name, weight in COMPONENT_WEIGHTS.items()
+    ])
+    codes = features.category_codes[rows]
+    inference = []
+    for _ in range(args.queries):
+        start = time.perf_counter()
+        learned.learned_scores(base, codes, features.category_names, ranking_context)
+        inference.append((time.perf_counter() - start) * 1000)
+
+    print(f"\n{'step':>22} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    print(f"{'learned inference':>22} {percentile(inference, 50):>9.3f} "
+          f"{percentile(inference, 99):>9.3f}")
+    for name, service in (("rank_top_k heuristic", heuristic), ("rank_top_k learned", learned)):
+        ranker = VectorizedRanker(store, service)
+        latencies = []
+        for _ in range(args.queries // 5):
+            start = time.perf_counter()
+            ranker.rank_top_k(slate, user, k=10, include_signals=False,
+                              ranking_context=ranking_context)
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(f"{name:>22} {percentile(latencies, 50):>9.3f} {percentile(latencies, 99):>9.3f}")
+
+    p99 = percentile(inference, 99)
+    verdict = "within" if p99 <= args.budget_ms else "OVER"
+    print(f"\nInference p99 {p99:.3f} ms for {len(slate)} candidates: "
+          f"{verdict} the {args.budget_ms} ms budget")
+    if p99 > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
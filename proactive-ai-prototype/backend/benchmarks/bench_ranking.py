@@ -0,0 +1,68 @@
+"""
+Ranking benchmark.
+
+Times the per-candidate RankingService.rank_candidates against the NumPy
+VectorizedRanker over synthetic candidate pools, reporting per-call
+latency, per-candidate cost and speedup.
+
+Usage:
+    python -m benchmarks.bench_ranking [--sizes 1000 10000] [--repeats 20]
+"""
+
+import argparse
+import time
+
+from app.models import UserContext
+from app.recommendation import RankingService
+from app.vector_ranking import VectorizedRanker
+from benchmarks.bench_autocomplete import percentile
+from benchmarks.synthetic import synthetic_store
+
+
+def time_calls(fn, repeats: int) -> list[float]:
+    """Latencies of repeated calls, in milliseconds."""
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'candidates':>10} {'ranker':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} "
+          f"{'us/cand':>8} {'speedup':>8}")
+    for size in args.sizes:
+        store = synthetic_store(size)
+        ranking = RankingService(store)
+        vectorized = VectorizedRanker(store, ranking)
+        candidates = store.get_all_candidates()
+        user = store.get_user("user-0")
+        context = UserContext(user_id=user.id, receptivity_score=0.8)
+        # Warm the CF cache and feature matrix so only ranking is measured
+        ranking.rank_candidates(candidates[:10], user, context)
+        vectorized.rank_top_k(candidates, user, context, args.top_k)
+
+        runs = {
+            "python": lambda: ranking.rank_candidates(
+                candidates, user, context, limit=args.top_k
+            ),
+            "numpy": lambda: vectorized.rank_top_k(candidates, user, context, args.top_k)
+        }
+        baseline = None
+        for name, fn in runs.items():
+            latencies = time_calls(fn, args.repeats)
+            p50 = percentile(latencies, 50)
+            baseline = baseline or p50
+            print(f"{size:>10,} {name:>8} {p50:>9.2f} {percentile(latencies, 99):>9.2f} "
+                  f"{p50 * 1000 / size:>8.2f} {baseline / p50:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Replay evaluation benchmark.
+
+Replays a synthetic log (where part of the feedback follows each user's
+interests) through several ranking configurations and prints quality
+and latency side by side: the Python and vectorized rankers, MMR, the
+learned ranker (trained on the replay's history only) and multi-source
+retrieval.
+
+Usage:
+    python -m benchmarks.bench_replay [--candidates 2000] [--users 200] [--k 10]
+"""
+
+import argparse
+
+from app.diversity import MMRReranker
+from app.learned_ranking import RankerTrainer
+from app.multi_retrieval import MultiSourceRetriever, default_sources
+from app.recommendation import CollaborativeFilteringService, RecommendationEngine
+from app.replay import ReplayHarness
+from benchmarks.synthetic import synthetic_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--candidates", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--affinity", type=float, default=0.5)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--max-requests", type=int, default=None)
+    args = parser.parse_args()
+
+    store = synthetic_store(
+        args.candidates, num_users=args.users, interest_affinity=args.affinity
+    )
+
+    def learned_engine(data_store, clock):
+        model, _ = RankerTrainer().fit(data_store)
+        return RecommendationEngine(
+            data_store, vectorized_ranking=True, learned_ranker=model, clock=clock
+        )
+
+    def multi_source_engine(data_store, clock):
+        cf_service = CollaborativeFilteringService(data_store)
+        # Generous timeouts keep the pool deterministic on a loaded machine
+        retriever = MultiSourceRetriever(
+            data_store, default_sources(data_store, cf_service=cf_service, timeout_ms=1000)
+        )
+        return RecommendationEngine(
+            data_store, vectorized_ranking=True, cf_service=cf_service,
+            multi_source=retriever, clock=clock
+        )
+
+    configs = {
+        "python": lambda data_store, clock: RecommendationEngine(data_store, clock=clock),
+        "vectorized": lambda data_store, clock: RecommendationEngine(
+            data_store, vectorized_ranking=True, clock=clock
+        ),
+        "mmr": lambda data_store, clock: RecommendationEngine(
+            data_store, vectorized_ranking=True, diversity=MMRReranker(), clock=clock
+        ),
+        "learned": learned_engine,
+        "multi": multi_source_engine
+    }
+
+    harness = ReplayHarness(k=args.k, max_requests=args.max_requests)
+    print(f"{'config':>10} {'requests':>8} {'ndcg':>7} {'recall':>7} {'coverage':>8} "
+          f"{'p50 (ms)':>9} {'p99 (ms)':>9} {'req/s':>6}")
+    for name, factory in configs.items():
+        report = harness.run(store, factory)
+        latency = report.latency_ms.get("request", {})
+        print(f"{name:>10} {report.requests:>8} {report.ndcg:>7.4f} {report.recall:>7.4f} "
+              f"{report.coverage:>8.4f} {latency.get('p50', 0):>9.2f} "
+              f"{latency.get('p99', 0):>9.2f} {report.requests_per_second:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Sharded search benchmark.
+
+Indexes a synthetic corpus into a single in-process SearchShard and into
+ShardedSearchIndex with an increasing number of worker processes, then
+reports build time, QPS and latency percentiles for each shard count.
+
+Usage:
+    python -m benchmarks.bench_sharded_search [--docs 200000] [--max-shards 8]
+"""
+
+import argparse
+import os
+import random
+import time
+
+from app.sharded_search import SearchShard, ShardedSearchIndex
+from app.text_similarity import TextSimilarity
+from benchmarks.bench_autocomplete import percentile
+
+
+def synthetic_corpus(n: int, rng: random.Random, vocab_size: int = 20000) -> list[tuple[str, str]]:
+    """(id, text) documents with Zipf-ish word usage."""
+    vocab = [f"term{i}" for i in range(vocab_size)]
+    weights = [1 / (rank + 1) for rank in range(vocab_size)]
+    return [
+        (f"d{i}", " ".join(rng.choices(vocab, weights, k=rng.randint(20, 60))))
+        for i in range(n)
+    ]
+
+
+def run_queries(search, query_vectors: list[dict], top_k: int) -> tuple[float, list[float]]:
+    """Run queries sequentially; returns (QPS, latencies in ms)."""
+    latencies = []
+    start = time.perf_counter()
+    for vector in query_vectors:
+        t0 = time.perf_counter()
+        search(vector, top_k)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return len(query_vectors) / (time.perf_counter() - start), latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--docs", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--max-shards", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    documents = synthetic_corpus(args.docs, rng)
+    similarity = TextSimilarity()
+    similarity.build_index([text for _, text in documents])
+
+    # Queries mix common and rare terms, like real searches
+    query_vectors = [
+        similarity.compute_query_vector(
+            " ".join(rng.choice(documents)[1].split()[:rng.randint(2, 4)])
+        )
+        for _ in range(args.queries)
+    ]
+    print(f"{args.docs:,} documents, {args.queries} queries, "
+          f"{os.cpu_count()} CPUs")
+
+    print(f"\n{'shards':>8} {'build (s)':>10} {'QPS':>8} {'p50 (ms)':>9} "
+          f"{'p99 (ms)':>9}")
+
+    start = time.perf_counter()
+    document_frequencies, num_documents = similarity.export_index()
+    shard = SearchShard(document_frequencies, num_documents)
+    for doc_id, text in documents:
+        shard.add(doc_id, text)
+    build_seconds = time.perf_counter() - start
+    qps, latencies = run_queries(shard.search, query_vectors, args.top_k)
+    print(f"{'inline':>8} {build_seconds:>10.2f} {qps:>8.1f} "
+          f"{percentile(latencies, 50):>9.2f} {percentile(latencies, 99):>9.2f}")
+
+    shard_counts = [1]
+    while shard_counts[-1] * 2 <= args.max_shards:
+        shard_counts.append(shard_counts[-1] * 2)
+    for num_shards in shard_counts:
+        index = ShardedSearchIndex(similarity, num_shards=num_shards)
+        start = time.perf_counter()
+        index.build(documents)
+        build_seconds = time.perf_counter() - start
+        try:
+            qps, latencies = run_queries(index.search, query_vectors, args.top_k)
+        finally:
+            index.close()
+        print(f"{num_shards:>8} {build_seconds:>10.2f} {qps:>8.1f} "
+              f"{percentile(latencies, 50):>9.2f} {percentile(latencies, 99):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
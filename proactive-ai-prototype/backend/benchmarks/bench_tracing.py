@@ -0,0 +1,62 @@
+"""
+Pipeline tracing overhead benchmark.
+
+Times get_recommendations on two engines, one with tracing disabled (the
+default no-op tracer) and one enabled, alternating requests between them
+so machine noise hits both equally, and prints the per-stage breakdown
+the tracer recorded.
+
+Usage:
+    python -m benchmarks.bench_tracing [--candidates 5000] [--requests 300]
+"""
+
+import argparse
+import time
+
+from app.models import UserContext
+from app.recommendation import RecommendationEngine
+from app.tracing import NULL_TRACER, Tracer
+from benchmarks.bench_autocomplete import percentile
+from benchmarks.synthetic import synthetic_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    store = synthetic_store(args.candidates, num_users=args.users)
+    user_ids = store.get_user_ids()
+    tracer = Tracer()
+    # Separate engines, so neither warms the other's CF cache
+    engines = {
+        "disabled": RecommendationEngine(store, vectorized_ranking=True, tracer=NULL_TRACER),
+        "enabled": RecommendationEngine(store, vectorized_ranking=True, tracer=tracer)
+    }
+    latencies = {name: [] for name in engines}
+
+    for i in range(args.requests):
+        user_id = user_ids[i % len(user_ids)]
+        context = UserContext(user_id=user_id, receptivity_score=0.7)
+        for name, engine in engines.items():
+            start = time.perf_counter()
+            engine.get_recommendations(user_id, 10, context, include_signals=False)
+            latencies[name].append((time.perf_counter() - start) * 1000)
+
+    print(f"{'tracing':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'mean (ms)':>10}")
+    for name, samples in latencies.items():
+        print(f"{name:>9} {percentile(samples, 50):>9.3f} {percentile(samples, 99):>9.3f} "
+              f"{sum(samples) / len(samples):>10.3f}")
+
+    print(f"\n{'stage':>14} {'p50 (ms)':>9} {'p99 (ms)':>9} {'candidates p50':>15}")
+    for stage, stats in tracer.stats()["stages"].items():
+        counts = stats["candidates"]
+        print(f"{stage:>14} {stats['duration_ms']['p50']:>9.3f} "
+              f"{stats['duration_ms']['p99']:>9.3f} "
+              f"{counts['p50'] if counts else '-':>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Synthetic data for benchmarks.
+
+Generates a DataStore-compatible JSON file with candidates, users,
+activity and feedback drawn from a shared keyword vocabulary, so the
+recommendation benchmarks exercise realistic overlap between users and
+content.
+"""
+
+import json
+import random
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from app.data_store import DataStore
+
+CATEGORIES = ["learning", "news", "tooling", "career", "research"]
+ACTIONS = ["started", "replied", "dismissed", "ignored", "dont_show_like_this"]
+ACTION_WEIGHTS = [0.3, 0.15, 0.3, 0.2, 0.05]
+
+
+def synthetic_data(
+    num_candidates: int,
+    num_users: int = 100,
+    activities_per_user: int = 20,
+    feedback_per_user: int = 20,
+    vocab_size: int = 500,
+    seed: int = 42,
+    interest_affinity: float = 0.0
+) -> dict:
+    """
+    Build a data dict in the DataStore JSON layout.
+
+    With interest_affinity > 0, that share of feedback is a "started" on
+    a candidate chosen in proportion to (interest matches)^3 x engagement
+    (otherwise feedback is uniform), so ranking quality can be measured.
+    """
+    rng = random.Random(seed)
+    vocab = [f"topic-{i}" for i in range(vocab_size)]
+    weights = [1 / (rank + 1) for rank in range(vocab_size)]
+    now = datetime.now(timezone.utc)
+
+    def iso(days_ago: float) -> str:
+        return (now - timedelta(days=days_ago)).isoformat().replace("+00:00", "Z")
+
+    candidates = [
+        {
+            "id": f"cand-{i}",
+            "title": f"Candidate {i}",
+            "summary": " ".join(rng.choices(vocab, weights, k=12)),
+            "category": rng.choice(CATEGORIES),
+            "keywords": list(set(rng.choices(vocab, weights, k=6))),
+            "source": "synthetic",
+            "engagement_score": round(rng.uniform(0, 10), 2),
+            "created_at": iso(rng.uniform(0, 60))
+        }
+        for i in range(num_candidates)
+    ]
+
+    keyword_sets = [set(c["keywords"]) for c in candidates]
+
+    users, activity, feedback = [], [], []
+    for u in range(num_users):
+        user_id = f"user-{u}"
+        users.append({
+            "id": user_id,
+            "name": f"User {u}",
+            "email": f"user{u}@example.com",
+            "topics_of_interest": list(set(rng.choices(vocab, weights, k=6))),
+            "created_at": iso(90)
+        })
+        for _ in range(activities_per_user):
+            kind = rng.choice(["article_read", "search"])
+            activity.append({
+                "user_id": user_id,
+                "activity_type": kind,
+                "keywords": list(set(rng.choices(vocab, weights, k=3))),
+                "query": " ".join(rng.choices(vocab, weights, k=2)) if kind == "search" else "",
+                "timestamp": iso(rng.uniform(0, 30))
+            })
+        affinity = None
+        if interest_affinity:
+            # Users favor candidates matching several interests, then engagement
+            interests = set(users[-1]["topics_of_interest"])
+            affinity = [
+                len(interests & keywords) ** 3 * (c["engagement_score"] + 1)
+                for c, keywords in zip(candidates, keyword_sets)
+            ]
+        for _ in range(min(feedback_per_user, num_candidates)):
+            if affinity and rng.random() < interest_affinity:
+                candidate_id = rng.choices(candidates, affinity)[0]["id"]
+                action = "started"
+            else:
+                candidate_id = f"cand-{rng.randrange(num_candidates)}"
+                action = rng.choices(ACTIONS, ACTION_WEIGHTS)[0]
+            feedback.append({
+                "id": f"fb-{len(feedback)}",
+                "user_id": user_id,
+                "candidate_id": candidate_id,
+                "action": action,
+                "conversation_turns": 0,
+                "created_at": iso(rng.uniform(0, 30))
+            })
+
+    return {
+        "candidates": candidates,
+        "users": users,
+        "user_activity": activity,
+        "feedback": feedback
+    }
+
+
+def synthetic_store(num_candidates: int, **kwargs) -> DataStore:
+    """A DataStore backed by a temporary file of synthetic data."""
+    handle = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+    with handle:
+        json.dump(synthetic_data(num_candidates, **kwargs), handle)
+    # An absolute path overrides DataStore's backend-relative default
+    return DataStore(handle.name)
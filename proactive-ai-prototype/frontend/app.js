@@ -452,6 +452,9 @@ function setupEventListeners() {
     // Search form submission
     searchForm.addEventListener('submit', handleSearch);
 
+    // Search autocomplete
+    searchInput.addEventListener('input', handleSearchInput);
+
     // Toggle sidebar
     const sidebarOverlay = document.getElementById('sidebar-overlay');
     toggleSidebar.addEventListener('click', () => {
@@ -1456,6 +1459,34 @@ async function handleSearch(e) {
     }
 }
 
+// Search autocomplete: fetch suggestions shortly after the user stops typing
+let suggestTimer = null;
+
+function handleSearchInput() {
+    clearTimeout(suggestTimer);
+    const prefix = sanitizeInput(searchInput.value);
+    if (prefix.length < 2) return;
+
+    suggestTimer = setTimeout(async () => {
+        try {
+            const params = new URLSearchParams({ prefix, limit: 8 });
+            const response = await fetch(`${API_BASE_URL}/api/search/suggest?${params}`);
+            if (!response.ok) return;
+            const data = await response.json();
+
+            const datalist = document.getElementById('search-suggestions');
+            datalist.innerHTML = '';
+            for (const suggestion of data.suggestions) {
+                const option = document.createElement('option');
+                option.value = suggestion.text;
+                datalist.appendChild(option);
+            }
+        } catch (error) {
+            console.error('Suggest error:', error);
+        }
+    }, 150);
+}
+
 function renderSearchResults(data) {
     const results = data.results || [];
     const expandedTerms = data.expanded_terms || [];